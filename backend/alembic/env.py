@@ -10,7 +10,7 @@ load_dotenv()
 
 # ✅ Base の読み込み（自分のモデル定義ファイルに合わせて修正）
 from app.core.database import Base
-from app.models import food_item, user  # 使用するすべてのモデルを import
+from app.models import book, book_metadata_cache, catalog, food_category_verdict, food_item, jan_product, rakuten_genre, recipe_suggestion_cache, recommendation_cache, notification, user  # 使用するすべてのモデルを import
 
 # Alembic の設定オブジェクト取得
 config = context.config
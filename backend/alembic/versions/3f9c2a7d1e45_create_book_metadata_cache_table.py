@@ -0,0 +1,37 @@
+"""create book_metadata_cache table
+
+Revision ID: 3f9c2a7d1e45
+Revises: de4127aac1d2
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d1e45'
+down_revision: Union[str, Sequence[str], None] = 'de4127aac1d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('book_metadata_cache',
+    sa.Column('isbn', sa.String(length=13), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=True),
+    sa.Column('found', sa.Boolean(), nullable=False),
+    sa.Column('fetched_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('isbn')
+    )
+    op.create_index(op.f('ix_book_metadata_cache_expires_at'), 'book_metadata_cache', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_book_metadata_cache_expires_at'), table_name='book_metadata_cache')
+    op.drop_table('book_metadata_cache')
@@ -0,0 +1,38 @@
+"""add users.library_version and recommendation_cache table
+
+Revision ID: 4c8e2f6a9b13
+Revises: 7d3b5e91c0a4
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c8e2f6a9b13'
+down_revision: Union[str, Sequence[str], None] = '7d3b5e91c0a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('library_version', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('recommendation_cache',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('library_version', sa.Integer(), nullable=False),
+    sa.Column('fingerprint', sa.String(length=64), nullable=False),
+    sa.Column('recommendations', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('recommendation_cache')
+    op.drop_column('users', 'library_version')
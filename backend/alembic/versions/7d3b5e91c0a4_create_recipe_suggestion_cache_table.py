@@ -0,0 +1,37 @@
+"""create recipe_suggestion_cache table
+
+Revision ID: 7d3b5e91c0a4
+Revises: 1a6f3c8e5d27
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3b5e91c0a4'
+down_revision: Union[str, Sequence[str], None] = '1a6f3c8e5d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('recipe_suggestion_cache',
+    sa.Column('ingredients_key', sa.String(), nullable=False),
+    sa.Column('source', sa.String(length=16), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=False),
+    sa.Column('fetched_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('ingredients_key')
+    )
+    op.create_index(op.f('ix_recipe_suggestion_cache_expires_at'), 'recipe_suggestion_cache', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_recipe_suggestion_cache_expires_at'), table_name='recipe_suggestion_cache')
+    op.drop_table('recipe_suggestion_cache')
@@ -0,0 +1,42 @@
+"""add books.enrichment_status
+
+Revision ID: 8b41d0c6a2f3
+Revises: 3f9c2a7d1e45
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b41d0c6a2f3'
+down_revision: Union[str, Sequence[str], None] = '3f9c2a7d1e45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+enrichment_status = postgresql.ENUM('pending', 'done', 'failed', name='bookenrichmentstatusenum')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    enrichment_status.create(op.get_bind(), checkfirst=True)
+    op.add_column('books', sa.Column(
+        'enrichment_status',
+        postgresql.ENUM('pending', 'done', 'failed', name='bookenrichmentstatusenum', create_type=False),
+        server_default='done',
+        nullable=False,
+    ))
+    # 補完待ちの書籍だけを拾う部分インデックス
+    op.create_index('ix_books_enrichment_pending', 'books', ['id'], unique=False,
+                    postgresql_where=sa.text("enrichment_status = 'pending'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_books_enrichment_pending', table_name='books')
+    op.drop_column('books', 'enrichment_status')
+    enrichment_status.drop(op.get_bind(), checkfirst=True)
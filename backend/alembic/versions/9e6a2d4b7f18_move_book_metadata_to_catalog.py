@@ -0,0 +1,127 @@
+"""move book metadata to shared catalog table
+
+Revision ID: 9e6a2d4b7f18
+Revises: 4c8e2f6a9b13
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e6a2d4b7f18'
+down_revision: Union[str, Sequence[str], None] = '4c8e2f6a9b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+METADATA_COLUMNS = 'title, volume, author, publisher, cover_image_url, published_date, genres, enrichment_status'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('catalog',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('isbn', sa.String(length=13), nullable=True),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('volume', sa.String(), nullable=True),
+    sa.Column('author', sa.String(), nullable=True),
+    sa.Column('publisher', sa.String(), nullable=True),
+    sa.Column('cover_image_url', sa.String(), nullable=True),
+    sa.Column('published_date', sa.Date(), nullable=True),
+    sa.Column('genres', sa.JSON(), nullable=False),
+    sa.Column('enrichment_status',
+              postgresql.ENUM('pending', 'done', 'failed', name='bookenrichmentstatusenum', create_type=False),
+              server_default='done', nullable=False),
+    # 個人用エントリを books に対応付けるための一時列（移行の最後に削除）
+    sa.Column('legacy_book_id', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('isbn')
+    )
+    op.create_index(op.f('ix_catalog_id'), 'catalog', ['id'], unique=False)
+    op.add_column('books', sa.Column('catalog_id', sa.Integer(), nullable=True))
+
+    # ✅ ISBN-13 ごとに代表の1冊（最も古い行）のメタデータを共有エントリにする
+    op.execute(f"""
+        INSERT INTO catalog (isbn, {METADATA_COLUMNS})
+        SELECT DISTINCT ON (isbn) isbn, {METADATA_COLUMNS}
+        FROM books
+        WHERE isbn ~ '^[0-9]{{13}}$'
+        ORDER BY isbn, id
+    """)
+    # ✅ 代表と同じ内容の本は共有エントリを参照する
+    op.execute("""
+        UPDATE books b SET catalog_id = c.id
+        FROM catalog c
+        WHERE c.isbn = b.isbn
+          AND c.title IS NOT DISTINCT FROM b.title
+          AND c.volume IS NOT DISTINCT FROM b.volume
+          AND c.author IS NOT DISTINCT FROM b.author
+          AND c.publisher IS NOT DISTINCT FROM b.publisher
+          AND c.cover_image_url IS NOT DISTINCT FROM b.cover_image_url
+          AND c.published_date IS NOT DISTINCT FROM b.published_date
+          AND c.genres::jsonb = b.genres::jsonb
+    """)
+    # ✅ ISBN が無い・ユーザーが書き換えていた本は、1冊ずつ個人用エントリ（isbn=NULL）にする
+    op.execute(f"""
+        INSERT INTO catalog (legacy_book_id, {METADATA_COLUMNS})
+        SELECT id, {METADATA_COLUMNS}
+        FROM books
+        WHERE catalog_id IS NULL
+    """)
+    op.execute("""
+        UPDATE books b SET catalog_id = c.id
+        FROM catalog c
+        WHERE c.legacy_book_id = b.id AND b.catalog_id IS NULL
+    """)
+    op.drop_column('catalog', 'legacy_book_id')
+
+    op.alter_column('books', 'catalog_id', existing_type=sa.Integer(), nullable=False)
+    op.create_foreign_key('books_catalog_id_fkey', 'books', 'catalog', ['catalog_id'], ['id'])
+    op.create_index(op.f('ix_books_catalog_id'), 'books', ['catalog_id'], unique=False)
+
+    # 補完待ちの部分インデックスは catalog 側に移す
+    op.drop_index('ix_books_enrichment_pending', table_name='books')
+    op.create_index('ix_catalog_enrichment_pending', 'catalog', ['id'], unique=False,
+                    postgresql_where=sa.text("enrichment_status = 'pending'"))
+    for column in ('title', 'volume', 'author', 'publisher', 'cover_image_url', 'published_date', 'genres', 'enrichment_status'):
+        op.drop_column('books', column)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('books', sa.Column('title', sa.String(), nullable=True))
+    op.add_column('books', sa.Column('volume', sa.String(), nullable=True))
+    op.add_column('books', sa.Column('author', sa.String(), nullable=True))
+    op.add_column('books', sa.Column('publisher', sa.String(), nullable=True))
+    op.add_column('books', sa.Column('cover_image_url', sa.String(), nullable=True))
+    op.add_column('books', sa.Column('published_date', sa.Date(), nullable=True))
+    op.add_column('books', sa.Column('genres', sa.JSON(), nullable=True))
+    op.add_column('books', sa.Column(
+        'enrichment_status',
+        postgresql.ENUM('pending', 'done', 'failed', name='bookenrichmentstatusenum', create_type=False),
+        server_default='done',
+        nullable=False,
+    ))
+    op.execute("""
+        UPDATE books b SET
+            title = c.title, volume = c.volume, author = c.author, publisher = c.publisher,
+            cover_image_url = c.cover_image_url, published_date = c.published_date,
+            genres = c.genres, enrichment_status = c.enrichment_status
+        FROM catalog c
+        WHERE c.id = b.catalog_id
+    """)
+    op.alter_column('books', 'title', existing_type=sa.String(), nullable=False)
+    op.alter_column('books', 'genres', existing_type=sa.JSON(), nullable=False)
+    op.create_index('ix_books_enrichment_pending', 'books', ['id'], unique=False,
+                    postgresql_where=sa.text("enrichment_status = 'pending'"))
+
+    op.drop_index(op.f('ix_books_catalog_id'), table_name='books')
+    op.drop_constraint('books_catalog_id_fkey', 'books', type_='foreignkey')
+    op.drop_column('books', 'catalog_id')
+    op.drop_index('ix_catalog_enrichment_pending', table_name='catalog')
+    op.drop_index(op.f('ix_catalog_id'), table_name='catalog')
+    op.drop_table('catalog')
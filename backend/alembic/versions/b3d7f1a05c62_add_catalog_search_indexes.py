@@ -0,0 +1,63 @@
+"""add catalog search_text / search_vector with trigram and full-text indexes
+
+Revision ID: b3d7f1a05c62
+Revises: 9e6a2d4b7f18
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d7f1a05c62'
+down_revision: Union[str, Sequence[str], None] = '9e6a2d4b7f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _search_text(*parts):
+    # app.services.utils.normalize_search_text と同じ処理（移行時点の定義を固定する）
+    text = " ".join(unicodedata.normalize("NFKC", p) for p in parts if p)
+    return re.sub(r"\s+", " ", text).lower().strip()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('catalog', sa.Column('search_text', sa.String(), server_default='', nullable=False))
+
+    # ✅ 既存行のバックフィル（NFKC 正規化は Python 側で行う）
+    bind = op.get_bind()
+    catalog = sa.table('catalog', sa.column('id', sa.Integer), sa.column('search_text', sa.String))
+    rows = bind.execute(sa.text("SELECT id, title, author, publisher FROM catalog")).all()
+    updates = [{"row_id": row.id, "search_text": _search_text(row.title, row.author, row.publisher)} for row in rows]
+    if updates:
+        bind.execute(
+            catalog.update().where(catalog.c.id == sa.bindparam('row_id')).values(search_text=sa.bindparam('search_text')),
+            updates,
+        )
+
+    op.add_column('catalog', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('simple', search_text)", persisted=True),
+        nullable=True,
+    ))
+    op.create_index('ix_catalog_search_text_trgm', 'catalog', ['search_text'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'})
+    op.create_index('ix_catalog_search_vector', 'catalog', ['search_vector'], unique=False,
+                    postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_catalog_search_vector', table_name='catalog')
+    op.drop_index('ix_catalog_search_text_trgm', table_name='catalog')
+    op.drop_column('catalog', 'search_vector')
+    op.drop_column('catalog', 'search_text')
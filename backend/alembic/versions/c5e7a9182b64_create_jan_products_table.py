@@ -0,0 +1,36 @@
+"""create jan_products table
+
+Revision ID: c5e7a9182b64
+Revises: 8b41d0c6a2f3
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e7a9182b64'
+down_revision: Union[str, Sequence[str], None] = '8b41d0c6a2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('jan_products',
+    sa.Column('jan_code', sa.String(length=14), nullable=False),
+    sa.Column('item', sa.JSON(), nullable=True),
+    sa.Column('found', sa.Boolean(), nullable=False),
+    sa.Column('source', sa.String(length=16), nullable=False),
+    sa.Column('fetched_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('jan_code')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('jan_products')
@@ -0,0 +1,55 @@
+"""add books.title_key with (user_id, title_key) index
+
+Revision ID: c8a4e2d91f37
+Revises: b3d7f1a05c62
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8a4e2d91f37'
+down_revision: Union[str, Sequence[str], None] = 'b3d7f1a05c62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _title_key(title):
+    # app.services.utils.normalize_title と同じ処理（移行時点の定義を固定する）
+    if title is None:
+        return ""
+    title = unicodedata.normalize("NFKC", title)
+    title = re.sub(r"[（）()\-\sー・　_]", "", title)
+    return title.lower().strip()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('title_key', sa.String(), server_default='', nullable=False))
+
+    # ✅ 既存行のバックフィル（catalog のタイトルから計算）
+    bind = op.get_bind()
+    books = sa.table('books', sa.column('id', sa.Integer), sa.column('title_key', sa.String))
+    rows = bind.execute(sa.text(
+        "SELECT b.id, c.title FROM books b JOIN catalog c ON c.id = b.catalog_id"
+    )).all()
+    updates = [{"row_id": row.id, "title_key": _title_key(row.title)} for row in rows]
+    if updates:
+        bind.execute(
+            books.update().where(books.c.id == sa.bindparam('row_id')).values(title_key=sa.bindparam('title_key')),
+            updates,
+        )
+
+    op.create_index('ix_books_user_id_title_key', 'books', ['user_id', 'title_key'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_books_user_id_title_key', table_name='books')
+    op.drop_column('books', 'title_key')
@@ -0,0 +1,50 @@
+"""add user-scoped composite / partial indexes (created concurrently)
+
+Revision ID: d1f6b3a8e240
+Revises: c8a4e2d91f37
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1f6b3a8e240'
+down_revision: Union[str, Sequence[str], None] = 'c8a4e2d91f37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (インデックス名, テーブル, 列, 部分インデックスの条件)
+INDEXES = [
+    ('ix_books_user_id_status', 'books', ['user_id', 'status', 'id'], None),
+    ('ix_books_user_id_isbn', 'books', ['user_id', 'isbn'], None),
+    ('ix_books_user_id_favorite', 'books', ['user_id', 'id'], 'is_favorite'),
+    ('ix_food_items_user_id_expiration_date', 'food_items', ['user_id', 'expiration_date'], None),
+    ('ix_food_items_user_id_category', 'food_items', ['user_id', 'category', 'expiration_date'], None),
+    ('ix_notifications_user_id_is_read_created_at', 'notifications', ['user_id', 'is_read', 'created_at'], None),
+    ('ix_users_username', 'users', ['username'], None),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY はトランザクション内で実行できないので autocommit で流す。
+    # 作成済みのものは IF NOT EXISTS で飛ばす（失敗して INVALID で残ったものは DROP INDEX してから再実行する）
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
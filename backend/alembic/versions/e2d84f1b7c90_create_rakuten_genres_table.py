@@ -0,0 +1,37 @@
+"""create rakuten_genres table
+
+Revision ID: e2d84f1b7c90
+Revises: c5e7a9182b64
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2d84f1b7c90'
+down_revision: Union[str, Sequence[str], None] = 'c5e7a9182b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rakuten_genres',
+    sa.Column('genre_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('parent_id', sa.Integer(), nullable=True),
+    sa.Column('level', sa.Integer(), nullable=True),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('genre_id')
+    )
+    op.create_index(op.f('ix_rakuten_genres_parent_id'), 'rakuten_genres', ['parent_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_rakuten_genres_parent_id'), table_name='rakuten_genres')
+    op.drop_table('rakuten_genres')
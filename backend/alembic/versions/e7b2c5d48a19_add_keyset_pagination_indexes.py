@@ -0,0 +1,47 @@
+"""add indexes for keyset pagination of foods / notifications (created concurrently)
+
+Revision ID: e7b2c5d48a19
+Revises: d1f6b3a8e240
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b2c5d48a19'
+down_revision: Union[str, Sequence[str], None] = 'd1f6b3a8e240'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        # GET /me/foods は id 順
+        op.create_index('ix_food_items_user_id_id', 'food_items', ['user_id', 'id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        # GET /notifications は (created_at, id) の降順。id を末尾に足したものに作り直す
+        op.create_index('ix_notifications_user_id_is_read_created_at_id', 'notifications',
+                        ['user_id', 'is_read', 'created_at', 'id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_notifications_user_id_is_read_created_at', table_name='notifications',
+                      postgresql_concurrently=True, if_exists=True)
+        op.execute("ALTER INDEX ix_notifications_user_id_is_read_created_at_id "
+                   "RENAME TO ix_notifications_user_id_is_read_created_at")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_notifications_user_id_is_read_created_at_old', 'notifications',
+                        ['user_id', 'is_read', 'created_at'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_notifications_user_id_is_read_created_at', table_name='notifications',
+                      postgresql_concurrently=True, if_exists=True)
+        op.execute("ALTER INDEX ix_notifications_user_id_is_read_created_at_old "
+                   "RENAME TO ix_notifications_user_id_is_read_created_at")
+        op.drop_index('ix_food_items_user_id_id', table_name='food_items',
+                      postgresql_concurrently=True, if_exists=True)
@@ -2,13 +2,15 @@ import os
 from datetime import datetime, timedelta
 from typing import Optional
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.models.user import User
 from dotenv import load_dotenv
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import ExpiredSignatureError, JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 # 環境変数読み込みと定数定義
@@ -16,6 +18,7 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
 
 # パスワードハッシュ化
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -46,12 +49,7 @@ def decode_access_token(token: str) -> Optional[str]:
     except JWTError:
         return None
 
-# ✅ ログイン中のユーザー情報を取得する関数（FastAPI依存関数）
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-
+def _username_from_token(token: str) -> str:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -75,9 +73,11 @@ def get_current_user(
             detail="認証情報が無効です",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return username
 
+
+def _ensure_user(user: User | None) -> User:
     # ユーザーの存在確認
-    user = db.query(User).filter(User.username == username).first()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -87,8 +87,36 @@ def get_current_user(
     return user
 
 
+# ✅ ログイン中のユーザー情報を取得する関数（FastAPI依存関数）
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> User:
+    username = _username_from_token(token)
+    return _ensure_user(db.query(User).filter(User.username == username).first())
+
+
+# ✅ async エンドポイント用（AsyncSession で引くのでスレッドプールを使わない）
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    username = _username_from_token(token)
+    result = await db.execute(select(User).where(User.username == username).limit(1))
+    return _ensure_user(result.scalars().first())
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+
+# ✅ 運用者向けエンドポイント用（X-Admin-Key ヘッダーで認証）
+def verify_admin_key(x_admin_key: Optional[str] = Header(None)) -> None:
+    if not ADMIN_API_KEY or x_admin_key != ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="管理者キーが無効です",
+        )
@@ -1,9 +1,14 @@
 import os
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
+from app.core.db_pool import (InstrumentedAsyncAdaptedQueuePool,
+                              InstrumentedQueuePool, instrument_engine,
+                              pool_options)
 from dotenv import load_dotenv
 from fastapi import Depends
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 # .envの読み込み
@@ -11,12 +16,21 @@ load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", ".env"))
 
 # 環境変数からDATABASE_URL取得
 DATABASE_URL = os.getenv("DATABASE_URL")
+# 非同期エンジン用（未指定なら DATABASE_URL のドライバを asyncpg に差し替える）
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or make_url(DATABASE_URL).set(drivername="postgresql+asyncpg")
 
-# エンジンとセッション定義
-engine = create_engine(DATABASE_URL)
+# エンジンとセッション定義（プール設定は DB_POOL_* 環境変数、待ち時間などは /api/admin/metrics の db_pool）
+engine = create_engine(DATABASE_URL, poolclass=InstrumentedQueuePool, **pool_options())
+instrument_engine("sync", engine)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
+# ✅ イベントループ上で完結させたい一覧系エンドポイント用（asyncpg）
+# commit 後に属性を読み直すと await が必要になるので expire_on_commit=False にする
+async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncAdaptedQueuePool, **pool_options())
+instrument_engine("async", async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -24,3 +38,8 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,125 @@
+# app/core/db_pool.py
+#
+# DB コネクションプールの設定（環境変数）と計測。
+# チェックアウト待ち時間・使用中の接続数・オーバーフロー使用数を /api/admin/metrics の "db_pool" で返す。
+# ワーカー数 × (DB_POOL_SIZE + DB_MAX_OVERFLOW) × エンジン数（同期・非同期）が Postgres の max_connections に収まるように決める。
+
+import os
+import threading
+import time
+from collections import Counter, deque
+
+from app.core.metrics import register_metrics
+from dotenv import load_dotenv
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+load_dotenv()
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # 秒。-1 で無効
+
+# 接続が遅いときに一覧へ出す閾値（秒）
+DB_POOL_SLOW_CHECKOUT = float(os.getenv("DB_POOL_SLOW_CHECKOUT", 0.1))
+
+
+def pool_options() -> dict:
+    """create_engine / create_async_engine に渡すプール設定"""
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
+class _PoolStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.wait_times: deque = deque(maxlen=1000)
+        self.counts = Counter()
+
+    def record(self, seconds: float, timed_out: bool = False) -> None:
+        with self.lock:
+            self.counts["checkouts" if not timed_out else "timeouts"] += 1
+            if seconds >= DB_POOL_SLOW_CHECKOUT:
+                self.counts["slow_checkouts"] += 1
+            self.wait_times.append(seconds)
+
+    def summary(self) -> dict:
+        with self.lock:
+            ordered = sorted(self.wait_times)
+            counts = dict(self.counts)
+        if not ordered:
+            wait = {"avg": 0.0, "p95": 0.0, "max": 0.0}
+        else:
+            wait = {
+                "avg": round(sum(ordered) / len(ordered), 4),
+                "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+                "max": round(ordered[-1], 4),
+            }
+        return {**counts, "wait_seconds": wait}
+
+
+_pools: dict[str, tuple] = {}
+
+
+def _instrumented(base):
+    class InstrumentedPool(base):
+        """_do_get（空き接続を待つ部分）にかかった時間を記録するプール"""
+
+        _stats: _PoolStats
+
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except PoolTimeoutError:
+                self._stats.record(time.perf_counter() - started, timed_out=True)
+                print(f"⚠️ DB コネクションプールのチェックアウトがタイムアウトしました: {self.status()}")
+                raise
+            self._stats.record(time.perf_counter() - started)
+            return conn
+
+        def recreate(self):
+            # dispose() などで作り直されても同じ統計に積み上げる
+            pool = super().recreate()
+            pool._stats = self._stats
+            return pool
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+InstrumentedQueuePool = _instrumented(QueuePool)
+InstrumentedAsyncAdaptedQueuePool = _instrumented(AsyncAdaptedQueuePool)
+
+
+def instrument_engine(name: str, engine) -> None:
+    """エンジンのプールに統計を結び付けてメトリクスに出す（async エンジンは sync_engine を渡す）"""
+    stats = _PoolStats()
+    engine.pool._stats = stats
+    _pools[name] = (engine, stats)
+
+
+def get_db_pool_stats() -> dict:
+    results = {}
+    for name, (engine, stats) in _pools.items():
+        pool = engine.pool
+        results[name] = {
+            "pool_size": pool.size(),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            # 負の値は pool_size に満たない分（まだ作られていない接続）
+            "overflow": pool.overflow(),
+            "timeout": DB_POOL_TIMEOUT,
+            **stats.summary(),
+        }
+    return results
+
+
+register_metrics("db_pool", get_db_pool_stats)
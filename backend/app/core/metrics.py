@@ -0,0 +1,20 @@
+# app/core/metrics.py
+
+from typing import Callable
+
+# 各サービスが自分の統計情報を返す関数を登録する
+_collectors: dict[str, Callable[[], dict]] = {}
+
+
+def register_metrics(name: str, collector: Callable[[], dict]) -> None:
+    _collectors[name] = collector
+
+
+def collect_metrics() -> dict:
+    results = {}
+    for name, collector in _collectors.items():
+        try:
+            results[name] = collector()
+        except Exception as e:
+            results[name] = {"error": str(e)}
+    return results
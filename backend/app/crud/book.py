@@ -1,11 +1,21 @@
+import asyncio
+import re
 from datetime import date, timedelta
 
-from app.models.book import Book, BookStatusEnum
+from app.models.book import Book, BookEnrichmentStatusEnum, BookStatusEnum
+from app.models.catalog import CATALOG_FIELDS, CatalogEntry
 from app.schemas.book import BookCreate, BookUpdate
+from app.services.utils import (extract_volume, normalize_isbn, normalize_search_text,
+                                normalize_title, parse_published_date)
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, contains_eager
 
-from app.services.google_books import fetch_book_info_by_isbn
+from app.services.enrichment import BookEnrichmentContext
+from app.services.pagination import keyset_after, keyset_order
+from app.services import library_version  # noqa: F401  books 変更時に users.library_version を進めるリスナーを登録
 
 
 from datetime import datetime
@@ -13,30 +23,140 @@ from datetime import datetime
 from pytz import timezone
 
 
-def create_book(db: Session, book: BookCreate, user_id: int) -> Book:
-    genres = []
+def _is_blank(value) -> bool:
+    return value is None or value == "" or value == []
 
-    # Step 1: isbn からジャンル補完
-    if book.isbn:
-        book_info = fetch_book_info_by_isbn(book.isbn)
-        if book_info and book_info.get("genres"):
-            genres = book_info["genres"]
 
-    # Step 2: 手入力があればそちらを使用
-    if not genres and book.genres:
-        genres = book.genres
-    db_book = Book(**book.dict(), user_id=user_id)
+def catalog_fields_from_info(book_info: dict | None) -> dict | None:
+    """外部API（Google Books・楽天）の書籍情報を catalog の列に変換する（タイトルが無ければ None）"""
+    if not book_info or not book_info.get("title"):
+        return None
+    authors = book_info.get("authors")
+    return {
+        "title": book_info["title"],
+        "volume": extract_volume(book_info["title"]) or "",
+        "author": ", ".join(authors) if isinstance(authors, list) else (authors or ""),
+        "publisher": book_info.get("publisher") or "",
+        "cover_image_url": book_info.get("cover_image_url") or "",
+        "published_date": parse_published_date(book_info.get("published_date")),
+        "genres": book_info.get("genres") or [],
+    }
+
+
+def get_or_create_catalog(
+    db: Session, isbn: str | None, fields: dict, provider: dict | None = None
+) -> tuple[CatalogEntry, bool]:
+    """ISBN に対応する catalog エントリを返す。戻り値は (エントリ, 新規作成したか)
+    共有エントリを作ったり空欄を埋めたりするのは外部APIのデータ（provider）だけで、
+    ユーザーの入力（fields）は共有エントリと異なれば個人用コピーに入れる（他のユーザーの本棚を書き換えない）"""
+    fields = {k: v for k, v in fields.items() if k in CATALOG_FIELDS}
+    key = normalize_isbn(isbn) if isbn else None
+    if key is None:
+        # ISBN の無い手入力の本は共有しない
+        return CatalogEntry(**fields), True
+
+    created = False
+    if provider:
+        # 同じ ISBN を同時に登録しても1行になるよう、INSERT ... ON CONFLICT DO NOTHING で作る
+        values = {"genres": [], **provider, "isbn": key}
+        created = db.execute(
+            insert(CatalogEntry).values(**values)
+            .on_conflict_do_nothing(index_elements=[CatalogEntry.isbn])
+            .returning(CatalogEntry.id)
+        ).scalar() is not None
+    catalog = db.query(CatalogEntry).filter(CatalogEntry.isbn == key).first()
+    if catalog is None:
+        # 外部APIのデータが無く共有エントリもまだ無ければ、入力値で個人用エントリを作る
+        return CatalogEntry(**fields), True
+
+    if provider and not created:
+        # 共有エントリの空欄は外部APIのデータで埋める（全所有者に反映される）
+        for k, v in provider.items():
+            if not _is_blank(v) and _is_blank(getattr(catalog, k)):
+                setattr(catalog, k, v)
+                if k == "title":
+                    db.query(Book).filter(Book.catalog_id == catalog.id).update(
+                        {Book.title_key: normalize_title(v)}, synchronize_session=False
+                    )
+
+    # 入力が共有エントリと異なる項目があれば、共有エントリは変えずに個人用コピーを使う
+    overrides = {k: v for k, v in fields.items() if not _is_blank(v) and getattr(catalog, k) != v}
+    if overrides:
+        private = catalog.private_copy()
+        for k, v in overrides.items():
+            setattr(private, k, v)
+        return private, True
+    return catalog, created
+
+
+def build_book(db: Session, data: dict, user_id: int, provider: dict | None = None) -> tuple[Book, bool]:
+    """books 行を作って catalog に紐づけ、セッションに追加する（commit は呼び出し元）。戻り値は (書籍, catalog を新規作成したか)
+    provider は外部APIから取得した catalog の列（catalog_fields_from_info）。共有エントリはこれからだけ作る"""
+    ownership = {k: v for k, v in data.items() if k not in CATALOG_FIELDS and hasattr(Book, k) and k != "enrichment_status"}
+    db_book = Book(**ownership, user_id=user_id)
+    db_book.catalog, created = get_or_create_catalog(db, data.get("isbn"), data, provider)
     db.add(db_book)
+    return db_book, created
+
+
+def delete_book(db: Session, book: Book) -> None:
+    # 個人用の catalog エントリは他から参照されないので一緒に消す（共有エントリは残す）
+    catalog = book.catalog
+    db.delete(book)
+    if catalog is not None and catalog.isbn is None:
+        db.delete(catalog)
+    db.commit()
+
+
+async def create_book(
+    db: Session,
+    book: BookCreate,
+    user_id: int,
+    enrichment: BookEnrichmentContext | None = None,
+) -> Book:
+    # 呼び出し元ですでに取得済みのメタデータがあれば enrichment 経由で再利用する
+    enrichment = enrichment or BookEnrichmentContext()
+    # isbn があれば外部APIのデータ（ジャンルなど）を取得し、入力値との使い分けは get_or_create_catalog に任せる
+    book_info = await enrichment.resolve(book.isbn) if book.isbn else None
+    # 同期セッションでの INSERT / commit はイベントループを止めないよう別スレッドで行う
+    return await asyncio.to_thread(
+        _save_new_book, db, book.dict(), user_id, catalog_fields_from_info(book_info)
+    )
+
+
+def _save_new_book(db: Session, data: dict, user_id: int, provider: dict | None) -> Book:
+    db_book, _ = build_book(db, data, user_id, provider)
     db.commit()
     db.refresh(db_book)
     return db_book
 
+# 外部APIを待たずに即座に登録する（ISBNがあれば後からバックグラウンドで補完）
+def create_book_deferred(db: Session, book: BookCreate, user_id: int) -> Book:
+    # 外部APIのデータがまだ無いので、共有エントリが無ければ個人用エントリで登録し、補完時に共有エントリへ付け替える
+    db_book, created = build_book(db, book.dict(), user_id)
+    # 既に共有エントリが補完済みならそのまま使う
+    if book.isbn and (created or db_book.enrichment_status == BookEnrichmentStatusEnum.FAILED):
+        db_book.enrichment_status = BookEnrichmentStatusEnum.PENDING
+    db.commit()
+    db.refresh(db_book)
+    return db_book
+
+def get_pending_enrichment_books(db: Session, user_id: int) -> list[Book]:
+    return db.query(Book).join(Book.catalog).options(contains_eager(Book.catalog)).filter(
+        Book.user_id == user_id,
+        CatalogEntry.enrichment_status == BookEnrichmentStatusEnum.PENDING
+    ).all()
+
 def get_books_by_user_id(db: Session, user_id: int) -> list[Book]:
     return db.query(Book).filter(Book.user_id == user_id).all()
 
 def get_book_by_id(db: Session, book_id: int) -> Book | None:
     return db.query(Book).filter(Book.id == book_id).first()
 
+def get_book_by_isbn(db: Session, user_id: int, isbn: str) -> Book | None:
+    # ix_books_user_id_isbn を使う
+    return db.query(Book).filter(Book.isbn == isbn, Book.user_id == user_id).first()
+
 def update_book(db: Session, book_id: int, update_data: BookUpdate, user_id: int) -> Book:
     db_book = db.query(Book).filter(Book.id == book_id, Book.user_id == user_id).first()
     if not db_book:
@@ -50,11 +170,54 @@ def update_book(db: Session, book_id: int, update_data: BookUpdate, user_id: int
     db.refresh(db_book)
     return db_book
 
-def get_books_by_user_id_and_status(db: Session, user_id: int, status: BookStatusEnum) -> list[Book]:
-    return db.query(Book).filter(
+def get_books_by_user_id_and_status(
+    db: Session, user_id: int, status: BookStatusEnum, after_id: int | None = None, limit: int | None = None
+) -> list[Book]:
+    # id 順で after_id より後を limit 件（キーセットページング、ix_books_user_id_status を使う）
+    query = db.query(Book).filter(
         Book.user_id == user_id,
         Book.status == status
-    ).all()
+    )
+    if after_id is not None:
+        query = query.filter(Book.id > after_id)
+    return query.order_by(Book.id).limit(limit).all()
+
+
+def search_books(
+    db: Session,
+    user_id: int,
+    query: str,
+    status: BookStatusEnum | None = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> list[Book]:
+    """自分の本をタイトル・著者・出版社で検索する（関連度順）"""
+    q = normalize_search_text(query)
+    if not q:
+        return []
+
+    # 部分一致（LIKE）と表記揺れ（word_similarity）は trigram インデックス、英単語は tsvector で拾う
+    pattern = "%" + re.sub(r"([\\%_])", r"\\\1", q) + "%"
+    tsquery = func.plainto_tsquery("simple", q)
+    rank = (
+        func.word_similarity(q, CatalogEntry.search_text)
+        + func.ts_rank(CatalogEntry.search_vector, tsquery)
+    )
+
+    books = (
+        db.query(Book).join(Book.catalog).options(contains_eager(Book.catalog))
+        .filter(
+            Book.user_id == user_id,
+            or_(
+                CatalogEntry.search_text.like(pattern, escape="\\"),
+                CatalogEntry.search_text.op("%>")(q),
+                CatalogEntry.search_vector.op("@@")(tsquery),
+            ),
+        )
+    )
+    if status is not None:
+        books = books.filter(Book.status == status)
+    return books.order_by(rank.desc(), Book.id).offset(offset).limit(limit).all()
 
 
 def get_books_releasing_tomorrow(db: Session):
@@ -63,20 +226,30 @@ def get_books_releasing_tomorrow(db: Session):
     tomorrow = today + timedelta(days=1)
     print(f"🕒 TODAY: {today} / TOMORROW: {tomorrow}")
 
-    books = db.query(Book).filter(Book.published_date == tomorrow).all()
+    books = (
+        db.query(Book).join(Book.catalog).options(contains_eager(Book.catalog))
+        .filter(CatalogEntry.published_date == tomorrow)
+        .all()
+    )
     print(f"📚 FOUND BOOKS: {[book.title for book in books]}")
     return books
 
 # 追加：お気に入りの書籍だけ取得
-def get_favorite_books_by_user_id(db: Session, user_id: int):
-    return (
-        db.query(Book)
-        .filter(Book.user_id == user_id, Book.is_favorite == True)
-        .all()
-    )
+def get_favorite_books_by_user_id(db: Session, user_id: int, after_id: int | None = None, limit: int | None = None):
+    query = db.query(Book).filter(Book.user_id == user_id, Book.is_favorite == True)
+    if after_id is not None:
+        query = query.filter(Book.id > after_id)
+    return query.order_by(Book.id).limit(limit).all()
+
+def get_book_by_title(db: Session, user_id: int, title: str) -> Book | None:
+    """normalize_title が一致する自分の本（(user_id, title_key) インデックスで引く）"""
+    return db.query(Book).filter(
+        Book.user_id == user_id,
+        Book.title_key == normalize_title(title)
+    ).order_by(Book.id).first()
 
 def update_book_status_to_wishlist(db: Session, title: str, user_id: int):
-    book = db.query(Book).filter(Book.title == title, Book.user_id == user_id).first()
+    book = get_book_by_title(db, user_id, title)
     if not book:
         return {"success": False, "reason": "not_found"}
 
@@ -87,3 +260,82 @@ def update_book_status_to_wishlist(db: Session, title: str, user_id: int):
     db.commit()
     db.refresh(book)
     return {"success": True, "book": book}
+
+
+# ---- AsyncSession 版（イベントループ上で完結させる async エンドポイント用） ----
+# catalog は joined ロードなので、BookOut への変換で追加の await は発生しない
+
+async def get_books_by_user_id_async(db: AsyncSession, user_id: int) -> list[Book]:
+    result = await db.execute(select(Book).where(Book.user_id == user_id))
+    return list(result.scalars().all())
+
+async def get_book_by_id_async(db: AsyncSession, book_id: int) -> Book | None:
+    return await db.get(Book, book_id)
+
+# GET /me/books・/me/wishlist の sort で選べる catalog の列（NULL は空文字・最小の日付として並べる）
+BOOK_SORT_COLUMNS = {
+    "title": CatalogEntry.title,
+    "author": func.coalesce(CatalogEntry.author, ""),
+    "published_date": func.coalesce(CatalogEntry.published_date, date.min),
+}
+
+
+def book_sort_key(book: Book, sort: str) -> list:
+    """次のページのカーソルに入れる値（BOOK_SORT_COLUMNS と同じ値になるようにする）"""
+    if sort == "title":
+        return [book.title, book.id]
+    if sort == "author":
+        return [book.author or "", book.id]
+    if sort == "published_date":
+        return [(book.published_date or date.min).isoformat(), book.id]
+    return [book.id]
+
+
+async def get_books_by_user_id_and_status_async(
+    db: AsyncSession,
+    user_id: int,
+    status: BookStatusEnum,
+    after: list | None = None,
+    limit: int | None = None,
+    sort: str = "id",
+    descending: bool = False,
+) -> list[Book]:
+    # id 順は ix_books_user_id_status だけで引ける。catalog の列で並べるときは JOIN して (列, id) のキーセットで引く
+    stmt = select(Book).where(
+        Book.user_id == user_id,
+        Book.status == status
+    )
+    columns = [Book.id]
+    if sort in BOOK_SORT_COLUMNS:
+        stmt = stmt.join(Book.catalog).options(contains_eager(Book.catalog))
+        columns = [BOOK_SORT_COLUMNS[sort], Book.id]
+    if after is not None:
+        stmt = stmt.where(keyset_after(columns, after, descending))
+    result = await db.execute(stmt.order_by(*keyset_order(columns, descending)).limit(limit))
+    return list(result.scalars().all())
+
+async def get_book_stats_async(db: AsyncSession, user_id: int) -> dict:
+    # 一覧を取得せずに件数だけ数える（ix_books_user_id_status を使う）
+    result = await db.execute(select(
+        func.count().filter(Book.status == BookStatusEnum.OWNED),
+        func.count().filter(Book.status == BookStatusEnum.WISHLIST),
+        func.count().filter(Book.is_favorite == True),
+    ).where(Book.user_id == user_id))
+    owned, wishlist, favorites = result.one()
+    return {"owned": owned, "wishlist": wishlist, "favorites": favorites}
+
+async def get_favorite_books_by_user_id_async(
+    db: AsyncSession, user_id: int, after_id: int | None = None, limit: int | None = None
+) -> list[Book]:
+    stmt = select(Book).where(Book.user_id == user_id, Book.is_favorite == True)
+    if after_id is not None:
+        stmt = stmt.where(Book.id > after_id)
+    result = await db.execute(stmt.order_by(Book.id).limit(limit))
+    return list(result.scalars().all())
+
+async def get_book_by_title_async(db: AsyncSession, user_id: int, title: str) -> Book | None:
+    result = await db.execute(select(Book).where(
+        Book.user_id == user_id,
+        Book.title_key == normalize_title(title)
+    ).order_by(Book.id).limit(1))
+    return result.scalars().first()
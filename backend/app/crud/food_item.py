@@ -2,7 +2,10 @@ from datetime import date
 
 from app.models.food_item import FoodCategory, FoodItem
 from app.schemas.food_item import FoodItemCreate
+from app.services.pagination import keyset_after, keyset_order
 from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import re
 
@@ -35,8 +38,12 @@ def create_food_item(db: Session, user_id: int, item: FoodItemCreate):
     db.refresh(db_item)
     return db_item
 
-def get_food_items_by_user_id(db: Session, user_id: int):
-    return db.query(FoodItem).filter(FoodItem.user_id == user_id).all()
+def get_food_items_by_user_id(db: Session, user_id: int, after_id: int | None = None, limit: int | None = None):
+    # id 順で after_id より後を limit 件（キーセットページング、ix_food_items_user_id_id を使う）
+    query = db.query(FoodItem).filter(FoodItem.user_id == user_id)
+    if after_id is not None:
+        query = query.filter(FoodItem.id > after_id)
+    return query.order_by(FoodItem.id).limit(limit).all()
 
 def get_food_item_by_id(db: Session, food_id: int):
     return db.query(FoodItem).filter(FoodItem.id == food_id).first()
@@ -64,7 +71,7 @@ def get_expiring_food_items(db: Session, user_id: int, today: date, deadline: da
         FoodItem.user_id == user_id,
         FoodItem.expiration_date >= today,
         FoodItem.expiration_date <= deadline
-    ).order_by(FoodItem.expiration_date.asc()).all()
+    ).order_by(FoodItem.expiration_date.asc(), FoodItem.id).all()
 
 def get_used_categories(db: Session, user_id: int):
     results = db.query(FoodItem.category).filter(
@@ -77,3 +84,95 @@ def get_food_items_by_category(db: Session, user_id: int, category: FoodCategory
         FoodItem.user_id == user_id,
         FoodItem.category == category
     ).order_by(FoodItem.expiration_date.asc()).all()
+
+
+# ---- AsyncSession 版（async エンドポイント用） ----
+
+async def create_food_item_async(db: AsyncSession, user_id: int, item: FoodItemCreate):
+    db_item = FoodItem(**item.dict(), user_id=user_id)
+    db.add(db_item)
+    await db.commit()
+    await db.refresh(db_item)
+    return db_item
+
+# GET /me/foods の sort で選べる列（id 以外）
+FOOD_SORT_COLUMNS = {"expiration_date": FoodItem.expiration_date}
+
+
+def food_sort_key(food: FoodItem, sort: str) -> list:
+    """次のページのカーソルに入れる値"""
+    if sort == "expiration_date":
+        return [food.expiration_date.isoformat(), food.id]
+    return [food.id]
+
+
+async def get_food_items_by_user_id_async(
+    db: AsyncSession,
+    user_id: int,
+    after: list | None = None,
+    limit: int | None = None,
+    sort: str = "id",
+    descending: bool = False,
+    category: FoodCategory | None = None,
+    name: str | None = None,
+    expired_before: date | None = None,
+):
+    # 絞り込み・並び替えはサーバー側で行い、(並び替えの列, id) のキーセットでページングする
+    stmt = select(FoodItem).where(FoodItem.user_id == user_id)
+    if category is not None:
+        stmt = stmt.where(FoodItem.category == category)
+    if name:
+        pattern = "%" + re.sub(r"([\\%_])", r"\\\1", name) + "%"
+        stmt = stmt.where(FoodItem.name.ilike(pattern, escape="\\"))
+    if expired_before is not None:
+        stmt = stmt.where(FoodItem.expiration_date < expired_before)
+    columns = [FOOD_SORT_COLUMNS[sort], FoodItem.id] if sort in FOOD_SORT_COLUMNS else [FoodItem.id]
+    if after is not None:
+        stmt = stmt.where(keyset_after(columns, after, descending))
+    result = await db.execute(stmt.order_by(*keyset_order(columns, descending)).limit(limit))
+    return list(result.scalars().all())
+
+async def get_food_stats_async(db: AsyncSession, user_id: int, today: date, deadline: date) -> dict:
+    # 一覧を取得せずに件数だけ数える（ix_food_items_user_id_expiration_date を使う）
+    result = await db.execute(select(
+        func.count(),
+        func.count().filter(FoodItem.expiration_date < today),
+        func.count().filter(FoodItem.expiration_date.between(today, deadline)),
+    ).where(FoodItem.user_id == user_id))
+    total, expired, expiring = result.one()
+    return {
+        "total_items": total,
+        "expired": expired,
+        "expiring_soon": expiring,
+        "fresh_items": total - expired - expiring,
+    }
+
+async def get_food_item_by_id_async(db: AsyncSession, food_id: int):
+    return await db.get(FoodItem, food_id)
+
+async def delete_food_item_async(db: AsyncSession, food_id: int, user_id: int):
+    db_item = await get_food_item_by_id_async(db, food_id)
+    if not db_item or db_item.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Food not found")
+    await db.delete(db_item)
+    await db.commit()
+    return {"detail": "Food deleted"}
+
+async def get_expiring_food_items_async(db: AsyncSession, user_id: int, today: date, deadline: date):
+    result = await db.execute(select(FoodItem).where(
+        FoodItem.user_id == user_id,
+        FoodItem.expiration_date >= today,
+        FoodItem.expiration_date <= deadline
+    ).order_by(FoodItem.expiration_date.asc()))
+    return list(result.scalars().all())
+
+async def get_used_categories_async(db: AsyncSession, user_id: int):
+    result = await db.execute(select(FoodItem.category).where(FoodItem.user_id == user_id).distinct())
+    return list(result.scalars().all())
+
+async def get_food_items_by_category_async(db: AsyncSession, user_id: int, category: FoodCategory):
+    result = await db.execute(select(FoodItem).where(
+        FoodItem.user_id == user_id,
+        FoodItem.category == category
+    ).order_by(FoodItem.expiration_date.asc()))
+    return list(result.scalars().all())
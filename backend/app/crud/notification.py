@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from app.models.notification import Notification
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def get_unread_notifications_async(
+    db: AsyncSession, user_id: int, after: tuple[datetime, int] | None = None, limit: int | None = None
+) -> list:
+    """未読通知を新しい順（created_at, id）に after より後を limit 件（ix_notifications_user_id_is_read_created_at を使う）"""
+    stmt = select(Notification.id, Notification.created_at, Notification.message).where(
+        Notification.user_id == user_id,
+        Notification.is_read == False
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(Notification.created_at, Notification.id) < tuple_(*after))
+    result = await db.execute(
+        stmt.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit)
+    )
+    return list(result.all())
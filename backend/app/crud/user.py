@@ -1,8 +1,12 @@
+import asyncio
+
 from app.core.auth import hash_password
 from app.core.database import SessionLocal
 from app.models.user import User
 from app.schemas.user import UserCreate
 from passlib.context import CryptContext
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 
@@ -29,3 +33,26 @@ def create_user(db: Session, user: UserCreate):
     db.commit()
     db.refresh(new_user)
     return new_user
+
+
+# ---- AsyncSession 版（async エンドポイント用） ----
+
+async def get_users_count_async(db: AsyncSession):
+    return await db.scalar(select(func.count()).select_from(User))
+
+async def get_user_by_username_async(db: AsyncSession, username: str):
+    result = await db.execute(select(User).where(User.username == username).limit(1))
+    return result.scalars().first()
+
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    result = await db.execute(select(User).where(User.email == email).limit(1))
+    return result.scalars().first()
+
+async def create_user_async(db: AsyncSession, user: UserCreate):
+    # bcrypt は CPU を使うのでイベントループを塞がないようスレッドで計算する
+    hashed_pw = await asyncio.to_thread(hash_password, user.password)
+    new_user = User(email=user.email, username=user.username, hashed_password=hashed_pw)
+    db.add(new_user)
+    await db.commit()
+    await db.refresh(new_user)
+    return new_user
@@ -1,13 +1,22 @@
+import asyncio
 import os
 
-from app.core.database import Base, engine
-from app.models import book, food_item, user
+from app.core.database import Base, async_engine, engine
+from app.models import book, book_metadata_cache, catalog, food_category_verdict, food_item, jan_product, rakuten_genre, recipe_suggestion_cache, recommendation_cache, user
 # ルーターインポート
 from app.routers import food_item  # ✅ モジュールとしてimport
 from app.routers import book_router
 from app.routers import notification as notification_router
-from app.routers import recommendation_router, user_router
+from app.routers import admin_router, jobs_router, recommendation_router, user_router
+from app.services.book_enrichment import (start_enrichment_workers,
+                                          stop_enrichment_workers)
+from app.services.food_category import refresh_food_history
+from app.services.food_classifier import load_classifier
+from app.services.http_client import close_http_client
+from app.services.jobs import JobQueueFullError, start_job_workers, stop_job_workers
+from app.services.local_recommender import rebuild_local_recommender
 from app.services.notification.wishlist import start_scheduler
+from app.services.rakuten_genres import load_genre_tree, refresh_genre_tree
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -21,7 +30,7 @@ app = FastAPI(title="Book Management API")
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, Response
 
 # FastAPIアプリ作成
 app = FastAPI(title="Book Management API")
@@ -70,7 +79,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
     allow_headers=["*"],
-    expose_headers=["*"],
+    expose_headers=["*", "X-Next-Cursor"],  # credentials 付きのリクエストでは * が効かないので明示する
 )
 
 # テストルート
@@ -97,8 +106,36 @@ app.include_router(book_router, prefix="/api", tags=["books"])
 app.include_router(recommendation_router, prefix="/api", tags=["recommendations"])
 app.include_router(notification_router.router, prefix="/api", tags=["notifications"])
 app.include_router(food_item.router)  # ✅ prefix & tags は food_item.py 側に記述済み
+app.include_router(admin_router, prefix="/api", tags=["admin"])
+app.include_router(jobs_router, prefix="/api", tags=["jobs"])
+
+
+# ジョブキューが満杯のときは少し待ってから再送してもらう
+@app.exception_handler(JobQueueFullError)
+async def job_queue_full_handler(request: Request, exc: JobQueueFullError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "5"})
 
 # スケジューラー起動
 @app.on_event("startup")
 async def startup_event():
     start_scheduler()
+    start_enrichment_workers()
+    start_job_workers()
+    # 楽天ジャンルツリーをメモリに展開（未取得なら初回取得をバックグラウンドで実行）
+    if load_genre_tree() == 0:
+        asyncio.create_task(refresh_genre_tree())
+    # 食材分類器の読み込み（無ければ学習）はリクエストを待たせないようスレッドで行う
+    asyncio.create_task(asyncio.to_thread(load_classifier))
+    # 食材カテゴリ判定の履歴索引も同様にスレッドで集計する
+    asyncio.create_task(asyncio.to_thread(refresh_food_history))
+    # ローカル推薦エンジンも起動時にスレッドで作る（できるまで source=local は 503）
+    asyncio.create_task(asyncio.to_thread(rebuild_local_recommender))
+
+
+# 終了時にワーカーと共有HTTPクライアントを停止
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_enrichment_workers()
+    await stop_job_workers()
+    await close_http_client()
+    await async_engine.dispose()
@@ -1,6 +1,9 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Enum as SqlEnum, Boolean,JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum as SqlEnum, Boolean, Index, event, select, text
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.models.catalog import BookEnrichmentStatusEnum, CatalogEntry  # noqa: F401  BookEnrichmentStatusEnum は従来どおりここからも import できる
+from app.services.utils import normalize_title
 from enum import Enum as PyEnum
 
 # ✅ 小文字の値を使うEnum（DBにも小文字で保存される）
@@ -9,16 +12,45 @@ class BookStatusEnum(PyEnum):
     WISHLIST = "wishlist"
     NOT_OWNED = "not_owned"
 
+
+def _catalog_field(name: str, copy_on_write: bool = True, on_set=None) -> hybrid_property:
+    """catalog の列を Book の属性として見せる（読み取り・代入・クエリの条件式に使える）"""
+
+    def fget(self):
+        return getattr(self.catalog, name) if self.catalog is not None else None
+
+    def fset(self, value):
+        if self.catalog is not None and getattr(self.catalog, name) == value:
+            return
+        catalog = self._writable_catalog() if copy_on_write else self._ensure_catalog()
+        setattr(catalog, name, value)
+        if on_set is not None:
+            on_set(self, value)
+
+    def expr(cls):
+        # Book.title == ... のように書けるよう、相関サブクエリとして展開する
+        column = getattr(CatalogEntry, name)
+        return select(column).where(CatalogEntry.id == cls.catalog_id).scalar_subquery()
+
+    return hybrid_property(fget, fset, expr=expr)
+
+
+def _set_title_key(book: "Book", title: str | None) -> None:
+    book.title_key = normalize_title(title)
+
+
 class Book(Base):
     __tablename__ = "books"
+    __table_args__ = (
+        # タイトルでの重複確認・検索を1回のインデックス検索で済ませる
+        Index("ix_books_user_id_title_key", "user_id", "title_key"),
+        # 一覧・重複確認でよく使う絞り込み（id を末尾に入れて並び順もインデックスで決まるようにする）
+        Index("ix_books_user_id_status", "user_id", "status", "id"),
+        Index("ix_books_user_id_isbn", "user_id", "isbn"),
+        Index("ix_books_user_id_favorite", "user_id", "id", postgresql_where=text("is_favorite")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, nullable=False)
-    volume = Column(String)
-    author = Column(String)
-    publisher = Column(String)
-    cover_image_url = Column(String)
-    published_date = Column(Date)
 
     status = Column(
         SqlEnum(
@@ -34,5 +66,37 @@ class Book(Base):
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     user = relationship("User", back_populates="books")
-    genres = Column(JSON, nullable=False, default=[])
+    # ユーザーが登録したときの ISBN（ISBN-10 の古いデータもそのまま残す）
     isbn = Column(String(13), nullable=True, unique=False)
+    # normalize_title(title) の結果（タイトル変更時・登録時に更新）
+    title_key = Column(String, nullable=False, default="", server_default="")
+
+    # ✅ メタデータは catalog に持つ（BookOut を返すときに1回の JOIN で取れるよう joined ロード）
+    catalog_id = Column(Integer, ForeignKey("catalog.id"), nullable=False, index=True)
+    catalog = relationship(CatalogEntry, lazy="joined", innerjoin=True)
+
+    title = _catalog_field("title", on_set=_set_title_key)
+    volume = _catalog_field("volume")
+    author = _catalog_field("author")
+    publisher = _catalog_field("publisher")
+    cover_image_url = _catalog_field("cover_image_url")
+    published_date = _catalog_field("published_date")
+    genres = _catalog_field("genres")
+    # 補完状態は同じ ISBN の所有者全員で共有する
+    enrichment_status = _catalog_field("enrichment_status", copy_on_write=False)
+
+    def _ensure_catalog(self) -> CatalogEntry:
+        if self.catalog is None:
+            self.catalog = CatalogEntry()
+        return self.catalog
+
+    def _writable_catalog(self) -> CatalogEntry:
+        # 共有エントリ（isbn あり）は他のユーザーにも見えるので、個人用コピーに付け替えてから書き換える
+        if self.catalog is not None and self.catalog.isbn is not None:
+            self.catalog = self.catalog.private_copy()
+        return self._ensure_catalog()
+
+
+@event.listens_for(Book, "before_insert")
+def _fill_title_key(mapper, connection, target: Book) -> None:
+    _set_title_key(target, target.title)
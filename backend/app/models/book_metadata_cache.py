@@ -0,0 +1,15 @@
+# app/models/book_metadata_cache.py
+
+from app.core.database import Base
+from sqlalchemy import JSON, Boolean, Column, DateTime, String
+from sqlalchemy.sql import func
+
+
+class BookMetadataCache(Base):
+    __tablename__ = "book_metadata_cache"
+
+    isbn = Column(String(13), primary_key=True)  # ISBN-13 に正規化済み
+    data = Column(JSON, nullable=True)  # 見つからなかった場合は None
+    found = Column(Boolean, nullable=False, default=True)
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
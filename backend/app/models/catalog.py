@@ -0,0 +1,80 @@
+# app/models/catalog.py
+#
+# 書籍メタデータ（タイトル・著者・表紙など）の共有テーブル。
+# ISBN が同じ本は全ユーザーで1行を共有し、books 側は所有情報（status・お気に入り）だけを持つ。
+# 共有行の内容は外部API（Google Books・楽天）から取得したデータだけで作る・埋める。
+# ユーザーの入力や書き換えが共有行と異なる場合は isbn=NULL の個人用コピーを作って参照を付け替える。
+
+from enum import Enum as PyEnum
+
+from app.core.database import Base
+from app.services.utils import normalize_search_text
+from sqlalchemy import JSON, Column, Computed, Date, Enum as SqlEnum, Index, Integer, String, event, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+# ✅ 外部APIによるメタデータ補完の状態
+class BookEnrichmentStatusEnum(PyEnum):
+    PENDING = "pending"  # 登録直後、バックグラウンド補完待ち
+    DONE = "done"
+    FAILED = "failed"
+
+
+# books から参照されるメタデータ列（Book からは同名の属性として読み書きできる）
+CATALOG_FIELDS = ("title", "volume", "author", "publisher", "cover_image_url", "published_date", "genres")
+
+
+def _search_text_default(context) -> str:
+    # INSERT ... ON CONFLICT のように ORM を通らない INSERT でも search_text が入るようにする
+    params = context.get_current_parameters()
+    return normalize_search_text(params.get("title"), params.get("author"), params.get("publisher"))
+
+
+class CatalogEntry(Base):
+    __tablename__ = "catalog"
+    __table_args__ = (
+        # 補完待ちのエントリだけを拾う部分インデックス
+        Index("ix_catalog_enrichment_pending", "id", postgresql_where=text("enrichment_status = 'pending'")),
+        # GET /me/books/search 用（日本語は trigram の部分一致、英字の単語は全文検索）
+        Index("ix_catalog_search_text_trgm", "search_text",
+              postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"}),
+        Index("ix_catalog_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    # ISBN-13 に正規化済み。NULL は手入力・個人用コピーなど共有しないエントリ
+    isbn = Column(String(13), unique=True, nullable=True)
+    title = Column(String, nullable=False)
+    volume = Column(String)
+    author = Column(String)
+    publisher = Column(String)
+    cover_image_url = Column(String)
+    published_date = Column(Date)
+    genres = Column(JSON, nullable=False, default=[])
+
+    # タイトル・著者・出版社を NFKC 正規化して連結したもの（書き込み時に計算）
+    search_text = Column(String, nullable=False, default=_search_text_default, server_default="")
+    search_vector = Column(TSVECTOR, Computed("to_tsvector('simple', search_text)", persisted=True))
+
+    enrichment_status = Column(
+        SqlEnum(
+            BookEnrichmentStatusEnum,
+            name="bookenrichmentstatusenum",
+            values_callable=lambda enum_cls: [e.value for e in enum_cls]
+        ),
+        default=BookEnrichmentStatusEnum.DONE,
+        server_default=BookEnrichmentStatusEnum.DONE.value,
+        nullable=False
+    )
+
+    def private_copy(self) -> "CatalogEntry":
+        """共有エントリを書き換えずに済むよう、isbn を持たない個人用コピーを作る"""
+        values = {name: getattr(self, name) for name in CATALOG_FIELDS}
+        values["genres"] = list(self.genres or [])
+        return CatalogEntry(**values, enrichment_status=self.enrichment_status or BookEnrichmentStatusEnum.DONE)
+
+
+@event.listens_for(CatalogEntry, "before_insert")
+@event.listens_for(CatalogEntry, "before_update")
+def _update_search_text(mapper, connection, target: CatalogEntry) -> None:
+    target.search_text = normalize_search_text(target.title, target.author, target.publisher)
@@ -0,0 +1,15 @@
+# app/models/food_category_verdict.py
+
+from app.core.database import Base
+from sqlalchemy import Boolean, Column, DateTime, String
+from sqlalchemy.sql import func
+
+
+class FoodCategoryVerdict(Base):
+    __tablename__ = "food_category_verdicts"
+
+    name_key = Column(String, primary_key=True)  # normalize_food_name() 済みの食材名
+    category = Column(String, primary_key=True)  # FoodCategory の値
+    verdict = Column(Boolean, nullable=False)
+    source = Column(String(16), nullable=False, default="llm")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
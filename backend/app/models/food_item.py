@@ -3,7 +3,7 @@ from enum import Enum as PyEnum
 from app.core.database import Base
 from sqlalchemy import Column, Date
 from sqlalchemy import Enum as SqlEnum
-from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy import ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 from typing import Optional  # これが必要！
 
@@ -50,6 +50,13 @@ class QuantityUnit(PyEnum):
 
 class FoodItem(Base):
     __tablename__ = "food_items"
+    __table_args__ = (
+        # 期限順の一覧・期限切れ間近の抽出、カテゴリ別一覧（期限順）用
+        Index("ix_food_items_user_id_expiration_date", "user_id", "expiration_date"),
+        Index("ix_food_items_user_id_category", "user_id", "category", "expiration_date"),
+        # GET /me/foods のキーセットページング（id 順）用
+        Index("ix_food_items_user_id_id", "user_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
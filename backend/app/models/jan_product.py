@@ -0,0 +1,16 @@
+# app/models/jan_product.py
+
+from app.core.database import Base
+from sqlalchemy import JSON, Boolean, Column, DateTime, String
+from sqlalchemy.sql import func
+
+
+class JanProduct(Base):
+    __tablename__ = "jan_products"
+
+    jan_code = Column(String(14), primary_key=True)
+    item = Column(JSON, nullable=True)  # JANCODE API の商品1件分（見つからなかった場合は None）
+    found = Column(Boolean, nullable=False, default=True)
+    source = Column(String(16), nullable=False, default="api")  # "api" or "import"
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=True)  # None = 期限なし（一括インポート分）
@@ -1,12 +1,16 @@
 # app/models/notification.py
 
 from app.core.database import Base
-from sqlalchemy import Boolean, Column, DateTime, Integer, Text
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, Text
 from sqlalchemy.sql import func
 
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # 未読通知を新しい順に取る GET /notifications 用
+        Index("ix_notifications_user_id_is_read_created_at", "user_id", "is_read", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False)
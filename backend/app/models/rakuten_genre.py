@@ -0,0 +1,15 @@
+# app/models/rakuten_genre.py
+
+from app.core.database import Base
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+
+class RakutenGenre(Base):
+    __tablename__ = "rakuten_genres"
+
+    genre_id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String, nullable=False)
+    parent_id = Column(Integer, nullable=True, index=True)  # ルート直下は 0
+    level = Column(Integer, nullable=True)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
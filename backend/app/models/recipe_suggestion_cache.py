@@ -0,0 +1,15 @@
+# app/models/recipe_suggestion_cache.py
+
+from app.core.database import Base
+from sqlalchemy import JSON, Column, DateTime, String
+from sqlalchemy.sql import func
+
+
+class RecipeSuggestionCache(Base):
+    __tablename__ = "recipe_suggestion_cache"
+
+    ingredients_key = Column(String, primary_key=True)  # 正規化・ソート済みの食材名を "|" で連結
+    source = Column(String(16), nullable=False)  # "rakuten" or "chatgpt"
+    data = Column(JSON, nullable=False)  # hybrid_recipe_suggestion() の戻り値
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,15 @@
+# app/models/recommendation_cache.py
+
+from app.core.database import Base
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.sql import func
+
+
+class RecommendationCache(Base):
+    __tablename__ = "recommendation_cache"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    library_version = Column(Integer, nullable=False)  # 生成時点の users.library_version
+    fingerprint = Column(String(64), nullable=False)  # プロンプトに使った書籍リストの SHA-256
+    recommendations = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
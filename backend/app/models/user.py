@@ -7,9 +7,11 @@ class User(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True, index=True)
-    username = Column(String, nullable=False)
+    username = Column(String, nullable=False, index=True)  # ログイン時の get_user_by_username 用
     email = Column(String, unique=True, nullable=False)
     hashed_password = Column(String, nullable=False)
+    # 本の追加・更新・削除のたびに +1 される（推薦キャッシュの有効判定に使う）
+    library_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     # ユーザが所有している本の一覧
     books = relationship("Book", back_populates="user", cascade="all, delete-orphan")
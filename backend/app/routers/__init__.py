@@ -3,10 +3,14 @@ from .user import router as user_router
 from .book import router as book_router
 from .recommendation import router as recommendation_router
 from .food_item import router as food_item_router  # ✅ 追加
+from .admin import router as admin_router
+from .jobs import router as jobs_router
 
 __all__ = [
     "user_router",
     "book_router",
     "recommendation_router",
     "food_item_router",  # ✅ 追加
+    "admin_router",
+    "jobs_router",
 ]
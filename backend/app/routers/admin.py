@@ -0,0 +1,34 @@
+# app/routers/admin.py
+
+from app.core.auth import verify_admin_key
+from app.core.metrics import collect_metrics
+from app.services.book_cache import invalidate_book_cache
+from app.services.food_classifier import retrain_classifier
+from app.services.jancode import invalidate_jan_cache
+from fastapi import APIRouter, Depends
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(verify_admin_key)])
+
+
+# ✅ GET /api/admin/metrics → キャッシュ等の統計情報
+@router.get("/metrics")
+def get_metrics():
+    return collect_metrics()
+
+
+# ✅ DELETE /api/admin/cache/books/{isbn} → 書籍メタデータキャッシュを1件無効化
+@router.delete("/cache/books/{isbn}")
+def invalidate_book_metadata(isbn: str):
+    return {"isbn": isbn, "invalidated": invalidate_book_cache(isbn)}
+
+
+# ✅ DELETE /api/admin/cache/jan/{jan_code} → JAN商品キャッシュを1件無効化
+@router.delete("/cache/jan/{jan_code}")
+def invalidate_jan_product(jan_code: str):
+    return {"jan_code": jan_code, "invalidated": invalidate_jan_cache(jan_code)}
+
+
+# ✅ POST /api/admin/food-classifier/retrain → 食材カテゴリ分類器を再学習して差し替え
+@router.post("/food-classifier/retrain")
+def retrain_food_classifier():
+    return retrain_classifier()
@@ -1,85 +1,253 @@
+import asyncio
+import json
+import os
 import re
-from datetime import datetime
-from typing import List
+from datetime import date, datetime
+from typing import List, Literal
 
-from app.core.auth import get_current_user
-from app.core.database import get_db
+from app.core.auth import get_current_user, get_current_user_async
+from app.core.database import get_async_db, get_db
 from app.crud import book as crud_book
-from app.models.book import Book, BookStatusEnum
+from app.models.book import Book, BookEnrichmentStatusEnum, BookStatusEnum
 from app.models.user import User
-from app.schemas.book import BookCreate, BookOut, BookUpdate, ISBNRequest
-from app.services.google_books import (ensure_isbn_or_raise,
-                                       fetch_book_info_by_isbn,
-                                       normalize_title, search_books_by_title,
-                                       search_books_by_title_rakuten)
-from app.services.utils import extract_volume, parse_published_date
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.schemas.book import (BookCreate, BookEnrichmentOut, BookOut,
+                              BookUpdate, ISBNBatchItem,
+                              ISBNBatchRequest, ISBNBatchResponse,
+                              ISBNBatchStatus, ISBNRequest)
+from app.services.book_cache import get_book_info_cached
+from app.services.book_enrichment import (enqueue_book_enrichment,
+                                          wait_for_enrichment)
+from app.services.book_search import (UNIFIED_SEARCH_BUDGET,
+                                      search_books_unified)
+from app.services.enrichment import (BookEnrichmentContext,
+                                     get_enrichment_context)
+from app.services.google_books import (ensure_isbn_or_raise, normalize_title,
+                                       search_books_by_title,
+                                       search_books_by_title_rakuten,
+                                       stream_isbn_supplements)
+from app.services.pagination import (LIST_PAGE_SIZE, LIST_PAGE_SIZE_MAX,
+                                     decode_id_cursor, decode_keyset_cursor,
+                                     finish_page, page_limit, str_key)
+from app.services.utils import (extract_volume, normalize_isbn,
+                                parse_published_date)
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 router = APIRouter()
 
+# 一括登録時に外部APIへ同時に問い合わせる上限
+BATCH_LOOKUP_CONCURRENCY = int(os.getenv("BATCH_LOOKUP_CONCURRENCY", 8))
+
+
+def _record_provider_calls(response: Response, enrichment: BookEnrichmentContext) -> None:
+    # 登録1件あたりの外部プロバイダ呼び出し回数（キャッシュ経由を含む）をヘッダーで返す
+    response.headers["X-Provider-Calls"] = str(enrichment.record_registration())
+
 
 @router.post("/books", response_model=BookOut)
-def create_book(
+async def create_book(
     book: BookCreate,
+    response: Response,
+    defer_enrichment: bool = Query(False, description="外部APIでの補完を待たずに登録し、後からバックグラウンドで補完する"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    enrichment: BookEnrichmentContext = Depends(get_enrichment_context)
+):
+    # 外部APIは await し、同期セッションでの DB 処理は run_in_threadpool でイベントループの外に出す
+    if defer_enrichment:
+        db_book = await run_in_threadpool(crud_book.create_book_deferred, db=db, book=book, user_id=current_user.id)
+        if db_book.enrichment_status == BookEnrichmentStatusEnum.PENDING:
+            enqueue_book_enrichment(db_book.id)
+        return db_book
+
+    db_book = await crud_book.create_book(db=db, book=book, user_id=current_user.id, enrichment=enrichment)
+    _record_provider_calls(response, enrichment)
+    return db_book
+
+
+# ✅ GET: バックグラウンド補完待ちの書籍一覧
+@router.get("/books/enrichment/pending", response_model=List[BookOut])
+def get_pending_enrichments(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return crud_book.get_pending_enrichment_books(db, current_user.id)
+
+
+# ✅ GET: 補完状態の確認（wait 秒まで完了を待つ）
+@router.get("/books/{book_id}/enrichment", response_model=BookEnrichmentOut)
+async def get_book_enrichment(
+    book_id: int,
+    wait: float = Query(0, ge=0, le=30, description="補完完了を待つ最大秒数"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return crud_book.create_book(db=db, book=book, user_id=current_user.id)
+    book = await run_in_threadpool(crud_book.get_book_by_id, db, book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    if book.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="この書籍にはアクセスできません")
+
+    if book.enrichment_status == BookEnrichmentStatusEnum.PENDING and wait > 0:
+        await wait_for_enrichment(book_id, timeout=wait)
+        await run_in_threadpool(db.refresh, book)
+
+    return {"book_id": book.id, "enrichment_status": book.enrichment_status.value, "book": book}
 
 
 @router.post("/books/register-by-isbn", response_model=BookOut)
-def register_book_by_isbn(
+async def register_book_by_isbn(
     payload: ISBNRequest,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    enrichment: BookEnrichmentContext = Depends(get_enrichment_context)
 ):
     book_data = {"isbn": payload.isbn}
     try:
-        isbn = ensure_isbn_or_raise(book_data)
+        isbn = await ensure_isbn_or_raise(book_data)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
-    book_info = fetch_book_info_by_isbn(isbn)
-    if not book_info:
+    book_info = await enrichment.resolve(isbn)
+    if not book_info or not book_info.get("title"):
         raise HTTPException(status_code=404, detail=f"ISBN '{isbn}' の書籍情報が見つかりませんでした")
 
-    existing_book = db.query(Book).filter(Book.isbn == isbn, Book.user_id == current_user.id).first()
+    existing_book = await run_in_threadpool(crud_book.get_book_by_isbn, db, current_user.id, isbn)
     if existing_book:
-        if existing_book.status == BookStatusEnum.OWNED:
-            raise HTTPException(status_code=400, detail="すでに所持しています。")
-        existing_book.status = BookStatusEnum.OWNED
-        db.commit()
-        db.refresh(existing_book)
-        return existing_book
+        return await run_in_threadpool(_promote_to_owned, db, existing_book)
 
-    volume = extract_volume(book_info["title"]) or ""
-    pub_date = parse_published_date(book_info.get("published_date"))
-    author = ", ".join(book_info.get("authors", [])) if isinstance(book_info.get("authors"), list) else book_info.get("authors", "")
+    new_book = _book_create_from_info(isbn, book_info)
+    db_book = await crud_book.create_book(db=db, book=new_book, user_id=current_user.id, enrichment=enrichment)
+    _record_provider_calls(response, enrichment)
+    return db_book
 
-    new_book = BookCreate(
-        title=book_info["title"],
-        volume=volume,
-        author=author,
-        publisher=book_info.get("publisher", ""),
-        cover_image_url=book_info.get("cover_image_url", ""),
-        published_date=pub_date,
+
+def _book_create_from_info(isbn: str, book_info: dict) -> BookCreate:
+    return BookCreate(
+        **crud_book.catalog_fields_from_info(book_info),
         status=BookStatusEnum.OWNED,
         isbn=isbn,
         is_favorite=False,
-        genres=book_info.get("genres", [])
     )
 
-    return crud_book.create_book(db=db, book=new_book, user_id=current_user.id)
+
+async def _resolve_isbn_metadata(isbn: str) -> dict | None:
+    # Google Books（キャッシュ経由）で見つからなければ楽天で ISBN 検索する
+    book_info = await get_book_info_cached(isbn)
+    if book_info:
+        return book_info
+
+    try:
+        candidates = await search_books_by_title_rakuten(isbn)
+    except ValueError:
+        return None
+    return next((c for c in candidates if normalize_isbn(c.get("isbn")) == isbn), None)
+
+
+@router.post("/books/register-by-isbn/batch", response_model=ISBNBatchResponse)
+async def register_books_by_isbn_batch(
+    payload: ISBNBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    results: dict[str, dict] = {}
+    isbns: list[str] = []
+    for raw in payload.isbns:
+        isbn = normalize_isbn(raw)
+        if isbn is None:
+            results[raw] = {"isbn": raw, "status": ISBNBatchStatus.NOT_FOUND, "detail": "ISBNとして解釈できません"}
+        elif isbn not in isbns:
+            isbns.append(isbn)
+
+    # 同期セッションでの DB 処理は run_in_threadpool で行い、外部APIの並行取得中もイベントループを止めない
+    existing = await run_in_threadpool(_load_batch_existing, db, current_user.id, payload.isbns, isbns, results)
+
+    # ✅ 未登録分の書籍情報を並行取得（同時実行数は BATCH_LOOKUP_CONCURRENCY まで）
+    missing = [isbn for isbn in isbns if isbn not in existing]
+    semaphore = asyncio.Semaphore(BATCH_LOOKUP_CONCURRENCY)
+
+    async def resolve(isbn: str):
+        async with semaphore:
+            return await _resolve_isbn_metadata(isbn)
+
+    infos = await asyncio.gather(*(resolve(isbn) for isbn in missing))
+
+    return await run_in_threadpool(
+        _save_batch, db, current_user.id, payload.isbns, dict(zip(missing, infos)), results
+    )
+
+
+def _load_batch_existing(db: Session, user_id: int, raw_isbns: list[str], isbns: list[str], results: dict) -> dict:
+    # ✅ 既存の書籍は1クエリでまとめて確認（ISBN-10 で登録された古いデータも考慮）
+    lookup_keys = set(isbns) | {raw.strip() for raw in raw_isbns}
+    existing_books = db.query(Book).filter(
+        Book.user_id == user_id,
+        Book.isbn.in_(lookup_keys)
+    ).all()
+    existing = {normalize_isbn(b.isbn): b for b in existing_books}
+
+    for isbn in isbns:
+        book = existing.get(isbn)
+        if not book:
+            continue
+        if book.status == BookStatusEnum.OWNED:
+            results[isbn] = {"isbn": isbn, "status": ISBNBatchStatus.ALREADY_OWNED, "book": book}
+        else:
+            book.status = BookStatusEnum.OWNED
+            results[isbn] = {"isbn": isbn, "status": ISBNBatchStatus.PROMOTED, "book": book}
+    return existing
+
+
+def _save_batch(db: Session, user_id: int, raw_isbns: list[str], infos: dict, results: dict) -> ISBNBatchResponse:
+    for isbn, book_info in infos.items():
+        if not book_info or not book_info.get("title"):
+            results[isbn] = {"isbn": isbn, "status": ISBNBatchStatus.NOT_FOUND,
+                             "detail": f"ISBN '{isbn}' の書籍情報が見つかりませんでした"}
+            continue
+        new_book, _ = crud_book.build_book(
+            db, _book_create_from_info(isbn, book_info).dict(), user_id, crud_book.catalog_fields_from_info(book_info)
+        )
+        results[isbn] = {"isbn": isbn, "status": ISBNBatchStatus.CREATED, "book": new_book}
+
+    # ✅ 新規登録と所持への変更を1トランザクションでまとめて反映
+    db.flush()
+    response = ISBNBatchResponse(results=[
+        ISBNBatchItem(
+            isbn=r["isbn"],
+            status=r["status"],
+            book=BookOut.model_validate(r["book"], from_attributes=True) if r.get("book") else None,
+            detail=r.get("detail"),
+        )
+        for r in (results[normalize_isbn(raw) or raw] for raw in dict.fromkeys(raw_isbns))
+    ])
+    db.commit()
+    return response
+
+def _promote_to_owned(db: Session, existing_book: Book) -> Book:
+    if existing_book.status == BookStatusEnum.OWNED:
+        raise HTTPException(status_code=400, detail="すでに所持しています。")
+    existing_book.status = BookStatusEnum.OWNED
+    db.commit()
+    db.refresh(existing_book)
+    return existing_book
 
 @router.post("/books/register-by-title", response_model=BookOut)
-def register_book_by_title(
+async def register_book_by_title(
     title: str,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    enrichment: BookEnrichmentContext = Depends(get_enrichment_context)
 ):
+    # ✅ 同じタイトルの本が登録済みなら外部APIを呼ばずに済ませる（(user_id, title_key) のインデックス検索1回）
+    existing_book = await run_in_threadpool(crud_book.get_book_by_title, db, current_user.id, title)
+    if existing_book:
+        return await run_in_threadpool(_promote_to_owned, db, existing_book)
+
     # ✅ タイトル検索（Google Books）
-    books = search_books_by_title(title)
+    # ISBN は後段の ensure_isbn_or_raise で補完するので、ここでは楽天補完を行わない
+    books = await search_books_by_title(title, supplement=False)
     if not books:
         raise HTTPException(status_code=404, detail=f"Google Booksに '{title}' の書籍が見つかりませんでした")
 
@@ -98,24 +266,15 @@ def register_book_by_title(
 
     # ✅ ISBN補完（必要であれば楽天APIを使用）
     try:
-        isbn = ensure_isbn_or_raise(book_data)
+        isbn = await ensure_isbn_or_raise(book_data)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
     # ✅ 既存書籍の確認
-    existing_book = db.query(Book).filter(
-        Book.isbn == isbn,
-        Book.user_id == current_user.id
-    ).first()
+    existing_book = await run_in_threadpool(crud_book.get_book_by_isbn, db, current_user.id, isbn)
 
     if existing_book:
-        if existing_book.status == BookStatusEnum.OWNED:
-            raise HTTPException(status_code=400, detail="すでに所持しています。")
-        elif existing_book.status in [BookStatusEnum.WISHLIST, BookStatusEnum.NOT_OWNED]:
-            existing_book.status = BookStatusEnum.OWNED
-            db.commit()
-            db.refresh(existing_book)
-            return existing_book
+        return await run_in_threadpool(_promote_to_owned, db, existing_book)
 
     # ✅ 新規登録
     volume = extract_volume(book_data["title"]) or ""
@@ -132,7 +291,7 @@ def register_book_by_title(
         volume=volume,
         author=author,
         publisher=book_data.get("publisher", "") or "",
-        cover_image_url=book_data.get("cover_image_url", "") or "https://example.com/default_cover.png",
+        cover_image_url=book_data.get("cover_image_url", "") or "",
         published_date=pub_date,
         status=BookStatusEnum.OWNED,
         isbn=isbn,
@@ -140,21 +299,29 @@ def register_book_by_title(
         genres=book_data.get("genres") or []
     )
 
-    return crud_book.create_book(db=db, book=new_book, user_id=current_user.id)
+    # 検索結果のメタデータを使い回し、create_book での再取得を防ぐ
+    enrichment.remember(isbn, book_data)
+    db_book = await crud_book.create_book(db=db, book=new_book, user_id=current_user.id, enrichment=enrichment)
+    _record_provider_calls(response, enrichment)
+    return db_book
 
 
 @router.post("/books/wishlist-register", response_model=BookOut)
-def register_to_wishlist(
+async def register_to_wishlist(
     book_data: dict,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     try:
-        isbn = ensure_isbn_or_raise(book_data)
+        isbn = await ensure_isbn_or_raise(book_data)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
-    existing_book = db.query(Book).filter(Book.isbn == isbn, Book.user_id == current_user.id).first()
+    return await run_in_threadpool(_save_wishlist_book, db, current_user.id, isbn, book_data)
+
+
+def _save_wishlist_book(db: Session, user_id: int, isbn: str, book_data: dict) -> Book:
+    existing_book = crud_book.get_book_by_isbn(db, user_id, isbn)
     if existing_book:
         if existing_book.status == BookStatusEnum.OWNED:
             raise HTTPException(status_code=400, detail="すでに所持しています。")
@@ -169,7 +336,7 @@ def register_to_wishlist(
     pub_date = parse_published_date(book_data.get("published_date"))
     author = ", ".join(book_data.get("authors", []))
 
-    new_book = Book(
+    new_book, _ = crud_book.build_book(db, dict(
         title=book_data.get("title", ""),
         volume=volume,
         author=author,
@@ -178,20 +345,78 @@ def register_to_wishlist(
         published_date=pub_date,
         status=BookStatusEnum.WISHLIST,
         is_favorite=False,
-        user_id=current_user.id,
         genres=book_data.get("genres", []),
         isbn=isbn
-    )
+    ), user_id)
 
-    db.add(new_book)
     db.commit()
     db.refresh(new_book)
     return new_book
 
 
+BookSort = Literal["id", "title", "author", "published_date"]
+# カーソルに入っている並び替えの値の検証・変換（id 順は id だけ）
+_BOOK_SORT_KEY_PARSERS = {"title": str_key, "author": str_key, "published_date": date.fromisoformat}
+
+
+# 一覧系はアクセスが多いので AsyncSession でイベントループ上のまま処理する
+# キーセットページング：続きがあれば X-Next-Cursor ヘッダーを返すので、次は同じ sort / order と一緒に ?cursor= に渡す
 @router.get("/me/books", response_model=List[BookOut])
-def get_my_books(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return crud_book.get_books_by_user_id_and_status(db, current_user.id, BookStatusEnum.OWNED)
+async def get_my_books(
+    response: Response,
+    cursor: str | None = Query(None, description="前のページの X-Next-Cursor"),
+    limit: int | None = Query(None, ge=1, le=LIST_PAGE_SIZE_MAX, description=f"1ページの件数（既定 {LIST_PAGE_SIZE}）"),
+    sort: BookSort = Query("id", description="並び順（id は登録順）"),
+    order: Literal["asc", "desc"] = Query("asc"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    return await _list_books_by_status(db, current_user, BookStatusEnum.OWNED, response, cursor, limit, sort, order)
+
+
+# ✅ GET /me/books/stats → ホーム画面用の件数（一覧を全ページ取得せずに集計だけ返す）
+@router.get("/me/books/stats")
+async def get_my_book_stats(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    return await crud_book.get_book_stats_async(db, current_user.id)
+
+
+async def _list_books_by_status(
+    db: AsyncSession,
+    current_user: User,
+    book_status: BookStatusEnum,
+    response: Response,
+    cursor: str | None,
+    limit: int | None,
+    sort: str = "id",
+    order: str = "asc",
+) -> list[Book]:
+    limit = page_limit(limit)
+    books = await crud_book.get_books_by_user_id_and_status_async(
+        db, current_user.id, book_status,
+        after=decode_keyset_cursor(cursor, _BOOK_SORT_KEY_PARSERS.get(sort)),
+        limit=limit + 1, sort=sort, descending=order == "desc",
+    )
+    return finish_page(response, books, limit, key=lambda book: crud_book.book_sort_key(book, sort))
+
+
+# ✅ GET /me/books/search?q= → 自分の本をタイトル・著者・出版社で検索（関連度順、limit/offset でページング）
+@router.get("/me/books/search", response_model=List[BookOut])
+def search_my_books(
+    q: str = Query(..., min_length=1, max_length=100),
+    book_status: BookStatusEnum | None = Query(None, alias="status", description="指定すると所持・ウィッシュリストなどで絞り込む"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    books = crud_book.search_books(db, current_user.id, q, status=book_status, limit=limit, offset=offset)
+    # ウィッシュリストの検索結果にも一覧と同じ購入リンクを付ける
+    if book_status == BookStatusEnum.WISHLIST:
+        _set_amazon_urls(books)
+    return books
 
 
 def isbn13_to_isbn10(isbn13: str) -> str | None:
@@ -204,28 +429,73 @@ def isbn13_to_isbn10(isbn13: str) -> str | None:
     check_digit = 'X' if remainder == 10 else str(remainder % 11)
     return core + check_digit
 
-@router.get("/me/wishlist", response_model=List[BookOut])
-def get_my_wishlist(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    books = crud_book.get_books_by_user_id_and_status(db, current_user.id, BookStatusEnum.WISHLIST)
+def _set_amazon_urls(books: list[Book]) -> None:
     for book in books:
-        isbn10 = isbn13_to_isbn10(book.isbn)
+        isbn10 = isbn13_to_isbn10(book.isbn) if book.isbn else None
         book.amazon_url = f"https://www.amazon.co.jp/dp/{isbn10}" if isbn10 else None
+
+
+@router.get("/me/wishlist", response_model=List[BookOut])
+async def get_my_wishlist(
+    response: Response,
+    cursor: str | None = Query(None, description="前のページの X-Next-Cursor"),
+    limit: int | None = Query(None, ge=1, le=LIST_PAGE_SIZE_MAX, description=f"1ページの件数（既定 {LIST_PAGE_SIZE}）"),
+    sort: BookSort = Query("id", description="並び順（id は登録順）"),
+    order: Literal["asc", "desc"] = Query("asc"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    books = await _list_books_by_status(db, current_user, BookStatusEnum.WISHLIST, response, cursor, limit, sort, order)
+    _set_amazon_urls(books)
     return books
 
 
 @router.get("/me/books/favorites", response_model=List[BookOut])
-def get_favorite_books(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return crud_book.get_favorite_books_by_user_id(db, current_user.id)
+async def get_favorite_books(
+    response: Response,
+    cursor: str | None = Query(None, description="前のページの X-Next-Cursor"),
+    limit: int | None = Query(None, ge=1, le=LIST_PAGE_SIZE_MAX, description=f"1ページの件数（既定 {LIST_PAGE_SIZE}）"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    limit = page_limit(limit)
+    books = await crud_book.get_favorite_books_by_user_id_async(
+        db, current_user.id, after_id=decode_id_cursor(cursor), limit=limit + 1
+    )
+    return finish_page(response, books, limit, key=lambda book: [book.id])
 
 
 @router.get("/search_book")
-def search_book(title: str):
-    return search_books_by_title(title)
+async def search_book(title: str):
+    return await search_books_by_title(title)
+
+
+# ✅ Google Books と楽天を並列に検索し、ISBN・タイトルで名寄せした結果を1回で返す
+@router.get("/search_book/unified")
+async def search_book_unified(
+    title: str,
+    budget: float = Query(UNIFIED_SEARCH_BUDGET, gt=0, le=10, description="各プロバイダの応答を待つ上限（秒）")
+):
+    return await search_books_unified(title, budget=budget)
+
+
+# ✅ 検索結果を先に返し、楽天でのISBN補完結果は解決した順に NDJSON で流す
+@router.get("/search_book/stream")
+async def search_book_stream(title: str):
+    books = await search_books_by_title(title, supplement=False)
+
+    async def generate():
+        yield json.dumps({"type": "results", "books": books}, ensure_ascii=False) + "\n"
+        async for index, isbn in stream_isbn_supplements(books):
+            yield json.dumps({"type": "isbn", "index": index, "isbn": isbn}) + "\n"
+        yield json.dumps({"type": "done"}) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 
 @router.get("/books/search_rakuten")
-def search_books_rakuten(title: str = Query(...), db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return search_books_by_title_rakuten(title)
+async def search_books_rakuten(title: str = Query(...), db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return await search_books_by_title_rakuten(title)
 
 
 @router.get("/books/{book_id}", response_model=BookOut)
@@ -239,8 +509,8 @@ def read_book(book_id: int, db: Session = Depends(get_db), current_user: User =
 
 
 @router.get("/fetch_book/{isbn}")
-def fetch_book(isbn: str):
-    book_info = fetch_book_info_by_isbn(isbn)
+async def fetch_book(isbn: str):
+    book_info = await get_book_info_cached(isbn)
     if book_info:
         return book_info
     raise HTTPException(status_code=404, detail="本が見つかりませんでした")
@@ -267,8 +537,7 @@ def delete_book_by_isbn(isbn: str, db: Session = Depends(get_db), current_user:
     book = db.query(Book).filter(Book.isbn == isbn, Book.user_id == current_user.id).first()
     if not book:
         raise HTTPException(status_code=404, detail="本が見つかりませんでした")
-    db.delete(book)
-    db.commit()
+    crud_book.delete_book(db, book)
 
 
 # ✅ PATCH: お気に入りトグル（ISBN指定）
@@ -340,8 +609,7 @@ def delete_book(book_id: int, db: Session = Depends(get_db), current_user: User
         raise HTTPException(status_code=404, detail="本が見つかりませんでした")
     if book.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="この書籍にはアクセスできません")
-    db.delete(book)
-    db.commit()
+    crud_book.delete_book(db, book)
 
 
 @router.put("/books/{title}/wishlist", response_model=BookOut)
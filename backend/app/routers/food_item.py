@@ -1,22 +1,39 @@
 import os
 from datetime import date, timedelta
-from urllib.parse import urlencode
+from typing import Literal
 import httpx
 
-import requests
-from app.core.auth import get_current_user
-from app.core.database import get_db
+from app.core.auth import get_current_user, get_current_user_async
+from app.core.database import get_async_db, get_db
 from app.crud import food_item as crud_food
 from app.models.food_item import FoodCategory
 from app.models.user import User
 from app.schemas.food_item import (FoodItemCreate, FoodItemRead,
                                    FoodUsageRequest)
-from app.services.hybrid_recipe import hybrid_recipe_suggestion
-from app.services.recipe_chatgpt import \
-    generate_recipe_focused_on_main_ingredient
-from app.services.validate_category import validate_food_category  # ✅ 追加
+from app.schemas.job import JobOut
+from app.services.http_client import provider_get
+from app.services.jancode import fetch_jancode_product
+from app.services.jobs import submit_job
+from app.services.pagination import (LIST_PAGE_SIZE, LIST_PAGE_SIZE_MAX,
+                                     decode_keyset_cursor, finish_page,
+                                     page_limit)
+from app.services.rakuten_genres import RakutenGenreError, get_genre_name
+from app.services.rate_limit import rakuten_bucket
+from app.services.hybrid_recipe import search_recipes_by_ingredients
+from app.services.recipe_cache import (canonical_ingredients,
+                                       get_recipe_suggestions_cached,
+                                       lookup_recipe_suggestions,
+                                       store_recipe_suggestions)
+from app.services.recipe_chatgpt import (
+    RECIPE_MODEL, build_main_ingredient_messages, build_recipe_messages,
+    generate_recipe_focused_on_main_ingredient, parse_recipe_json)
+from app.services.sse import (sse_event, sse_response,
+                              stream_completion_events)
+from app.services.food_category import check_food_category
 from dotenv import load_dotenv
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 router = APIRouter(prefix="/api", tags=["food_items"])
@@ -25,51 +42,13 @@ RAKUTEN_APP_ID = os.getenv("RAKUTEN_APP_ID")
 
 load_dotenv()  # 環境変数（.env）読み込み
 
-# 📦 共通関数（JANコードからJANCODE APIを呼び出して1件取得）
-def fetch_jancode_product(barcode: str) -> tuple[dict, str]:
-    app_id = os.getenv("JANCODE_API_KEY")
-    if not app_id:
-        raise HTTPException(status_code=500, detail="APIキー未設定")
-
-    url = "https://api.jancodelookup.com/"
-    params = {
-        "appId": app_id,
-        "query": barcode,
-        "hits": 1,
-        "page": 1,
-        "type": "code"
-    }
-    full_url = f"{url}?{urlencode(params)}"
-
-    try:
-        res = requests.get(url, params=params)
-        res.raise_for_status()
-        json_data = res.json()
-    except requests.RequestException:
-        raise HTTPException(status_code=502, detail="外部API接続失敗")
-    except ValueError:
-        raise HTTPException(status_code=502, detail="APIレスポンスがJSONではありません")
-
-    result = json_data.get("result") or json_data.get("product")
-
-    if not result:
-        raise HTTPException(status_code=404, detail={
-            "message": "商品が見つかりません（API上）",
-            "requested_url": full_url,
-            "web_fallback_url": f"https://www.jancodelookup.com/code/{barcode}",
-            "raw_api_response": json_data
-        })
-
-    return result[0], full_url
-
-
 # ✅ 1. GET /api/foods/lookup → 商品情報のプレビュー
 @router.get("/foods/lookup", summary="JANコードで商品情報を確認")
-def preview_food_info(
+async def preview_food_info(
     barcode: str = Query(..., min_length=8, max_length=13),
     current_user: User = Depends(get_current_user),
 ):
-    item, full_url = fetch_jancode_product(barcode)
+    item, full_url = await fetch_jancode_product(barcode)
     details = item.get("ProductDetails", {})
 
     print("JAN APIからの単品容量:", details.get("単品容量"))
@@ -112,10 +91,10 @@ def preview_food_info(
 
 # ✅ 2. GET /api/foods/lookup_name → 商品名だけ取得
 @router.get("/foods/lookup_name", summary="JANコードから商品名と単品容量を取得")
-def lookup_food_name(
+async def lookup_food_name(
     barcode: str = Query(..., min_length=8, max_length=13)
 ):
-    item, full_url = fetch_jancode_product(barcode)
+    item, full_url = await fetch_jancode_product(barcode)
     details = item.get("ProductDetails", {})
 
     name = item.get("itemName", "名称不明")
@@ -152,7 +131,7 @@ def create_food(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    if not validate_food_category(food.name, food.category.value):
+    if not check_food_category(food.name, food.category.value):
         if not force:
             # 確認メッセージだけ返す（登録はまだしない）
             raise HTTPException(
@@ -166,12 +145,41 @@ def create_food(
 
 
 # ✅ GET /api/me/foods
+# 一覧はアクセスが多いので AsyncSession でイベントループ上のまま処理する
+# 絞り込み・並び替えもサーバー側で行い、キーセットでページングする
+# 続きがあれば X-Next-Cursor ヘッダーを返すので、次は同じ条件と一緒に ?cursor= に渡す
 @router.get("/me/foods", response_model=list[FoodItemRead])
-def get_my_foods(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_my_foods(
+    response: Response,
+    cursor: str | None = Query(None, description="前のページの X-Next-Cursor"),
+    limit: int | None = Query(None, ge=1, le=LIST_PAGE_SIZE_MAX, description=f"1ページの件数（既定 {LIST_PAGE_SIZE}）"),
+    category: FoodCategory | None = Query(None),
+    q: str | None = Query(None, max_length=100, description="食品名の部分一致"),
+    expired: bool = Query(False, description="期限切れのものだけ"),
+    sort: Literal["id", "expiration_date"] = Query("id", description="並び順（id は登録順）"),
+    order: Literal["asc", "desc"] = Query("asc"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    limit = page_limit(limit)
+    parse_key = date.fromisoformat if sort == "expiration_date" else None
+    foods = await crud_food.get_food_items_by_user_id_async(
+        db, current_user.id, after=decode_keyset_cursor(cursor, parse_key), limit=limit + 1,
+        sort=sort, descending=order == "desc", category=category, name=(q or "").strip(),
+        expired_before=date.today() if expired else None,
+    )
+    return finish_page(response, foods, limit, key=lambda food: crud_food.food_sort_key(food, sort))
+
+
+# ✅ GET /api/me/foods/stats → ホーム画面用の件数（一覧を全ページ取得せずに集計だけ返す）
+@router.get("/me/foods/stats")
+async def get_my_food_stats(
+    days: int = 3,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    return crud_food.get_food_items_by_user_id(db, current_user.id)
+    today = date.today()
+    return await crud_food.get_food_stats_async(db, current_user.id, today, today + timedelta(days=days))
 
 
 # ✅ GET /api/foods/by_category
@@ -218,7 +226,14 @@ def get_hybrid_recipes(
     foods = crud_food.get_expiring_food_items(db, current_user.id, today, deadline)
     ingredients = [f.name for f in foods]
 
-    return hybrid_recipe_suggestion(ingredients)
+    return get_recipe_suggestions_cached(ingredients)
+
+
+def _generate_recipe_by_main_food(food_name: str) -> dict:
+    return {
+        "source": "chatgpt",
+        "recipes": [generate_recipe_focused_on_main_ingredient(food_name)]
+    }
 
 
 # ✅ GET /api/foods/recipe_by_main_food
@@ -235,10 +250,99 @@ def get_recipe_by_main_food(
     if food_name not in [item.name for item in expiring_foods]:
         raise HTTPException(status_code=404, detail="その食材は期限が近いものとして登録されていません")
 
-    return {
-        "source": "chatgpt",
-        "recipes": [generate_recipe_focused_on_main_ingredient(food_name)]
-    }
+    return _generate_recipe_by_main_food(food_name)
+
+
+# ✅ POST /api/foods/recipe_suggestions/jobs → バックグラウンドで提案を作り、ジョブIDを返す
+@router.post("/foods/recipe_suggestions/jobs", response_model=JobOut, status_code=202)
+def submit_hybrid_recipes(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    days: int = 3
+):
+    today = date.today()
+    deadline = today + timedelta(days=days)
+
+    foods = crud_food.get_expiring_food_items(db, current_user.id, today, deadline)
+    ingredients = [f.name for f in foods]
+
+    return submit_job("recipe_suggestions", current_user.id, get_recipe_suggestions_cached, ingredients).to_dict()
+
+
+# ✅ POST /api/foods/recipe_by_main_food/jobs → バックグラウンドでレシピを作り、ジョブIDを返す
+@router.post("/foods/recipe_by_main_food/jobs", response_model=JobOut, status_code=202)
+def submit_recipe_by_main_food(
+    food_name: str = Query(..., description="主材料とする食材名"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    today = date.today()
+    deadline = today + timedelta(days=3)
+    expiring_foods = crud_food.get_expiring_food_items(db, current_user.id, today, deadline)
+
+    if food_name not in [item.name for item in expiring_foods]:
+        raise HTTPException(status_code=404, detail="その食材は期限が近いものとして登録されていません")
+
+    return submit_job("recipe_by_main_food", current_user.id, _generate_recipe_by_main_food, food_name).to_dict()
+
+
+# ✅ GET /api/foods/recipe_suggestions/stream → SSE 版（キャッシュ・楽天は done のみ、ChatGPT はトークンを順に流す）
+@router.get("/foods/recipe_suggestions/stream")
+async def stream_hybrid_recipes(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    days: int = 3
+):
+    today = date.today()
+    deadline = today + timedelta(days=days)
+
+    # プロンプト用のデータとキャッシュは同期セッションなので、ストリームを始める前にスレッドで読む
+    foods = await run_in_threadpool(crud_food.get_expiring_food_items, db, current_user.id, today, deadline)
+    key, names = canonical_ingredients([f.name for f in foods])
+    cached = await run_in_threadpool(lookup_recipe_suggestions, key)
+
+    def finish(content: str) -> dict:
+        data = {"source": "chatgpt", "recipes": [parse_recipe_json(content)]}
+        store_recipe_suggestions(key, data)
+        return data
+
+    async def generate():
+        if cached is not None:
+            yield sse_event(cached, event="done")
+            return
+
+        rakuten_results = await run_in_threadpool(search_recipes_by_ingredients, names)
+        if rakuten_results:
+            data = {"source": "rakuten", "recipes": rakuten_results}
+            await run_in_threadpool(store_recipe_suggestions, key, data)
+            yield sse_event(data, event="done")
+            return
+
+        async for event in stream_completion_events(build_recipe_messages(names), RECIPE_MODEL, finish):
+            yield event
+
+    return sse_response(generate())
+
+
+# ✅ GET /api/foods/recipe_by_main_food/stream → SSE 版
+@router.get("/foods/recipe_by_main_food/stream")
+async def stream_recipe_by_main_food(
+    food_name: str = Query(..., description="主材料とする食材名"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    today = date.today()
+    deadline = today + timedelta(days=3)
+    expiring_foods = await run_in_threadpool(crud_food.get_expiring_food_items, db, current_user.id, today, deadline)
+
+    if food_name not in [item.name for item in expiring_foods]:
+        raise HTTPException(status_code=404, detail="その食材は期限が近いものとして登録されていません")
+
+    return sse_response(stream_completion_events(
+        build_main_ingredient_messages(food_name),
+        RECIPE_MODEL,
+        lambda content: {"source": "chatgpt", "recipes": [parse_recipe_json(content)]},
+    ))
 
 
 # ✅ GET /api/foods/{food_id}
@@ -298,7 +402,7 @@ def update_food(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    if not validate_food_category(food_update.name, food_update.category.value):
+    if not check_food_category(food_update.name, food_update.category.value):
         if not force:
             raise HTTPException(
                 status_code=409,
@@ -333,21 +437,21 @@ def get_stock_quantity(
     return {"quantity": food.quantity}
 
 @router.post("/foods/from_barcode_auto", summary="JANコードから食品登録（自動数量・単位）")
-def register_food_auto(
+async def register_food_auto(
     barcode: str = Query(..., min_length=8, max_length=13),
     category: FoodCategory = Query(..., description="カテゴリを明示的に指定（例: 飲料）"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     # 🔍 商品情報取得
-    item, _ = fetch_jancode_product(barcode)
+    item, _ = await fetch_jancode_product(barcode)
     from app.crud.food_item import extract_quantity_and_unit
 
     quantity, unit = extract_quantity_and_unit(item.get("ProductDetails", {}))
     food_name = item.get("itemName", "名称不明")
 
-    # ✅ OpenAIでカテゴリの妥当性をチェック
-    if not validate_food_category(food_name, category.value):
+    # ✅ カテゴリの妥当性をチェック（未知の食材のみOpenAI。同期処理なのでスレッドで実行）
+    if not await run_in_threadpool(check_food_category, food_name, category.value):
         raise HTTPException(
             status_code=400,
             detail=f"「{food_name}」は「{category.value}」に分類されません"
@@ -362,7 +466,7 @@ def register_food_auto(
         expiration_date=date.today() + timedelta(days=30)
     )
 
-    return crud_food.create_food_item(db, current_user.id, food)
+    return await run_in_threadpool(crud_food.create_food_item, db, current_user.id, food)
 
 @router.get("/foods/{food_id}/days_left", summary="賞味期限までの日数を取得")
 def get_days_until_expiration(
@@ -397,7 +501,7 @@ async def category_from_barcode(
 
     # ✅ Step 1: JANコード → 商品名
     try:
-        item, full_url = fetch_jancode_product(jan_code)
+        item, full_url = await fetch_jancode_product(jan_code)
         product_name = item.get("itemName", None)
         debug["product_name"] = product_name
     except HTTPException as e:
@@ -422,8 +526,15 @@ async def category_from_barcode(
         "format": "json"
     }
 
-    async with httpx.AsyncClient() as client:
-        search_res = await client.get(rakuten_search_url, params=rakuten_search_params)
+    await rakuten_bucket.acquire()
+    try:
+        search_res = await provider_get("rakuten_ichiba", rakuten_search_url, rakuten_search_params)
+    except httpx.HTTPError as e:
+        return {
+            "category": None,
+            "debug": debug,
+            "error": f"楽天商品検索API失敗（{e!r}）"
+        }
 
     if search_res.status_code != 200:
         return {
@@ -443,36 +554,14 @@ async def category_from_barcode(
     genre_id = search_data["Items"][0]["Item"]["genreId"]
     debug["genre_id"] = genre_id
 
-    # ✅ Step 3: ジャンルID → ジャンル名（ジャンル検索API ※バージョン修正）
-    genre_url = "https://app.rakuten.co.jp/services/api/IchibaGenre/Search/20140222"
-    genre_params = {
-        "applicationId": RAKUTEN_APP_ID,
-        "genreId": genre_id,
-        "format": "json"
-    }
-
-    async with httpx.AsyncClient() as client:
-        genre_res = await client.get(genre_url, params=genre_params)
-
-    if genre_res.status_code != 200:
-        return {
-            "category": None,
-            "debug": debug,
-            "error": f"楽天ジャンルAPI失敗（status {genre_res.status_code}）"
-        }
-
+    # ✅ Step 3: ジャンルID → ジャンル名（ローカルのジャンルツリーから引く。未知のIDのみAPI呼び出し）
     try:
-        genre_data = genre_res.json()
-        current = genre_data.get("current")
-        if isinstance(current, dict):
-            genre_name = current.get("genreName")
-        else:
-            genre_name = None
-    except Exception as e:
+        genre_name = await get_genre_name(genre_id)
+    except RakutenGenreError as e:
         return {
             "category": None,
             "debug": debug,
-            "error": f"ジャンルJSONの解析に失敗: {str(e)}"
+            "error": f"楽天ジャンルAPI失敗（{e}）"
         }
 
     debug["genre_name"] = genre_name
@@ -0,0 +1,22 @@
+# app/routers/jobs.py
+
+from app.core.auth import get_current_user
+from app.models.user import User
+from app.schemas.job import JobOut
+from app.services.jobs import JOB_MAX_WAIT, get_job
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+router = APIRouter()
+
+
+# ✅ GET /api/jobs/{job_id}?wait=秒 → ジョブの状態と結果（wait 指定時は完了まで待つ）
+@router.get("/jobs/{job_id}", response_model=JobOut)
+async def read_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=JOB_MAX_WAIT, description="完了するまで最大何秒待つか"),
+    current_user: User = Depends(get_current_user)
+):
+    job = await get_job(job_id, current_user.id, wait=wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="ジョブが見つからないか、保持期限が切れています")
+    return job.to_dict()
@@ -3,16 +3,20 @@
 from typing import List
 
 from app.core.database import get_db
+from app.crud import notification as crud_notification
 from app.models.notification import Notification
-from fastapi import APIRouter, Depends
+from app.services.pagination import (LIST_PAGE_SIZE, LIST_PAGE_SIZE_MAX,
+                                     decode_cursor, finish_page, page_limit)
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 router = APIRouter()
 
-from datetime import date
+from datetime import date, datetime
 
-from app.core.auth import get_current_user
-from app.core.database import get_db
+from app.core.auth import get_current_user_async
+from app.core.database import get_async_db
 from app.models.notification import Notification
 from app.models.user import User
 from fastapi import Depends
@@ -30,14 +34,30 @@ from fastapi import Depends
 #     return [n.message for n in notifications]
 
 
+def _decode_notification_cursor(cursor: str | None) -> tuple[datetime, int] | None:
+    values = decode_cursor(cursor, size=2)
+    if values is None:
+        return None
+    try:
+        return datetime.fromisoformat(values[0]), int(values[1])
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="cursor が不正です")
+
+
+# ポーリングされるので AsyncSession でイベントループ上のまま処理する
+# 新しい順（created_at, id）のキーセットページング：続きがあれば X-Next-Cursor ヘッダーを返す
 @router.get("/notifications", response_model=List[str])
-def get_notifications(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)  # 🔐 これが鍵の正体！
+async def get_notifications(
+    response: Response,
+    cursor: str | None = Query(None, description="前のページの X-Next-Cursor"),
+    limit: int | None = Query(None, ge=1, le=LIST_PAGE_SIZE_MAX, description=f"1ページの件数（既定 {LIST_PAGE_SIZE}）"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)  # 🔐 これが鍵の正体！
 ):
-    notifications = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).order_by(Notification.created_at.desc()).all()
+    limit = page_limit(limit)
+    rows = await crud_notification.get_unread_notifications_async(
+        db, current_user.id, after=_decode_notification_cursor(cursor), limit=limit + 1
+    )
 
-    return [n.message for n in notifications]
+    rows = finish_page(response, rows, limit, key=lambda row: [row.created_at.isoformat(), row.id])
+    return [row.message for row in rows]
@@ -1,6 +1,6 @@
-import os
-from openai import OpenAI
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 
@@ -8,19 +8,28 @@ from app.core.database import get_db
 from app.models.book import Book
 from app.models.user import User
 from app.core.auth import get_current_user  # JWT認証からユーザーを取得
+from app.schemas.job import JobOut
+from app.services.jobs import submit_job
+from app.services.local_recommender import recommend_local
+from app.services.openai_client import chat_completion
+from app.services.recommendation_cache import (get_cached_by_fingerprint,
+                                               get_cached_by_version,
+                                               get_stale_recommendation,
+                                               library_fingerprint,
+                                               record_refresh,
+                                               store_recommendation)
+from app.services.sse import sse_event, sse_response, stream_completion_events
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 router = APIRouter()
 
-@router.get("/recommendations/")
-def recommend_books(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    # ログイン中のユーザーが登録した本を取得
-    books = db.query(Book).filter(Book.user_id == current_user.id).limit(10).all()
+RECOMMENDATION_MODEL = "gpt-4"
+
+
+def _build_recommendation_messages(db: Session, current_user: User) -> list[dict]:
+    # ログイン中のユーザーが登録した本を取得（fingerprint が安定するよう順序を固定）
+    books = db.query(Book).filter(Book.user_id == current_user.id).order_by(Book.id).limit(10).all()
 
     if not books:
         raise HTTPException(status_code=404, detail="あなたの本のデータが見つかりません")
@@ -35,16 +44,115 @@ def recommend_books(
 
 {book_list}
 """
+    return [{"role": "user", "content": prompt}]
+
+
+def _generate_recommendations(messages: list[dict], user_id: int, library_version: int) -> dict:
+    response = chat_completion(
+        model=RECOMMENDATION_MODEL,
+        messages=messages,
+        temperature=0.7
+    )
+    recommendation = response.choices[0].message.content.strip()
+    store_recommendation(user_id, library_version, library_fingerprint(messages), recommendation)
+    return {"recommendations": recommendation}
+
+
+def _lookup_recommendations(db: Session, current_user: User, refresh: bool) -> tuple[dict | None, list[dict]]:
+    """(キャッシュ済みの推薦 or None, 生成に使うプロンプト) を返す"""
+    if refresh:
+        record_refresh()
+    else:
+        # 本棚が前回から変わっていなければ、書籍を読まずに返す
+        row = get_cached_by_version(db, current_user.id, current_user.library_version)
+        if row:
+            return {"recommendations": row.recommendations}, []
+
+    messages = _build_recommendation_messages(db, current_user)
+    if not refresh:
+        row = get_cached_by_fingerprint(db, current_user.id, current_user.library_version, library_fingerprint(messages))
+        if row:
+            return {"recommendations": row.recommendations}, messages
+    return None, messages
+
+
+@router.get("/recommendations/")
+def recommend_books(
+    response: Response,
+    refresh: bool = Query(False, description="キャッシュを使わずに生成し直す"),
+    source: Literal["llm", "local"] = Query("llm", description="local: 外部APIを使わず全ユーザーの本棚から推薦する"),
+    limit: int = Query(10, ge=1, le=50, description="source=local のときの件数"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if source == "local":
+        recommendations = recommend_local(current_user.id, limit)
+        if recommendations is None:
+            # 起動直後はエンジンを作り直している最中なので、少し待ってから再送してもらう
+            raise HTTPException(
+                status_code=503,
+                detail="ローカル推薦の準備中です。しばらくしてから再度お試しください",
+                headers={"Retry-After": "30"},
+            )
+        return {"source": "local", "recommendations": recommendations}
+
+    cached, messages = _lookup_recommendations(db, current_user, refresh)
+    if cached:
+        response.headers["X-Cache"] = "HIT"
+        return cached
 
+    response.headers["X-Cache"] = "MISS"
     try:
-        chat_completion = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
-        )
-        recommendation = chat_completion.choices[0].message.content.strip()
-        return {"recommendations": recommendation}
+        return _generate_recommendations(messages, current_user.id, current_user.library_version)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        # OpenAI の障害時は前回の推薦を返す（無ければエラー）
+        stale = get_stale_recommendation(db, current_user.id)
+        if stale is None:
+            raise HTTPException(status_code=500, detail=str(e))
+        response.headers["X-Cache"] = "STALE"
+        return {"recommendations": stale.recommendations}
+
+
+# ✅ POST /recommendations/jobs → バックグラウンドで生成し、ジョブIDを返す（結果は GET /jobs/{job_id}）
+# キャッシュ確認に同期セッションを使うので同期エンドポイントにする
+@router.post("/recommendations/jobs", response_model=JobOut, status_code=202)
+def submit_recommend_books(
+    refresh: bool = Query(False, description="キャッシュを使わずに生成し直す"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    cached, messages = _lookup_recommendations(db, current_user, refresh)
+    if cached:
+        # キャッシュ済みなら、外部APIを呼ばずにすぐ完了するジョブとして返す
+        return submit_job("recommendations", current_user.id, _return_cached, cached).to_dict()
+    return submit_job(
+        "recommendations", current_user.id,
+        _generate_recommendations, messages, current_user.id, current_user.library_version,
+    ).to_dict()
+
+
+async def _return_cached(cached: dict) -> dict:
+    return cached
+
+
+# ✅ GET /recommendations/stream → 生成されたテキストを SSE で順に返す
+@router.get("/recommendations/stream")
+async def stream_recommend_books(
+    refresh: bool = Query(False, description="キャッシュを使わずに生成し直す"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # キャッシュ確認とプロンプト用の書籍取得は同期セッションなので、ストリームを始める前にスレッドで行う
+    cached, messages = await run_in_threadpool(_lookup_recommendations, db, current_user, refresh)
+    if cached:
+        async def replay():
+            yield sse_event(cached, event="done")
+        return sse_response(replay())
+
+    user_id, library_version = current_user.id, current_user.library_version
+
+    def finish(content: str) -> dict:
+        store_recommendation(user_id, library_version, library_fingerprint(messages), content)
+        return {"recommendations": content}
+
+    return sse_response(stream_completion_events(messages, RECOMMENDATION_MODEL, finish, temperature=0.7))
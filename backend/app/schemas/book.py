@@ -1,5 +1,5 @@
 from datetime import date
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from enum import Enum as PyEnum  # enum.Enum を別名で使用
 
@@ -9,6 +9,11 @@ class BookStatusEnum(str, PyEnum):
     WISHLIST = "wishlist"
     NOT_OWNED = "not_owned"
 
+class BookEnrichmentStatusEnum(str, PyEnum):
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+
 # ✅ 共通の基本フィールド（空文字・空リストで一旦からOKな設計）
 class BookBase(BaseModel):
     title: str = ""
@@ -44,6 +49,7 @@ class BookOut(BookBase):
     id: int
     user_id: int
     amazon_url: Optional[str] = None  # ✅ 追加
+    enrichment_status: Optional[BookEnrichmentStatusEnum] = None
 
     class Config:
         orm_mode = True
@@ -51,3 +57,36 @@ class BookOut(BookBase):
 # ✅ ISBNだけ受け取るAPIリクエスト用
 class ISBNRequest(BaseModel):
     isbn: str
+
+
+# ✅ ISBN一括登録（箱買いした本をまとめてスキャンする用途）
+MAX_BATCH_ISBNS = 100
+
+
+class ISBNBatchRequest(BaseModel):
+    isbns: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_ISBNS)
+
+
+class ISBNBatchStatus(str, PyEnum):
+    CREATED = "created"  # 新規に所持登録した
+    PROMOTED = "promoted"  # ウィッシュリスト等から所持に変更した
+    ALREADY_OWNED = "already_owned"  # すでに所持している
+    NOT_FOUND = "not_found"  # 書籍情報が見つからない／ISBNとして不正
+
+
+class ISBNBatchItem(BaseModel):
+    isbn: str
+    status: ISBNBatchStatus
+    book: Optional[BookOut] = None
+    detail: Optional[str] = None
+
+
+class ISBNBatchResponse(BaseModel):
+    results: List[ISBNBatchItem]
+
+
+# ✅ バックグラウンド補完の状態確認用
+class BookEnrichmentOut(BaseModel):
+    book_id: int
+    enrichment_status: BookEnrichmentStatusEnum
+    book: BookOut
@@ -0,0 +1,157 @@
+# app/services/book_cache.py
+#
+# fetch_book_info_by_isbn の前段に置く 2 段キャッシュ
+#   1. プロセス内 LRU + TTL（サブミリ秒）
+#   2. book_metadata_cache テーブル（プロセス再起動・複数ワーカー間で共有）
+# どちらにも無い場合だけ Google Books API に問い合わせる。
+# DB キャッシュの読み書きは同期セッションなので、イベントループを止めないよう asyncio.to_thread で別スレッドに逃がす。
+
+import asyncio
+import copy
+import os
+from datetime import datetime, timedelta, timezone
+
+from app.core.database import SessionLocal
+from app.core.metrics import register_metrics
+from app.models.book_metadata_cache import BookMetadataCache
+from app.services.cache import TTLCache
+from app.services.google_books import (BookProviderError,
+                                       fetch_book_info_by_isbn,
+                                       lookup_book_info_by_isbn)
+from app.services.utils import normalize_isbn
+from dotenv import load_dotenv
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+load_dotenv()
+BOOK_CACHE_TTL = int(os.getenv("BOOK_CACHE_TTL", 60 * 60 * 24 * 30))  # 30日
+BOOK_CACHE_NEGATIVE_TTL = int(os.getenv("BOOK_CACHE_NEGATIVE_TTL", 60 * 60 * 6))  # 6時間
+BOOK_CACHE_MEMORY_TTL = int(os.getenv("BOOK_CACHE_MEMORY_TTL", 60 * 60))  # 1時間
+BOOK_CACHE_MAXSIZE = int(os.getenv("BOOK_CACHE_MAXSIZE", 10000))
+
+_MISSING = object()
+
+_memory = TTLCache(maxsize=BOOK_CACHE_MAXSIZE, ttl=BOOK_CACHE_MEMORY_TTL)
+_stats = {
+    "db_hits": 0,
+    "db_misses": 0,
+    "upstream_calls": 0,
+    "upstream_errors": 0,
+    "negative_stored": 0,
+    "stale_served": 0,
+    "invalidations": 0,
+}
+
+
+def _load_from_db(isbn: str, allow_stale: bool = False):
+    db = SessionLocal()
+    try:
+        row = db.get(BookMetadataCache, isbn)
+        if not row or (not allow_stale and row.expires_at <= datetime.now(timezone.utc)):
+            return _MISSING, None
+        return (row.data if row.found else None), row.expires_at
+    except SQLAlchemyError as e:
+        print(f"⚠️ 書籍キャッシュ読み込み失敗: {e}")
+        return _MISSING, None
+    finally:
+        db.close()
+
+
+def _store_to_db(isbn: str, data: dict | None, expires_at: datetime) -> None:
+    values = {
+        "isbn": isbn,
+        "data": data,
+        "found": data is not None,
+        "fetched_at": datetime.now(timezone.utc),
+        "expires_at": expires_at,
+    }
+    stmt = insert(BookMetadataCache).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[BookMetadataCache.isbn],
+        set_={k: v for k, v in values.items() if k != "isbn"},
+    )
+
+    db = SessionLocal()
+    try:
+        db.execute(stmt)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"⚠️ 書籍キャッシュ書き込み失敗: {e}")
+    finally:
+        db.close()
+
+
+def _remember(isbn: str, data: dict | None, expires_at: datetime) -> None:
+    remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+    if remaining > 0:
+        _memory.set(isbn, data, ttl=min(remaining, BOOK_CACHE_MEMORY_TTL))
+
+
+async def get_book_info_cached(isbn: str) -> dict | None:
+    """fetch_book_info_by_isbn と同じ結果をキャッシュ経由で返す"""
+    key = normalize_isbn(isbn)
+    if key is None:
+        # ISBN として解釈できない値はキャッシュせずにそのまま問い合わせる
+        return await fetch_book_info_by_isbn(isbn)
+
+    # ✅ 1段目：プロセス内キャッシュ
+    cached = _memory.get(key, _MISSING)
+    if cached is not _MISSING:
+        return copy.deepcopy(cached)
+
+    # ✅ 2段目：DB キャッシュ
+    data, expires_at = await asyncio.to_thread(_load_from_db, key)
+    if data is not _MISSING:
+        _stats["db_hits"] += 1
+        _remember(key, data, expires_at)
+        return copy.deepcopy(data)
+    _stats["db_misses"] += 1
+
+    # ✅ 3段目：Google Books API
+    _stats["upstream_calls"] += 1
+    try:
+        data = await lookup_book_info_by_isbn(key)
+    except BookProviderError as e:
+        # 通信失敗は「見つからない」とは違うのでキャッシュしない。期限切れのキャッシュがあればそれを返す
+        _stats["upstream_errors"] += 1
+        print("❌ APIリクエスト失敗:", e)
+        data, _ = await asyncio.to_thread(_load_from_db, key, True)
+        if data is not _MISSING:
+            _stats["stale_served"] += 1
+            return copy.deepcopy(data)
+        return None
+
+    ttl = BOOK_CACHE_TTL if data is not None else BOOK_CACHE_NEGATIVE_TTL
+    if data is None:
+        _stats["negative_stored"] += 1
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl)
+    await asyncio.to_thread(_store_to_db, key, data, expires_at)
+    _remember(key, data, expires_at)
+    return copy.deepcopy(data)
+
+
+def invalidate_book_cache(isbn: str) -> bool:
+    """指定 ISBN のキャッシュを両方の層から削除する"""
+    key = normalize_isbn(isbn)
+    if key is None:
+        return False
+
+    removed = _memory.delete(key)
+    db = SessionLocal()
+    try:
+        deleted = db.query(BookMetadataCache).filter(BookMetadataCache.isbn == key).delete()
+        db.commit()
+        removed = removed or deleted > 0
+    finally:
+        db.close()
+
+    _stats["invalidations"] += 1
+    return removed
+
+
+def get_book_cache_stats() -> dict:
+    return {"memory": _memory.stats(), **_stats}
+
+
+register_metrics("book_metadata_cache", get_book_cache_stats)
@@ -0,0 +1,182 @@
+# app/services/book_enrichment.py
+#
+# 「先に書き込み、後から補完」用のバックグラウンドワーカー。
+# POST /books?defer_enrichment=true で登録された書籍（enrichment_status=pending）について、
+# 外部APIからジャンル・表紙・出版社などを取得して catalog の行を更新する。
+# catalog は ISBN ごとに共有なので、同じ本を持つ全ユーザーに1回の補完で反映される。
+# 共有エントリがまだ無かった本（個人用エントリで登録済み）は、取得したデータで共有エントリを作って付け替える。
+
+import asyncio
+import os
+
+from app.core.database import SessionLocal
+from app.core.metrics import register_metrics
+from app.crud.book import catalog_fields_from_info, get_or_create_catalog
+from app.models.book import Book, BookEnrichmentStatusEnum
+from app.models.catalog import CATALOG_FIELDS, CatalogEntry
+from app.services.book_cache import get_book_info_cached
+from app.services.utils import normalize_title
+from dotenv import load_dotenv
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+load_dotenv()
+BOOK_ENRICHMENT_WORKERS = int(os.getenv("BOOK_ENRICHMENT_WORKERS", 2))
+
+_queue: asyncio.Queue | None = None
+_workers: list[asyncio.Task] = []
+# book_id → 補完完了を待っている呼び出し元に通知するイベント
+_events: dict[int, asyncio.Event] = {}
+_stats = {"enqueued": 0, "done": 0, "failed": 0}
+
+
+def _apply_book_info(catalog: CatalogEntry, book_info: dict) -> None:
+    # ユーザーが入力済みの値は上書きしない
+    if not catalog.genres and book_info.get("genres"):
+        catalog.genres = book_info["genres"]
+    if not catalog.cover_image_url and book_info.get("cover_image_url"):
+        catalog.cover_image_url = book_info["cover_image_url"]
+    if not catalog.publisher and book_info.get("publisher"):
+        catalog.publisher = book_info["publisher"]
+    if not catalog.author and book_info.get("authors"):
+        authors = book_info["authors"]
+        catalog.author = ", ".join(authors) if isinstance(authors, list) else authors
+
+
+def _link_shared_catalog(db: Session, book: Book, book_info: dict) -> None:
+    # 個人用エントリの本は、入力値が外部APIのデータと食い違わなければ共有エントリに付け替える
+    private = book.catalog
+    if private.isbn is not None or not book.isbn:
+        return
+    fields = {k: getattr(private, k) for k in CATALOG_FIELDS}
+    catalog, _ = get_or_create_catalog(db, book.isbn, fields, catalog_fields_from_info(book_info))
+    if catalog.isbn is None:
+        # 食い違う場合は今の個人用エントリのまま（get_or_create_catalog が返したコピーは使わない）
+        return
+    book.catalog = catalog
+    book.title_key = normalize_title(catalog.title)
+    db.delete(private)
+
+
+def _pending_isbn(book_id: int) -> tuple[bool, str | None, BookEnrichmentStatusEnum | None]:
+    """(補完待ちか, ISBN, 現在の状態) を返す"""
+    db = SessionLocal()
+    try:
+        book = db.get(Book, book_id)
+        if not book:
+            return False, None, None
+        return book.enrichment_status == BookEnrichmentStatusEnum.PENDING, book.isbn, book.enrichment_status
+    finally:
+        db.close()
+
+
+def _save_book_info(book_id: int, book_info: dict | None) -> BookEnrichmentStatusEnum | None:
+    db = SessionLocal()
+    try:
+        book = db.get(Book, book_id)
+        # 外部APIを待っている間に他のワーカーが補完し終えていれば何もしない
+        if not book or book.enrichment_status != BookEnrichmentStatusEnum.PENDING:
+            return book.enrichment_status if book else None
+
+        # Book 経由で代入すると個人用コピーが作られるので、catalog を直接書き換える
+        if book_info:
+            _link_shared_catalog(db, book, book_info)
+            _apply_book_info(book.catalog, book_info)
+            book.enrichment_status = BookEnrichmentStatusEnum.DONE
+            _stats["done"] += 1
+        else:
+            book.enrichment_status = BookEnrichmentStatusEnum.FAILED
+            _stats["failed"] += 1
+        db.commit()
+        return book.enrichment_status
+    finally:
+        db.close()
+
+
+async def enrich_book(book_id: int) -> BookEnrichmentStatusEnum | None:
+    # 同期セッションでの読み書きはイベントループを止めないよう asyncio.to_thread で行い、外部APIだけ await する
+    pending, isbn, current = await asyncio.to_thread(_pending_isbn, book_id)
+    if not pending:
+        return current
+
+    try:
+        book_info = await get_book_info_cached(isbn) if isbn else None
+    except Exception as e:
+        print(f"⚠️ 書籍補完失敗 (book_id={book_id}): {e}")
+        book_info = None
+
+    return await asyncio.to_thread(_save_book_info, book_id, book_info)
+
+
+async def _worker() -> None:
+    while True:
+        book_id = await _queue.get()
+        try:
+            await enrich_book(book_id)
+        except Exception as e:
+            print(f"❌ 書籍補完ワーカーでエラー (book_id={book_id}): {e}")
+        finally:
+            event = _events.pop(book_id, None)
+            if event:
+                event.set()
+            _queue.task_done()
+
+
+def enqueue_book_enrichment(book_id: int) -> None:
+    if _queue is None:
+        raise RuntimeError("書籍補完ワーカーが起動していません")
+    _events.setdefault(book_id, asyncio.Event())
+    _queue.put_nowait(book_id)
+    _stats["enqueued"] += 1
+
+
+async def wait_for_enrichment(book_id: int, timeout: float) -> bool:
+    """このプロセスのワーカーが補完を終えるまで最大 timeout 秒待つ（終われば True）"""
+    event = _events.get(book_id)
+    if event is None:
+        return True
+    try:
+        await asyncio.wait_for(event.wait(), timeout=timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+def start_enrichment_workers() -> None:
+    global _queue
+    if _queue is not None:
+        return
+    _queue = asyncio.Queue()
+    for _ in range(BOOK_ENRICHMENT_WORKERS):
+        _workers.append(asyncio.create_task(_worker()))
+
+    # 再起動前に補完されないまま残った書籍を拾い直す（同じ catalog を持つ書籍は1冊だけ）
+    db = SessionLocal()
+    try:
+        pending = db.query(func.min(Book.id)).select_from(Book).join(Book.catalog).filter(
+            CatalogEntry.enrichment_status == BookEnrichmentStatusEnum.PENDING
+        ).group_by(Book.catalog_id).all()
+    finally:
+        db.close()
+    for (book_id,) in pending:
+        enqueue_book_enrichment(book_id)
+
+
+async def stop_enrichment_workers() -> None:
+    global _queue
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _queue = None
+
+
+def get_enrichment_worker_stats() -> dict:
+    return {
+        **_stats,
+        "queue_depth": _queue.qsize() if _queue else 0,
+        "workers": len(_workers),
+    }
+
+
+register_metrics("book_enrichment_worker", get_enrichment_worker_stats)
@@ -0,0 +1,127 @@
+# app/services/book_search.py
+#
+# Google Books と楽天ブックスへのタイトル検索を並列に投げ、締め切り（budget 秒）までに
+# 返ってきた結果を ISBN / normalize_title で名寄せしてまとめて返す。
+# 片方が遅い・落ちている場合でも、もう片方の結果だけで応答できる。
+
+import asyncio
+import os
+
+from app.services.google_books import (normalize_title, search_books_by_title,
+                                       search_books_by_title_rakuten)
+from app.services.utils import normalize_isbn
+from dotenv import load_dotenv
+
+load_dotenv()
+UNIFIED_SEARCH_BUDGET = float(os.getenv("UNIFIED_SEARCH_BUDGET", 3.0))
+
+# 項目が複数プロバイダにある場合の優先順（先に書いたものを採用）
+PROVIDER_ORDER = ("google_books", "rakuten_books")
+
+
+def _authors(value) -> list[str]:
+    if not value:
+        return []
+    names = value if isinstance(value, list) else [value]
+    # 楽天は「著者A/著者B」の1文字列で返す
+    return [n.strip() for name in names for n in str(name).split("/") if n.strip()]
+
+
+def merge_search_results(results_by_provider: dict[str, list[dict]]) -> list[dict]:
+    """ISBN（無ければ正規化タイトル）が同じ本を1件にまとめる"""
+    merged: list[dict] = []
+    by_isbn: dict[str, dict] = {}
+    by_title: dict[str, dict] = {}
+
+    for provider in PROVIDER_ORDER:
+        for position, book in enumerate(results_by_provider.get(provider) or []):
+            isbn = normalize_isbn(book.get("isbn"))
+            title_key = normalize_title(book.get("title"))
+
+            entry = by_isbn.get(isbn) if isbn else None
+            if entry is None and title_key:
+                candidate = by_title.get(title_key)
+                # タイトルが同じでも ISBN が両方あって食い違う場合は別の本（別の版など）
+                if candidate is not None and not (isbn and candidate["isbn"] and candidate["isbn"] != isbn):
+                    entry = candidate
+            if entry is None:
+                entry = {
+                    "title": book.get("title") or "",
+                    "authors": [],
+                    "publisher": None,
+                    "published_date": None,
+                    "cover_image_url": None,
+                    "genres": [],
+                    "description": None,
+                    "isbn": None,
+                    "sources": [],
+                    "_position": position,
+                }
+                merged.append(entry)
+
+            for field in ("publisher", "published_date", "cover_image_url", "description"):
+                if not entry[field] and book.get(field):
+                    entry[field] = book[field]
+            if not entry["authors"]:
+                entry["authors"] = _authors(book.get("authors"))
+            if not entry["genres"] and book.get("genres"):
+                entry["genres"] = book["genres"]
+            if isbn and not entry["isbn"]:
+                entry["isbn"] = isbn
+                by_isbn[isbn] = entry
+            if provider not in entry["sources"]:
+                entry["sources"].append(provider)
+            entry["_position"] = min(entry["_position"], position)
+            if title_key:
+                by_title.setdefault(title_key, entry)
+
+    return merged
+
+
+def rank_search_results(books: list[dict], query: str) -> list[dict]:
+    query_key = normalize_title(query)
+
+    def score(book: dict) -> float:
+        title_key = normalize_title(book["title"])
+        value = 0.0
+        if title_key == query_key:
+            value += 3
+        elif title_key.startswith(query_key):
+            value += 2
+        elif query_key and query_key in title_key:
+            value += 1
+        value += 0.5 * (len(book["sources"]) - 1)  # 両方のプロバイダで見つかった本を優先
+        value += 0.5 if book["isbn"] else 0  # 登録できる本を優先
+        value += 0.25 if book["cover_image_url"] else 0
+        return value
+
+    ranked = sorted(books, key=lambda b: (-score(b), b["_position"]))
+    for book in ranked:
+        book.pop("_position", None)
+    return ranked
+
+
+async def search_books_unified(title: str, budget: float = UNIFIED_SEARCH_BUDGET) -> dict:
+    title = title.strip()
+    tasks = {
+        "google_books": asyncio.ensure_future(search_books_by_title(title, supplement=False)),
+        "rakuten_books": asyncio.ensure_future(search_books_by_title_rakuten(title)),
+    }
+    await asyncio.wait(tasks.values(), timeout=budget)
+
+    results: dict[str, list[dict]] = {}
+    providers: dict[str, str] = {}
+    for provider, task in tasks.items():
+        if not task.done():
+            # 締め切りに間に合わなかったプロバイダは打ち切る
+            task.cancel()
+            providers[provider] = "timeout"
+        elif task.exception() is not None:
+            print(f"❌ {provider} 検索失敗: {task.exception()!r}")
+            providers[provider] = "error"
+        else:
+            results[provider] = task.result()
+            providers[provider] = "ok"
+
+    books = rank_search_results(merge_search_results(results), title)
+    return {"books": books, "providers": providers}
@@ -0,0 +1,116 @@
+# app/services/circuit_breaker.py
+#
+# 外部プロバイダごとのサーキットブレーカー
+#   closed    : 通常どおり呼び出す。連続 CIRCUIT_FAILURE_THRESHOLD 回失敗すると open へ
+#   open      : CIRCUIT_RESET_TIMEOUT 秒間は呼び出さずに即座に失敗させる（ワーカーを待たせない）
+#   half_open : 時間経過後に1件だけ試し、成功すれば closed、失敗すれば再び open
+# 同期（スレッド）・非同期どちらの呼び出し元からも使えるよう threading.Lock で保護する。
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from app.core.metrics import register_metrics
+from dotenv import load_dotenv
+
+load_dotenv()
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", 30))
+
+
+class CircuitOpenError(Exception):
+    """ブレーカーが開いているため呼び出さなかった"""
+
+    def __init__(self, name: str):
+        super().__init__(f"{name} は一時的に利用できません（サーキットブレーカー作動中）")
+        self.name = name
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started_at = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"successes": 0, "failures": 0, "trips": 0, "rejected": 0, "last_trip_at": None}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        now = time.monotonic()
+        if self._state == "open" and now - self._opened_at >= self.reset_timeout:
+            self._state = "half_open"
+            self._probing = False
+        elif self._state == "half_open" and self._probing and now - self._probe_started_at >= self.reset_timeout:
+            # 試行中の呼び出しが結果を報告しないまま終わった（キャンセル等）場合は次の1件を通す
+            self._probing = False
+        return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True  # 試しに通すのは1件だけ
+                self._probe_started_at = time.monotonic()
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def check(self) -> None:
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._stats["successes"] += 1
+            self._failures = 0
+            self._state = "closed"
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._stats["failures"] += 1
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self._stats["trips"] += 1
+                    self._stats["last_trip_at"] = datetime.now(timezone.utc).isoformat()
+                    print(f"🔌 {self.name} のサーキットブレーカーが作動しました（{self.reset_timeout}秒間停止）")
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"state": self._current_state(), "consecutive_failures": self._failures, **self._stats}
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(name, CircuitBreaker(name))
+    return breaker
+
+
+def get_breaker_stats() -> dict:
+    return {name: breaker.stats() for name, breaker in sorted(_breakers.items())}
+
+
+register_metrics("circuit_breakers", get_breaker_stats)
@@ -0,0 +1,60 @@
+# app/services/enrichment.py
+#
+# 1リクエスト内で取得済みの書籍メタデータを CRUD 層まで持ち回すためのコンテキスト。
+# 同じ ISBN はリクエスト内で最大1回しかプロバイダ（キャッシュ含む）に問い合わせない。
+
+from collections import Counter
+
+from app.core.metrics import register_metrics
+from app.services.book_cache import get_book_info_cached
+from app.services.utils import normalize_isbn
+
+# 登録1件あたりのプロバイダ呼び出し回数の分布 {呼び出し回数: 登録件数}
+_calls_per_registration: Counter = Counter()
+
+
+class BookEnrichmentContext:
+    def __init__(self):
+        self._infos: dict[str, dict | None] = {}
+        self.provider_calls = 0
+
+    @staticmethod
+    def _key(isbn: str) -> str:
+        return normalize_isbn(isbn) or isbn.strip()
+
+    def remember(self, isbn: str, book_info: dict | None) -> None:
+        """検索結果など、すでに手元にあるメタデータを登録しておく"""
+        self._infos[self._key(isbn)] = book_info
+
+    async def resolve(self, isbn: str) -> dict | None:
+        key = self._key(isbn)
+        if key in self._infos:
+            return self._infos[key]
+
+        self.provider_calls += 1
+        book_info = await get_book_info_cached(isbn)
+        self._infos[key] = book_info
+        return book_info
+
+    def record_registration(self) -> int:
+        _calls_per_registration[self.provider_calls] += 1
+        return self.provider_calls
+
+
+# FastAPI 依存関数（リクエストごとに新しいコンテキストを作る）
+def get_enrichment_context() -> BookEnrichmentContext:
+    return BookEnrichmentContext()
+
+
+def get_enrichment_stats() -> dict:
+    registrations = sum(_calls_per_registration.values())
+    total_calls = sum(calls * n for calls, n in _calls_per_registration.items())
+    return {
+        "registrations": registrations,
+        "provider_calls": total_calls,
+        "avg_calls_per_registration": round(total_calls / registrations, 4) if registrations else 0.0,
+        "calls_per_registration": {str(k): v for k, v in sorted(_calls_per_registration.items())},
+    }
+
+
+register_metrics("book_enrichment", get_enrichment_stats)
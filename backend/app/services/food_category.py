@@ -0,0 +1,242 @@
+# app/services/food_category.py
+#
+# 食材カテゴリ判定の高速パス。OpenAI への問い合わせ（validate_food_category）は
+# 以下のどれでも判定できなかった「本当に新しい食材名」のときだけ行う。
+#   1. 判定結果キャッシュ（メモリ → food_category_verdicts テーブル）
+#   2. キーワードルール（「牛乳」→ 卵・乳製品 など）
+#   3. 過去に登録された食材の履歴（同じ名前がほぼ同じカテゴリで何度も登録されている）
+#   4. 履歴から学習したオフライン分類器（food_classifier、確信度がしきい値以上のときのみ）
+
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+
+from app.core.database import SessionLocal
+from app.core.metrics import register_metrics
+from app.models.food_category_verdict import FoodCategoryVerdict
+from app.models.food_item import FoodCategory, FoodItem
+from app.services.cache import TTLCache
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.validate_category import validate_food_category
+from dotenv import load_dotenv
+from openai import OpenAIError
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+load_dotenv()
+# 履歴で「確実」とみなす最低登録件数と、そのカテゴリが占める割合
+CATEGORY_HISTORY_MIN_COUNT = int(os.getenv("CATEGORY_HISTORY_MIN_COUNT", 3))
+CATEGORY_HISTORY_MIN_SHARE = float(os.getenv("CATEGORY_HISTORY_MIN_SHARE", 0.8))
+CATEGORY_HISTORY_REFRESH_SEC = int(os.getenv("CATEGORY_HISTORY_REFRESH_SEC", 600))
+
+# カテゴリごとの代表的なキーワード（食材名に含まれていれば、そのカテゴリは妥当とみなす）
+KEYWORD_RULES: dict[FoodCategory, list[str]] = {
+    FoodCategory.VEGETABLES: ["キャベツ", "レタス", "にんじん", "人参", "玉ねぎ", "たまねぎ", "じゃがいも",
+                              "トマト", "きゅうり", "なす", "ピーマン", "ほうれん草", "白菜", "大根",
+                              "ねぎ", "もやし", "ブロッコリー", "しいたけ", "しめじ", "えのき", "まいたけ", "きのこ"],
+    FoodCategory.FRUITS: ["りんご", "バナナ", "みかん", "いちご", "ぶどう", "もも", "メロン", "すいか",
+                          "キウイ", "グレープフルーツ", "レモン", "なし", "柿"],
+    FoodCategory.MEAT: ["豚肉", "牛肉", "鶏肉", "ひき肉", "挽肉", "豚バラ", "鶏もも", "鶏むね", "ささみ", "手羽"],
+    FoodCategory.SEAFOOD: ["鮭", "さけ", "まぐろ", "さば", "あじ", "いわし", "ぶり", "たら", "えび", "いか",
+                           "たこ", "あさり", "しじみ", "ほたて", "刺身"],
+    FoodCategory.DAIRY_EGGS: ["牛乳", "卵", "たまご", "玉子", "ヨーグルト", "チーズ", "バター", "生クリーム"],
+    FoodCategory.FROZEN: ["冷凍"],
+    FoodCategory.CANNED_RETORT: ["缶詰", "レトルト", "ツナ缶", "さば缶"],
+    FoodCategory.PROCESSED_MEAT: ["ハム", "ソーセージ", "ウインナー", "ベーコン", "サラミ"],
+    FoodCategory.SIDE_DISH: ["惣菜", "弁当", "コロッケ", "唐揚げ", "からあげ", "ポテトサラダ"],
+    FoodCategory.SNACKS: ["チョコ", "クッキー", "ポテトチップス", "ポテチ", "せんべい", "グミ", "ガム", "ビスケット"],
+    FoodCategory.STAPLE: ["米", "ごはん", "パン", "食パン", "うどん", "そば", "パスタ", "スパゲッティ", "ラーメン", "そうめん"],
+    FoodCategory.SEASONING: ["醤油", "しょうゆ", "味噌", "みそ", "砂糖", "マヨネーズ", "ケチャップ", "ソース",
+                             "みりん", "ドレッシング", "こしょう", "だし"],
+    FoodCategory.BEVERAGES: ["お茶", "緑茶", "麦茶", "コーヒー", "ジュース", "ミネラルウォーター", "炭酸水",
+                             "ビール", "ワイン", "コーラ", "サイダー"],
+}
+
+_MISSING = object()
+
+
+def normalize_food_name(name: str) -> str:
+    # 全角→半角、小文字化、空白・記号を除去
+    name = unicodedata.normalize("NFKC", name or "").lower()
+    return re.sub(r"[\s・、,.\-_/()（）「」【】\[\]]", "", name)
+
+
+# キーワード → カテゴリ（長いキーワードから順に照合するため長さ降順で保持）
+_keyword_index: list[tuple[str, FoodCategory]] = sorted(
+    ((normalize_food_name(k), c) for c, keywords in KEYWORD_RULES.items() for k in keywords),
+    key=lambda kc: len(kc[0]),
+    reverse=True,
+)
+
+
+def match_keyword_category(name_key: str) -> FoodCategory | None:
+    """食材名に含まれる最長のキーワードのカテゴリを返す（例：「牛乳」は「牛」ではなく卵・乳製品）"""
+    for keyword, category in _keyword_index:
+        if keyword in name_key:
+            return category
+    return None
+
+
+class _HistoryIndex:
+    """過去の food_items から name_key → カテゴリ件数 を集計した索引
+    集計し直すのは起動時とスケジューラーだけで、lookup はメモリ上の索引を引くだけ"""
+
+    def __init__(self):
+        self._counts: dict[str, Counter] = {}
+        self._loaded_at: float | None = None
+        self._lock = threading.Lock()
+
+    def reload(self) -> int:
+        # 同時に呼ばれても集計は1回だけ（実行中なら何もしない）
+        if not self._lock.acquire(blocking=False):
+            return len(self._counts)
+        try:
+            self._reload()
+        except SQLAlchemyError as e:
+            print(f"⚠️ 食材履歴の読み込み失敗: {e}")
+        finally:
+            self._lock.release()
+        return len(self._counts)
+
+    def _reload(self) -> None:
+        db = SessionLocal()
+        try:
+            rows = db.query(FoodItem.name, FoodItem.category, func.count()).filter(
+                FoodItem.category.isnot(None)
+            ).group_by(FoodItem.name, FoodItem.category).all()
+        finally:
+            db.close()
+
+        counts: dict[str, Counter] = defaultdict(Counter)
+        for name, category, n in rows:
+            counts[normalize_food_name(name)][category.value] += n
+        self._counts = counts
+        self._loaded_at = time.time()
+
+    def lookup(self, name_key: str) -> Counter | None:
+        # 読み込み前は履歴なしとして扱う（次の段階の判定に回す）
+        return self._counts.get(name_key)
+
+    def stats(self) -> dict:
+        return {"names": len(self._counts), "loaded_at": self._loaded_at}
+
+
+_history = _HistoryIndex()
+_verdicts = TTLCache(maxsize=20000, ttl=60 * 60 * 24)
+_stats = Counter()
+
+
+def refresh_food_history() -> int:
+    """食材履歴の索引を作り直す（起動時のスレッドとスケジューラーから呼ぶ。リクエスト中には呼ばない）"""
+    return _history.reload()
+
+
+def _history_verdict(name_key: str, category: str) -> bool | None:
+    counts = _history.lookup(name_key)
+    if not counts:
+        return None
+    total = sum(counts.values())
+    top_category, top_count = counts.most_common(1)[0]
+    if total < CATEGORY_HISTORY_MIN_COUNT or top_count / total < CATEGORY_HISTORY_MIN_SHARE:
+        return None
+    return top_category == category
+
+
+def _load_verdict(name_key: str, category: str):
+    db = SessionLocal()
+    try:
+        row = db.get(FoodCategoryVerdict, (name_key, category))
+        return row.verdict if row else _MISSING
+    except SQLAlchemyError as e:
+        print(f"⚠️ カテゴリ判定キャッシュ読み込み失敗: {e}")
+        return _MISSING
+    finally:
+        db.close()
+
+
+def _store_verdict(name_key: str, category: str, verdict: bool, source: str) -> None:
+    stmt = insert(FoodCategoryVerdict).values(
+        name_key=name_key, category=category, verdict=verdict, source=source
+    ).on_conflict_do_update(
+        index_elements=[FoodCategoryVerdict.name_key, FoodCategoryVerdict.category],
+        set_={"verdict": verdict, "source": source},
+    )
+    db = SessionLocal()
+    try:
+        db.execute(stmt)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"⚠️ カテゴリ判定キャッシュ書き込み失敗: {e}")
+    finally:
+        db.close()
+
+
+def check_food_category(food_name: str, category: str) -> bool:
+    """validate_food_category と同じ判定を、可能な限りローカルで返す"""
+    _stats["lookups"] += 1
+    name_key = normalize_food_name(food_name)
+    cache_key = (name_key, category)
+
+    # ✅ 1. 判定結果キャッシュ
+    verdict = _verdicts.get(cache_key, _MISSING)
+    if verdict is not _MISSING:
+        _stats["memory_hits"] += 1
+        return verdict
+    verdict = _load_verdict(name_key, category)
+    if verdict is not _MISSING:
+        _stats["db_hits"] += 1
+        _verdicts.set(cache_key, verdict)
+        return verdict
+
+    # ✅ 2. キーワードルール（一致した場合のみ確定。別カテゴリのキーワードでは否定しない）
+    if match_keyword_category(name_key) == FoodCategory(category):
+        _stats["rule_hits"] += 1
+        _verdicts.set(cache_key, True)
+        return True
+
+    # ✅ 3. 過去の登録履歴
+    verdict = _history_verdict(name_key, category)
+    if verdict is not None:
+        _stats["history_hits"] += 1
+        _verdicts.set(cache_key, verdict)
+        return verdict
+
+    # ✅ 4. オフライン分類器（再学習で判定が変わるのでキャッシュには載せない）
+    # food_classifier は KEYWORD_RULES を参照するため、循環 import を避けてここで読み込む
+    from app.services.food_classifier import classify_food_category
+    verdict = classify_food_category(food_name, category)
+    if verdict is not None:
+        _stats["classifier_hits"] += 1
+        return verdict
+
+    # ✅ 5. OpenAI に問い合わせ、結果を永続化
+    _stats["llm_calls"] += 1
+    try:
+        verdict = validate_food_category(food_name, category)
+    except (OpenAIError, CircuitOpenError) as e:
+        # OpenAI の障害で登録自体を止めないよう、判定できなかったものは妥当とみなす（永続化はしない）
+        print(f"⚠️ カテゴリ判定をスキップ（OpenAI 利用不可）: {e}")
+        _stats["llm_errors"] += 1
+        return True
+    _store_verdict(name_key, category, verdict, "llm")
+    _verdicts.set(cache_key, verdict)
+    return verdict
+
+
+def get_food_category_stats() -> dict:
+    lookups = _stats["lookups"]
+    local = lookups - _stats["llm_calls"]
+    return {
+        **_stats,
+        "hit_ratio": round(local / lookups, 4) if lookups else 0.0,
+        "memory": _verdicts.stats(),
+        "history": _history.stats(),
+    }
+
+
+register_metrics("food_category", get_food_category_stats)
@@ -0,0 +1,249 @@
+# app/services/food_classifier.py
+#
+# 食材名 → カテゴリのオフライン分類器（文字 n-gram の多項ナイーブベイズ）。
+# 学習データは自分たちの food_items の履歴 ＋ KEYWORD_RULES のキーワード。
+# 推論は辞書引きと足し算だけなので数十マイクロ秒で終わり、OpenAI は確信度が低いときだけ使う。
+
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Iterable
+
+from app.core.database import SessionLocal
+from app.core.metrics import register_metrics
+from app.models.food_item import FoodItem
+from app.services.food_category import KEYWORD_RULES, normalize_food_name
+from dotenv import load_dotenv
+from sqlalchemy import func
+
+load_dotenv()
+FOOD_CLASSIFIER_PATH = os.getenv(
+    "FOOD_CLASSIFIER_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "..", "data", "food_classifier.json"),
+)
+# この確信度以上なら分類器の判定を採用し、未満なら OpenAI にフォールバックする
+FOOD_CLASSIFIER_THRESHOLD = float(os.getenv("FOOD_CLASSIFIER_THRESHOLD", 0.85))
+NGRAM_SIZES = (1, 2, 3)
+
+
+def extract_ngrams(name_key: str) -> list[str]:
+    # 先頭・末尾を区別するため境界記号を付ける（「パン」と「パンツ」の区別など）
+    # 境界記号だけの n-gram はどの食材にも現れて情報がないので除く
+    padded = f"^{name_key}$"
+    grams = (padded[i:i + n] for n in NGRAM_SIZES for i in range(len(padded) - n + 1))
+    return [g for g in grams if g.strip("^$")]
+
+
+class FoodCategoryClassifier:
+    def __init__(self, alpha: float = 0.5):
+        self.alpha = alpha
+        self.class_counts: Counter = Counter()
+        self.ngram_counts: dict[str, Counter] = defaultdict(Counter)  # カテゴリ → n-gram 件数
+        self.ngram_totals: Counter = Counter()
+        self.vocabulary: set[str] = set()
+        self._log_prior: dict[str, float] = {}
+        self._log_unseen: dict[str, float] = {}
+
+    def fit(self, samples: Iterable[tuple[str, str, int]]) -> "FoodCategoryClassifier":
+        """samples: (食材名, カテゴリ値, 件数) の列"""
+        for name, category, weight in samples:
+            name_key = normalize_food_name(name)
+            if not name_key:
+                continue
+            self.class_counts[category] += weight
+            for gram in extract_ngrams(name_key):
+                self.ngram_counts[category][gram] += weight
+                self.ngram_totals[category] += weight
+                self.vocabulary.add(gram)
+        self._prepare()
+        return self
+
+    def _prepare(self) -> None:
+        total = sum(self.class_counts.values())
+        vocab_size = len(self.vocabulary) or 1
+        self._log_prior = {c: math.log(n / total) for c, n in self.class_counts.items()} if total else {}
+        self._log_unseen = {
+            c: math.log(self.alpha / (self.ngram_totals[c] + self.alpha * vocab_size))
+            for c in self.class_counts
+        }
+
+    def predict_proba(self, name: str) -> dict[str, float]:
+        grams = [g for g in extract_ngrams(normalize_food_name(name)) if g in self.vocabulary]
+        if not grams or not self._log_prior:
+            return {}
+
+        vocab_size = len(self.vocabulary)
+        scores = {}
+        for category, log_prior in self._log_prior.items():
+            counts = self.ngram_counts[category]
+            denominator = self.ngram_totals[category] + self.alpha * vocab_size
+            score = log_prior
+            for gram in grams:
+                count = counts.get(gram)
+                score += math.log((count + self.alpha) / denominator) if count else self._log_unseen[category]
+            scores[category] = score
+
+        # softmax で確率に変換
+        top = max(scores.values())
+        exp_scores = {c: math.exp(s - top) for c, s in scores.items()}
+        z = sum(exp_scores.values())
+        return {c: v / z for c, v in exp_scores.items()}
+
+    def predict(self, name: str) -> tuple[str | None, float]:
+        proba = self.predict_proba(name)
+        if not proba:
+            return None, 0.0
+        category = max(proba, key=proba.get)
+        return category, proba[category]
+
+    def to_dict(self) -> dict:
+        return {
+            "alpha": self.alpha,
+            "class_counts": dict(self.class_counts),
+            "ngram_counts": {c: dict(counts) for c, counts in self.ngram_counts.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FoodCategoryClassifier":
+        model = cls(alpha=data.get("alpha", 0.5))
+        model.class_counts = Counter(data["class_counts"])
+        for category, counts in data["ngram_counts"].items():
+            model.ngram_counts[category] = Counter(counts)
+            model.ngram_totals[category] = sum(counts.values())
+            model.vocabulary.update(counts)
+        model._prepare()
+        return model
+
+
+def load_training_samples() -> list[tuple[str, str, int]]:
+    """food_items の履歴（名前・カテゴリごとの件数）＋ キーワードルールを学習データにする"""
+    db = SessionLocal()
+    try:
+        rows = db.query(FoodItem.name, FoodItem.category, func.count()).filter(
+            FoodItem.name.isnot(None),
+            FoodItem.category.isnot(None)
+        ).group_by(FoodItem.name, FoodItem.category).all()
+    finally:
+        db.close()
+
+    samples = [(name, category.value, n) for name, category, n in rows]
+    samples += [(keyword, category.value, 1) for category, keywords in KEYWORD_RULES.items() for keyword in keywords]
+    return samples
+
+
+def train_classifier(samples: list[tuple[str, str, int]] | None = None) -> FoodCategoryClassifier:
+    return FoodCategoryClassifier().fit(samples if samples is not None else load_training_samples())
+
+
+def save_classifier(model: FoodCategoryClassifier, path: str = FOOD_CLASSIFIER_PATH) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(model.to_dict(), f, ensure_ascii=False)
+
+
+def evaluate_classifier(
+    samples: list[tuple[str, str, int]],
+    threshold: float = FOOD_CLASSIFIER_THRESHOLD,
+    test_ratio: float = 0.2,
+    seed: int = 42,
+) -> dict:
+    """食材名単位でホールドアウト分割し、精度・カバー率・推論時間を測る"""
+    by_name: dict[str, list] = defaultdict(list)
+    for sample in samples:
+        by_name[normalize_food_name(sample[0])].append(sample)
+    names = sorted(by_name)
+    random.Random(seed).shuffle(names)
+    split = max(1, int(len(names) * test_ratio))
+    test_names, train_names = names[:split], names[split:]
+
+    model = FoodCategoryClassifier().fit(s for n in train_names for s in by_name[n])
+    test = [s for n in test_names for s in by_name[n]]
+
+    correct = confident = confident_correct = 0
+    started = time.perf_counter()
+    for name, category, _ in test:
+        predicted, confidence = model.predict(name)
+        correct += predicted == category
+        if confidence >= threshold:
+            confident += 1
+            confident_correct += predicted == category
+    elapsed = time.perf_counter() - started
+
+    n = len(test) or 1
+    return {
+        "train_names": len(train_names),
+        "test_samples": len(test),
+        "accuracy": round(correct / n, 4),
+        "threshold": threshold,
+        "coverage": round(confident / n, 4),  # OpenAI を呼ばずに済む割合
+        "confident_accuracy": round(confident_correct / confident, 4) if confident else 0.0,
+        "avg_predict_us": round(elapsed / n * 1_000_000, 2),
+    }
+
+
+_model: FoodCategoryClassifier | None = None
+_model_lock = threading.Lock()
+_stats = Counter()
+
+
+def get_classifier() -> FoodCategoryClassifier | None:
+    """読み込み済みのモデルを返す（まだ無ければ None。リクエスト中に学習はしない）"""
+    return _model
+
+
+def load_classifier() -> dict:
+    """保存済みモデルを読み込む。無ければ DB から学習して保存する（起動時にバックグラウンドで呼ぶ）"""
+    global _model
+    with _model_lock:
+        if _model is not None:
+            return {"loaded": True}
+        if os.path.exists(FOOD_CLASSIFIER_PATH):
+            with open(FOOD_CLASSIFIER_PATH, encoding="utf-8") as f:
+                _model = FoodCategoryClassifier.from_dict(json.load(f))
+            print(f"📂 食材分類器を読み込みました: {FOOD_CLASSIFIER_PATH}")
+            return {"loaded": True}
+    print("⚠️ 保存済みの食材分類器が無いため学習します")
+    try:
+        return retrain_classifier()
+    except Exception as e:
+        # 学習できなくても分類器を使わないだけで、判定は OpenAI にフォールバックする
+        print(f"❌ 食材分類器の学習に失敗しました: {e}")
+        return {"loaded": False}
+
+
+def retrain_classifier() -> dict:
+    """DB から再学習して保存し、稼働中のモデルを差し替える"""
+    global _model
+    samples = load_training_samples()
+    model = train_classifier(samples)
+    save_classifier(model)
+    _model = model
+    _stats["retrained"] += 1
+    return {"samples": len(samples), "classes": len(model.class_counts), "vocabulary": len(model.vocabulary)}
+
+
+def classify_food_category(food_name: str, category: str) -> bool | None:
+    """確信度がしきい値以上なら妥当かどうかを返し、自信がなければ None を返す"""
+    model = get_classifier()
+    if model is None:
+        # 起動直後で読み込み・学習が終わっていなければ分類器は使わない
+        _stats["not_ready"] += 1
+        return None
+    predicted, confidence = model.predict(food_name)
+    _stats["predictions"] += 1
+    if predicted is None or confidence < FOOD_CLASSIFIER_THRESHOLD:
+        _stats["below_threshold"] += 1
+        return None
+    _stats["confident"] += 1
+    return predicted == category
+
+
+def get_classifier_stats() -> dict:
+    return {**_stats, "threshold": FOOD_CLASSIFIER_THRESHOLD, "loaded": _model is not None}
+
+
+register_metrics("food_classifier", get_classifier_stats)
@@ -1,16 +1,40 @@
+import asyncio
 import os
-import re
 import json
-import requests
-import unicodedata
-import time
+import httpx
 from dotenv import load_dotenv
-from typing import List
+from typing import AsyncIterator, List
+
+from app.services.cache import TTLCache
+from app.services.http_client import provider_get
+from app.services.rate_limit import rakuten_bucket
+from app.services.singleflight import SingleFlight
+from app.services.utils import normalize_title  # noqa: F401  従来どおり google_books からも import できる
 
 load_dotenv()
 API_KEY = os.getenv("GOOGLE_BOOKS_API_KEY")
 RAKUTEN_APP_ID = os.getenv("RAKUTEN_APP_ID")
 
+GOOGLE_BOOKS_URL = "https://www.googleapis.com/books/v1/volumes"
+RAKUTEN_BOOKS_URL = "https://app.rakuten.co.jp/services/api/BooksTotal/Search/20170404"
+
+# タイトル検索結果の ISBN 補完に使う時間の上限（秒）
+ISBN_SUPPLEMENT_BUDGET = float(os.getenv("ISBN_SUPPLEMENT_BUDGET", 2.0))
+ISBN_SUPPLEMENT_NEGATIVE_TTL = int(os.getenv("ISBN_SUPPLEMENT_NEGATIVE_TTL", 60 * 10))
+
+_MISSING = object()
+# normalize_title(タイトル) → 楽天で補完した ISBN（見つからなかった場合は None）
+# 一覧表示用の補完は部分一致で拾うので、登録に使う ISBN は完全一致したものだけを別に持つ
+_isbn_by_title = TTLCache(maxsize=5000, ttl=60 * 60 * 24)
+_isbn_by_exact_title = TTLCache(maxsize=5000, ttl=60 * 60 * 24)
+# 打ち切り後もバックグラウンドで走らせる補完タスク（GC されないよう参照を保持）
+_background_tasks: set[asyncio.Task] = set()
+
+# 同じタイトル・ISBNへの同時リクエストは1回の上流呼び出しにまとめる
+_title_search_flight = SingleFlight("google_books.search")
+_isbn_lookup_flight = SingleFlight("google_books.isbn")
+_rakuten_search_flight = SingleFlight("rakuten_books.search")
+
 
 def extract_isbn(volume_info: dict) -> str | None:
     for identifier in volume_info.get("industryIdentifiers", []):
@@ -19,12 +43,29 @@ def extract_isbn(volume_info: dict) -> str | None:
     return None
 
 
-def search_books_by_title(title: str):
-    url = f"https://www.googleapis.com/books/v1/volumes?q=intitle:{title}&maxResults=10"
+def _google_params(query: str, **extra) -> dict:
+    params = {"q": query, **extra}
     if API_KEY:
-        url += f"&key={API_KEY}"
+        params["key"] = API_KEY
+    return params
+
 
-    response = requests.get(url)
+async def search_books_by_title(title: str, supplement: bool = True):
+    title = title.strip()
+    results = await _title_search_flight.do(title, _search_books_by_title, title)
+    if supplement:
+        results = await supplement_isbn_with_rakuten(results)
+    return results
+
+
+async def _search_books_by_title(title: str):
+    try:
+        response = await provider_get(
+            "google_books", GOOGLE_BOOKS_URL, _google_params(f"intitle:{title}", maxResults=10)
+        )
+    except httpx.HTTPError as e:
+        print("❌ タイトル検索失敗:", repr(e))
+        return []
     if response.status_code != 200:
         print("❌ タイトル検索失敗:", response.status_code)
         return []
@@ -46,21 +87,34 @@ def search_books_by_title(title: str):
         }
         results.append(result)
 
-    # results = supplement_isbn_with_rakuten(results)
-
     return results
 
 
-def fetch_book_info_by_isbn(isbn: str):
-    url = f"https://www.googleapis.com/books/v1/volumes?q=isbn:{isbn}"
-    if API_KEY:
-        url += f"&key={API_KEY}"
+class BookProviderError(Exception):
+    """外部書籍APIの呼び出し自体が失敗した（「見つからない」とは区別する）"""
 
-    response = requests.get(url)
-    if response.status_code != 200:
-        print("❌ APIリクエスト失敗:", response.status_code)
+
+async def fetch_book_info_by_isbn(isbn: str):
+    try:
+        return await lookup_book_info_by_isbn(isbn)
+    except BookProviderError as e:
+        print("❌ APIリクエスト失敗:", e)
         return None
 
+
+async def lookup_book_info_by_isbn(isbn: str):
+    """見つからなければ None、通信に失敗した場合は BookProviderError"""
+    return await _isbn_lookup_flight.do(isbn, _lookup_book_info_by_isbn, isbn)
+
+
+async def _lookup_book_info_by_isbn(isbn: str):
+    try:
+        response = await provider_get("google_books", GOOGLE_BOOKS_URL, _google_params(f"isbn:{isbn}"))
+    except httpx.HTTPError as e:
+        raise BookProviderError(repr(e)) from e
+    if response.status_code != 200:
+        raise BookProviderError(f"status {response.status_code}")
+
     data = response.json()
     if "items" not in data:
         return None
@@ -89,11 +143,15 @@ def fetch_book_info_by_isbn(isbn: str):
     }
 
 
-def search_books_by_title_rakuten(title: str):
+async def search_books_by_title_rakuten(title: str):
     if not RAKUTEN_APP_ID:
         raise ValueError("RAKUTEN_APP_ID is not set in .env")
 
-    url = "https://app.rakuten.co.jp/services/api/BooksTotal/Search/20170404"
+    title = title.strip()
+    return await _rakuten_search_flight.do(title, _search_books_by_title_rakuten, title)
+
+
+async def _search_books_by_title_rakuten(title: str):
     params = {
         "format": "json",
         "keyword": title,
@@ -101,7 +159,12 @@ def search_books_by_title_rakuten(title: str):
         "hits": 20,
     }
 
-    response = requests.get(url, params=params)
+    await rakuten_bucket.acquire()
+    try:
+        response = await provider_get("rakuten_books", RAKUTEN_BOOKS_URL, params)
+    except httpx.HTTPError as e:
+        print("❌ Rakuten APIリクエスト失敗:", repr(e))
+        return []
     if response.status_code != 200:
         print("❌ Rakuten APIリクエスト失敗:", response.status_code)
         return []
@@ -127,55 +190,102 @@ def search_books_by_title_rakuten(title: str):
     return results
 
 
-def normalize_title(title: str) -> str:
-    if title is None:
-        return ""
-    # 全角→半角変換、記号・空白除去、小文字化
-    title = unicodedata.normalize("NFKC", title)
-    title = re.sub(r"[（）()\-\sー・　_]", "", title)  # よくある揺れの記号除去
-    title = title.lower()
-    return title.strip()
+def _remember_exact_isbn(key: str, rakuten_results: List[dict]) -> str | None:
+    matched = next(
+        (item for item in rakuten_results
+         if item.get("isbn") and normalize_title(item.get("title") or "") == key),
+        None
+    )
+    if matched:
+        _isbn_by_exact_title.set(key, matched["isbn"])
+        return matched["isbn"]
+    return None
 
 
-def supplement_isbn_with_rakuten(books: List[dict]) -> List[dict]:
-    supplemented_books = []
-    for book in books:
-        if book.get("isbn"):
-            supplemented_books.append(book)
-            continue
+async def _resolve_isbn_by_title(title: str) -> str | None:
+    key = normalize_title(title)
+    cached = _isbn_by_title.get(key, _MISSING)
+    if cached is not _MISSING:
+        return cached
 
-        title = book.get("title")
-        if not title:
-            supplemented_books.append(book)
-            continue
+    try:
+        rakuten_results = await search_books_by_title_rakuten(title)
+    except Exception as e:
+        print(f"⚠️ 楽天API失敗: {e}")
+        return None
 
-        try:
-            time.sleep(1.1)
-            rakuten_results = search_books_by_title_rakuten(title)
-        except Exception as e:
-            print(f"⚠️ 楽天API失敗: {e}")
-            supplemented_books.append(book)
+    _remember_exact_isbn(key, rakuten_results)
+    found_isbn = None
+    for item in rakuten_results:
+        rakuten_title = item.get("title")
+        isbn = item.get("isbn")
+        if key in normalize_title(rakuten_title) and isbn:
+            found_isbn = isbn
+            break
+
+    if found_isbn:
+        print(f"✅ ISBN補完成功: {title} → {found_isbn}")
+        _isbn_by_title.set(key, found_isbn)
+    else:
+        print(f"⚠️ 補完失敗: {title}")
+        _isbn_by_title.set(key, None, ttl=ISBN_SUPPLEMENT_NEGATIVE_TTL)
+    return found_isbn
+
+
+async def stream_isbn_supplements(books: List[dict]) -> AsyncIterator[tuple[int, str]]:
+    """ISBN が無い書籍を楽天APIで並行して補完し、解決した順に (index, isbn) を返す
+
+    楽天APIの呼び出し間隔は rakuten_bucket が制御するので、ここでは待たずに全件投入する。
+    キャッシュ済みのタイトルは API を呼ばずに即座に返る。
+    """
+    pending = {}
+    for index, book in enumerate(books):
+        if book.get("isbn") or not book.get("title"):
             continue
-
-        found_isbn = None
-        for item in rakuten_results:
-            rakuten_title = item.get("title")
-            isbn = item.get("isbn")
-            if normalize_title(title) in normalize_title(rakuten_title) and isbn:
-                found_isbn = isbn
-                break
-
-        if found_isbn:
-            print(f"✅ ISBN補完成功: {title} → {found_isbn}")
-            book["isbn"] = found_isbn
-        else:
-            print(f"⚠️ 補完失敗: {title}")
-
-        supplemented_books.append(book)
-
-    return supplemented_books
-
-def ensure_isbn_or_raise(book: dict) -> str:
+        cached = _isbn_by_title.get(normalize_title(book["title"]), _MISSING)
+        if cached is not _MISSING:
+            if cached:
+                book["isbn"] = cached
+                yield index, cached
+            continue
+        task = asyncio.ensure_future(_resolve_isbn_by_title(book["title"]))
+        pending[task] = index
+
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = pending.pop(task)
+                isbn = task.result()
+                if isbn:
+                    books[index]["isbn"] = isbn
+                    yield index, isbn
+    finally:
+        # 途中で打ち切られても残りのタスクは走らせ続け、結果をキャッシュに残す
+        for task in pending:
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+
+
+async def supplement_isbn_with_rakuten(books: List[dict], budget: float | None = None) -> List[dict]:
+    """ISBN を補完した書籍リストを返す（budget 秒を超えたら補完済みの分だけで返す）"""
+    budget = ISBN_SUPPLEMENT_BUDGET if budget is None else budget
+    stream = stream_isbn_supplements(books)
+
+    async def consume():
+        async for _ in stream:
+            pass
+
+    try:
+        await asyncio.wait_for(consume(), timeout=budget)
+    except asyncio.TimeoutError:
+        print(f"⏱️ ISBN補完を {budget} 秒で打ち切りました（残りはバックグラウンドで継続）")
+    finally:
+        await stream.aclose()
+
+    return books
+
+async def ensure_isbn_or_raise(book: dict) -> str:
     isbn = book.get("isbn")
     if isbn:
         return isbn
@@ -184,15 +294,17 @@ def ensure_isbn_or_raise(book: dict) -> str:
     if not title:
         raise ValueError("タイトルがありません。ISBNを補完できません。")
 
-    rakuten_results = search_books_by_title_rakuten(title)
-    matched = next(
-        (item for item in rakuten_results
-         if normalize_title(item["title"]) == normalize_title(title)),
-        None
-    )
+    # 検索結果と比較するキーは1回だけ計算する。完全一致で補完済みのタイトルなら楽天APIを呼ばない
+    key = normalize_title(title)
+    cached = _isbn_by_exact_title.get(key)
+    if cached:
+        book["isbn"] = cached
+        return cached
 
-    if matched and matched.get("isbn"):
-        isbn = matched["isbn"]
+    rakuten_results = await search_books_by_title_rakuten(title)
+    isbn = _remember_exact_isbn(key, rakuten_results)
+
+    if isbn:
         book["isbn"] = isbn  # 更新
         print(f"✅ ISBN補完成功: {title} → {isbn}")
         return isbn
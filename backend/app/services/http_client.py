@@ -0,0 +1,120 @@
+# app/services/http_client.py
+#
+# 外部APIプロバイダ共通の非同期HTTPクライアント
+# プロセス内で1つの httpx.AsyncClient を使い回し、keep-alive 接続を再利用する。
+
+import asyncio
+import os
+import random
+from dataclasses import dataclass
+
+import httpx
+from app.services.circuit_breaker import get_breaker
+from dotenv import load_dotenv
+
+load_dotenv()
+
+try:
+    import h2  # noqa: F401  HTTP/2 は h2 がインストールされている場合のみ有効
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# 再試行する HTTP ステータス
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+@dataclass(frozen=True)
+class ProviderConfig:
+    timeout: float = 5.0  # 1リクエスト全体のタイムアウト（秒）
+    connect_timeout: float = 3.0
+    retries: int = 2  # 初回を除いた再試行回数
+    backoff: float = 0.3  # 指数バックオフの基準秒数
+
+
+PROVIDERS: dict[str, ProviderConfig] = {
+    "google_books": ProviderConfig(
+        timeout=float(os.getenv("GOOGLE_BOOKS_TIMEOUT", 5)),
+        retries=int(os.getenv("GOOGLE_BOOKS_RETRIES", 2)),
+    ),
+    "rakuten_books": ProviderConfig(
+        timeout=float(os.getenv("RAKUTEN_TIMEOUT", 5)),
+        retries=int(os.getenv("RAKUTEN_RETRIES", 2)),
+        backoff=1.0,  # 楽天は 1req/秒 制限があるので長めに待つ
+    ),
+    "rakuten_ichiba": ProviderConfig(
+        timeout=float(os.getenv("RAKUTEN_TIMEOUT", 5)),
+        retries=int(os.getenv("RAKUTEN_RETRIES", 2)),
+        backoff=1.0,
+    ),
+    "jancode": ProviderConfig(
+        timeout=float(os.getenv("JANCODE_TIMEOUT", 5)),
+        retries=int(os.getenv("JANCODE_RETRIES", 1)),
+    ),
+}
+
+_client: httpx.AsyncClient | None = None
+
+
+class ProviderUnavailableError(httpx.TransportError):
+    """サーキットブレーカーが開いているため送信しなかった（通信エラーと同じ扱いになる）"""
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", 100)),
+                max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", 20)),
+                keepalive_expiry=30.0,
+            ),
+            follow_redirects=True,
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def provider_get(provider: str, url: str, params: dict | None = None) -> httpx.Response:
+    """プロバイダごとのタイムアウト・再試行設定で GET する
+
+    通信エラーと RETRY_STATUS_CODES は指数バックオフで再試行し、
+    最後まで失敗した場合は最後のレスポンスを返すか例外を送出する。
+    失敗が続いたプロバイダはサーキットブレーカーにより一定時間すぐに
+    ProviderUnavailableError を送出する（呼び出し元は通信エラーとして扱える）。
+    """
+    config = PROVIDERS.get(provider, ProviderConfig())
+    timeout = httpx.Timeout(config.timeout, connect=config.connect_timeout)
+    client = get_http_client()
+    breaker = get_breaker(provider)
+    if not breaker.allow():
+        raise ProviderUnavailableError(f"{provider} は一時的に利用できません（サーキットブレーカー作動中）")
+
+    for attempt in range(config.retries + 1):
+        is_last = attempt == config.retries
+        try:
+            response = await client.get(url, params=params, timeout=timeout)
+            if response.status_code not in RETRY_STATUS_CODES:
+                breaker.record_success()
+                return response
+            if is_last:
+                breaker.record_failure()
+                return response
+            print(f"⚠️ {provider} status {response.status_code}、再試行します（{attempt + 1}回目）")
+        except httpx.TransportError as e:
+            if is_last:
+                breaker.record_failure()
+                raise
+            print(f"⚠️ {provider} 通信エラー: {e!r}、再試行します（{attempt + 1}回目）")
+
+        # ジッター付き指数バックオフ
+        await asyncio.sleep(config.backoff * (2 ** attempt) * (1 + random.random() * 0.5))
+
+    raise RuntimeError("unreachable")
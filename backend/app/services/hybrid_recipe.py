@@ -3,12 +3,16 @@
 import os
 
 import requests
+from app.services.circuit_breaker import get_breaker
 from app.services.recipe_chatgpt import generate_recipe_with_chatgpt
 from dotenv import load_dotenv
 
 load_dotenv()
 APP_ID = os.getenv("RAKUTEN_APP_ID")
 SEARCH_URL = "https://app.rakuten.co.jp/services/api/Recipe/RecipeSearch/20170426"
+# (接続, 読み取り) タイムアウト秒
+RAKUTEN_RECIPE_TIMEOUT = (3.0, float(os.getenv("RAKUTEN_TIMEOUT", 5)))
+rakuten_recipe_breaker = get_breaker("rakuten_recipe")
 
 def search_recipes_by_ingredients(ingredients: list[str]) -> list[dict]:
     if not ingredients:
@@ -24,13 +28,23 @@ def search_recipes_by_ingredients(ingredients: list[str]) -> list[dict]:
         "hits": 5
     }
 
+    # 楽天が落ちている間は問い合わせずに ChatGPT 側へ回す
+    if not rakuten_recipe_breaker.allow():
+        return []
+
     try:
-        res = requests.get(SEARCH_URL, params=params, timeout=10)
+        res = requests.get(SEARCH_URL, params=params, timeout=RAKUTEN_RECIPE_TIMEOUT)
         res.raise_for_status()
         data = res.json()
     except Exception as e:
         print(f"🛑 Rakuten API Error: {e}")
+        # 400系（キーワード不正など）は楽天側の障害ではないのでブレーカーには数えない
+        if isinstance(e, requests.HTTPError) and e.response.status_code < 500 and e.response.status_code != 429:
+            rakuten_recipe_breaker.record_success()
+        else:
+            rakuten_recipe_breaker.record_failure()
         return []
+    rakuten_recipe_breaker.record_success()
 
     return [
         {
@@ -0,0 +1,250 @@
+# app/services/jancode.py
+#
+# JANコード → 商品情報の読み取り（read-through キャッシュ付き）
+#   1. プロセス内 LRU + TTL
+#   2. jan_products テーブル（API結果のキャッシュ ＋ 一括インポートした商品マスタ）
+#   3. JANCODE API
+# 一括インポートした商品は期限なしで保持するので、よく買う食品はネットワークに出ずに解決できる。
+# jan_products の読み書きは同期セッションなので、fetch_jancode_product からは asyncio.to_thread で呼ぶ。
+
+import asyncio
+import copy
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+from urllib.parse import urlencode
+
+import httpx
+from app.core.database import SessionLocal
+from app.core.metrics import register_metrics
+from app.models.jan_product import JanProduct
+from app.services.cache import TTLCache
+from app.services.http_client import provider_get
+from app.services.singleflight import SingleFlight
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+load_dotenv()
+JANCODE_API_URL = "https://api.jancodelookup.com/"
+JAN_CACHE_TTL = int(os.getenv("JAN_CACHE_TTL", 60 * 60 * 24 * 30))  # 30日
+JAN_CACHE_NEGATIVE_TTL = int(os.getenv("JAN_CACHE_NEGATIVE_TTL", 60 * 60 * 6))  # 6時間
+JAN_CACHE_MEMORY_TTL = int(os.getenv("JAN_CACHE_MEMORY_TTL", 60 * 60))
+JAN_CACHE_MAXSIZE = int(os.getenv("JAN_CACHE_MAXSIZE", 10000))
+
+_MISSING = object()
+
+# 同じバーコードの同時スキャンは1回の上流呼び出しにまとめる
+_jancode_flight = SingleFlight("jancode")
+_memory = TTLCache(maxsize=JAN_CACHE_MAXSIZE, ttl=JAN_CACHE_MEMORY_TTL)
+_stats = {
+    "lookups": 0,
+    "db_hits": 0,
+    "upstream_calls": 0,
+    "upstream_errors": 0,
+    "stale_served": 0,
+    "imported": 0,
+}
+
+
+def _build_url(barcode: str) -> str:
+    params = {
+        "appId": os.getenv("JANCODE_API_KEY"),
+        "query": barcode,
+        "hits": 1,
+        "page": 1,
+        "type": "code"
+    }
+    return f"{JANCODE_API_URL}?{urlencode(params)}"
+
+
+def _not_found(barcode: str) -> HTTPException:
+    return HTTPException(status_code=404, detail={
+        "message": "商品が見つかりません（API上）",
+        "requested_url": _build_url(barcode),
+        "web_fallback_url": f"https://www.jancodelookup.com/code/{barcode}",
+        "raw_api_response": None
+    })
+
+
+def _load_from_db(barcode: str, allow_stale: bool = False):
+    db = SessionLocal()
+    try:
+        row = db.get(JanProduct, barcode)
+        if not row:
+            return _MISSING, None
+        if not allow_stale and row.expires_at is not None and row.expires_at <= datetime.now(timezone.utc):
+            return _MISSING, None
+        return (row.item if row.found else None), row.expires_at
+    except SQLAlchemyError as e:
+        print(f"⚠️ JAN商品キャッシュ読み込み失敗: {e}")
+        return _MISSING, None
+    finally:
+        db.close()
+
+
+def _upsert_rows(rows: list[dict]) -> None:
+    stmt = insert(JanProduct).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[JanProduct.jan_code],
+        set_={
+            "item": stmt.excluded.item,
+            "found": stmt.excluded.found,
+            "source": stmt.excluded.source,
+            "fetched_at": stmt.excluded.fetched_at,
+            "expires_at": stmt.excluded.expires_at,
+        },
+    )
+    db = SessionLocal()
+    try:
+        db.execute(stmt)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _store(barcode: str, item: dict | None) -> None:
+    ttl = JAN_CACHE_TTL if item is not None else JAN_CACHE_NEGATIVE_TTL
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl)
+    try:
+        _upsert_rows([{
+            "jan_code": barcode,
+            "item": item,
+            "found": item is not None,
+            "source": "api",
+            "fetched_at": datetime.now(timezone.utc),
+            "expires_at": expires_at,
+        }])
+    except SQLAlchemyError as e:
+        print(f"⚠️ JAN商品キャッシュ書き込み失敗: {e}")
+    _memory.set(barcode, item, ttl=min(ttl, JAN_CACHE_MEMORY_TTL))
+
+
+# 📦 共通関数（JANコードから商品情報を1件取得）
+async def fetch_jancode_product(barcode: str) -> tuple[dict, str]:
+    barcode = barcode.strip()
+    _stats["lookups"] += 1
+
+    item = _memory.get(barcode, _MISSING)
+    if item is _MISSING:
+        item, expires_at = await asyncio.to_thread(_load_from_db, barcode)
+        if item is not _MISSING:
+            _stats["db_hits"] += 1
+            ttl = JAN_CACHE_MEMORY_TTL
+            if expires_at is not None:
+                ttl = min(ttl, (expires_at - datetime.now(timezone.utc)).total_seconds())
+            _memory.set(barcode, item, ttl=ttl)
+
+    if item is _MISSING:
+        # 見つからなかった場合は _fetch_and_store が 404 を送出する
+        item = await _jancode_flight.do(barcode, _fetch_and_store, barcode)
+    elif item is None:
+        raise _not_found(barcode)
+
+    return copy.deepcopy(item), _build_url(barcode)
+
+
+async def _fetch_and_store(barcode: str) -> dict:
+    _stats["upstream_calls"] += 1
+    try:
+        item = await _fetch_jancode_product(barcode)
+    except HTTPException as e:
+        # 外部APIの障害時は、期限切れでも以前取得できた商品情報を返す
+        if e.status_code == 502:
+            stale, _ = await asyncio.to_thread(_load_from_db, barcode, True)
+            if stale is not _MISSING and stale is not None:
+                _stats["stale_served"] += 1
+                return stale
+        raise
+    await asyncio.to_thread(_store, barcode, item)
+    if item is None:
+        raise _not_found(barcode)
+    return item
+
+
+async def _fetch_jancode_product(barcode: str) -> dict | None:
+    app_id = os.getenv("JANCODE_API_KEY")
+    if not app_id:
+        raise HTTPException(status_code=500, detail="APIキー未設定")
+
+    params = {
+        "appId": app_id,
+        "query": barcode,
+        "hits": 1,
+        "page": 1,
+        "type": "code"
+    }
+
+    try:
+        res = await provider_get("jancode", JANCODE_API_URL, params)
+        res.raise_for_status()
+        json_data = res.json()
+    except httpx.HTTPError:
+        _stats["upstream_errors"] += 1
+        raise HTTPException(status_code=502, detail="外部API接続失敗")
+    except ValueError:
+        _stats["upstream_errors"] += 1
+        raise HTTPException(status_code=502, detail="APIレスポンスがJSONではありません")
+
+    result = json_data.get("result") or json_data.get("product")
+    return result[0] if result else None
+
+
+def bulk_import_jan_products(items: Iterable[dict], batch_size: int = 1000) -> int:
+    """商品マスタ（JANCODE API の商品オブジェクト形式）を jan_products に取り込む"""
+    now = datetime.now(timezone.utc)
+    count = 0
+    batch: dict[str, dict] = {}
+
+    def flush():
+        if batch:
+            _upsert_rows(list(batch.values()))
+            batch.clear()
+
+    for item in items:
+        code = str(item.get("codeNumber") or "").strip()
+        if not code:
+            continue
+        batch[code] = {
+            "jan_code": code,
+            "item": item,
+            "found": True,
+            "source": "import",
+            "fetched_at": now,
+            "expires_at": None,
+        }
+        _memory.delete(code)
+        count += 1
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    _stats["imported"] += count
+    return count
+
+
+def invalidate_jan_cache(barcode: str) -> bool:
+    barcode = barcode.strip()
+    removed = _memory.delete(barcode)
+    db = SessionLocal()
+    try:
+        deleted = db.query(JanProduct).filter(JanProduct.jan_code == barcode).delete()
+        db.commit()
+    finally:
+        db.close()
+    return removed or deleted > 0
+
+
+def get_jancode_stats() -> dict:
+    memory = _memory.stats()
+    lookups = _stats["lookups"]
+    local_hits = memory["hits"] + _stats["db_hits"]
+    return {
+        "memory": memory,
+        **_stats,
+        "local_hit_ratio": round(local_hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+register_metrics("jan_products", get_jancode_stats)
@@ -0,0 +1,209 @@
+# app/services/jobs.py
+#
+# 重い処理（LLM 呼び出し・複数プロバイダへの問い合わせ）用のプロセス内ジョブキュー
+#   submit_job() → ジョブIDをすぐ返す → GET /api/jobs/{job_id}?wait=秒 で結果を取得
+# 同期関数は専用のスレッドプールで実行するので、FastAPI の同期エンドポイント用スレッドプールを食い潰さない。
+# 結果は JOB_RESULT_TTL 秒だけメモリに保持する（プロセス再起動で消える。外部のキューサーバーは不要）。
+
+import asyncio
+import inspect
+import os
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from app.core.metrics import register_metrics
+from dotenv import load_dotenv
+
+load_dotenv()
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+JOB_QUEUE_MAXSIZE = int(os.getenv("JOB_QUEUE_MAXSIZE", 100))
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", 60 * 10))  # 10分
+# ロングポーリングで待てる最大秒数
+JOB_MAX_WAIT = float(os.getenv("JOB_MAX_WAIT", 30))
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    user_id: int
+    fn: Callable
+    args: tuple
+    status: str = "queued"  # queued / running / done / failed
+    result: Any = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    done_event: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def to_dict(self) -> dict:
+        def iso(ts):
+            return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": iso(self.created_at),
+            "started_at": iso(self.started_at),
+            "finished_at": iso(self.finished_at),
+        }
+
+
+_queue: asyncio.Queue | None = None
+_loop: asyncio.AbstractEventLoop | None = None
+_workers: list[asyncio.Task] = []
+_executor: ThreadPoolExecutor | None = None
+_jobs: dict[str, Job] = {}
+_stats = {"submitted": 0, "done": 0, "failed": 0, "rejected": 0, "expired": 0}
+# 直近のキュー待ち時間・実行時間（秒）
+_wait_times: deque = deque(maxlen=500)
+_run_times: deque = deque(maxlen=500)
+
+
+def _purge_expired() -> None:
+    now = time.time()
+    expired = [j.id for j in _jobs.values() if j.finished_at and now - j.finished_at > JOB_RESULT_TTL]
+    for job_id in expired:
+        del _jobs[job_id]
+    _stats["expired"] += len(expired)
+
+
+async def _run(job: Job) -> None:
+    job.status = "running"
+    job.started_at = time.time()
+    _wait_times.append(job.started_at - job.created_at)
+    try:
+        if inspect.iscoroutinefunction(job.fn):
+            job.result = await job.fn(*job.args)
+        else:
+            loop = asyncio.get_running_loop()
+            job.result = await loop.run_in_executor(_executor, job.fn, *job.args)
+        job.status = "done"
+        _stats["done"] += 1
+    except Exception as e:
+        print(f"❌ ジョブ失敗 ({job.kind}, job_id={job.id}): {e!r}")
+        job.status = "failed"
+        job.error = str(e)
+        _stats["failed"] += 1
+    finally:
+        job.finished_at = time.time()
+        _run_times.append(job.finished_at - job.started_at)
+        job.done_event.set()
+
+
+async def _put(job: Job) -> None:
+    _queue.put_nowait(job)
+
+
+def _enqueue(job: Job) -> None:
+    # asyncio.Queue はスレッドセーフではないので、同期エンドポイント（スレッドプール）からはイベントループ側で入れる
+    try:
+        on_loop = asyncio.get_running_loop() is _loop
+    except RuntimeError:
+        on_loop = False
+    if on_loop:
+        _queue.put_nowait(job)
+    else:
+        asyncio.run_coroutine_threadsafe(_put(job), _loop).result()
+
+
+async def _worker() -> None:
+    while True:
+        job = await _queue.get()
+        try:
+            await _run(job)
+        finally:
+            _queue.task_done()
+
+
+def submit_job(kind: str, user_id: int, fn: Callable, *args) -> Job:
+    """ジョブを登録して即座に返す（fn は同期関数・async 関数のどちらでもよい。同期エンドポイントからも呼べる）"""
+    if _queue is None:
+        raise RuntimeError("ジョブワーカーが起動していません")
+    _purge_expired()
+
+    job = Job(id=uuid.uuid4().hex, kind=kind, user_id=user_id, fn=fn, args=args)
+    try:
+        _enqueue(job)
+    except asyncio.QueueFull:
+        _stats["rejected"] += 1
+        raise JobQueueFullError("ジョブキューが満杯です")
+    _jobs[job.id] = job
+    _stats["submitted"] += 1
+    return job
+
+
+async def get_job(job_id: str, user_id: int, wait: float = 0) -> Job | None:
+    """自分のジョブを返す。wait 秒まで完了を待つ（ロングポーリング）"""
+    _purge_expired()
+    job = _jobs.get(job_id)
+    if job is None or job.user_id != user_id:
+        return None
+    if wait > 0 and not job.done_event.is_set():
+        try:
+            await asyncio.wait_for(job.done_event.wait(), timeout=min(wait, JOB_MAX_WAIT))
+        except asyncio.TimeoutError:
+            pass
+    return job
+
+
+def start_job_workers() -> None:
+    global _queue, _executor, _loop
+    if _queue is not None:
+        return
+    _loop = asyncio.get_running_loop()
+    _queue = asyncio.Queue(maxsize=JOB_QUEUE_MAXSIZE)
+    _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+    for _ in range(JOB_WORKERS):
+        _workers.append(asyncio.create_task(_worker()))
+
+
+async def stop_job_workers() -> None:
+    global _queue, _executor
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _queue = None
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _summary(values: deque) -> dict:
+    if not values:
+        return {"avg": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    return {
+        "avg": round(sum(ordered) / len(ordered), 4),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+def get_job_stats() -> dict:
+    return {
+        **_stats,
+        "queue_depth": _queue.qsize() if _queue else 0,
+        "running": sum(1 for j in _jobs.values() if j.status == "running"),
+        "retained": len(_jobs),
+        "workers": len(_workers),
+        "wait_seconds": _summary(_wait_times),
+        "run_seconds": _summary(_run_times),
+    }
+
+
+register_metrics("jobs", get_job_stats)
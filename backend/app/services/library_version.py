@@ -0,0 +1,52 @@
+# app/services/library_version.py
+#
+# books の追加・更新・削除をセッションの flush 時に検知し、所有ユーザーの users.library_version を +1 する。
+# crud/book・routers/book のどこから変更しても（バックグラウンド補完を含め）漏れなく反映される。
+# 共有 catalog のメタデータが変わった場合は、その catalog を参照している全ユーザーを +1 する。
+
+from app.models.book import Book
+from app.models.catalog import CatalogEntry
+from app.models.user import User
+from sqlalchemy import event, or_, select, update
+from sqlalchemy.orm import Session
+
+_CHANGED_USERS_KEY = "library_changed_user_ids"
+_CHANGED_CATALOGS_KEY = "library_changed_catalog_ids"
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_libraries(session: Session, flush_context, instances) -> None:
+    user_ids = session.info.setdefault(_CHANGED_USERS_KEY, set())
+    for obj in session.new:
+        if isinstance(obj, Book) and obj.user_id is not None:
+            user_ids.add(obj.user_id)
+    for obj in session.deleted:
+        if isinstance(obj, Book):
+            user_ids.add(obj.user_id)
+    for obj in session.dirty:
+        if isinstance(obj, Book) and session.is_modified(obj, include_collections=False):
+            user_ids.add(obj.user_id)
+        elif isinstance(obj, CatalogEntry) and obj.id is not None and session.is_modified(obj, include_collections=False):
+            session.info.setdefault(_CHANGED_CATALOGS_KEY, set()).add(obj.id)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_library_versions(session: Session, flush_context) -> None:
+    user_ids = session.info.pop(_CHANGED_USERS_KEY, None) or set()
+    catalog_ids = session.info.pop(_CHANGED_CATALOGS_KEY, None)
+    conditions = []
+    if user_ids:
+        conditions.append(User.__table__.c.id.in_(user_ids))
+    if catalog_ids:
+        books = Book.__table__
+        conditions.append(User.__table__.c.id.in_(
+            select(books.c.user_id).where(books.c.catalog_id.in_(catalog_ids))
+        ))
+    if not conditions:
+        return
+    # ORM を介さず同じトランザクション内で更新する（commit / rollback は本の変更と一緒）
+    session.connection().execute(
+        update(User.__table__)
+        .where(or_(*conditions))
+        .values(library_version=User.__table__.c.library_version + 1)
+    )
@@ -0,0 +1,333 @@
+# app/services/local_recommender.py
+#
+# 外部 LLM を使わないローカル推薦エンジン（/recommendations/?source=local）
+# 全ユーザーの books をシリーズ単位（タイトルから巻数を除いたもの）の「アイテム」にまとめ、
+#   - 協調フィルタリング: 同じユーザーが持っているアイテム同士の共起数（疎な dict）
+#   - コンテンツ類似度: 著者・出版社・ジャンルの一致度（IDF 重み付き、上位 CONTENT_NEIGHBORS 件を事前計算）
+# を足し合わせてスコアを付ける。行列は起動時（スレッド）と毎晩まとめて作り直し、
+# 本の追加・更新（所有状態・お気に入り）・削除はコミット時に差分だけ反映する
+# （書誌情報の変更による特徴・近傍の変化は次の作り直しで反映）。
+# 共起数は NumPy / scipy の疎行列ではなく dict of Counter で持つ。依存を増やさずに済み、
+# 1冊ごとの差分更新も行・列の再確保なしで行えるため。
+
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from itertools import chain
+
+from app.core.database import SessionLocal
+from app.core.metrics import register_metrics
+from app.models.book import Book, BookStatusEnum
+from app.services.utils import extract_volume
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+load_dotenv()
+LOCAL_RECOMMEND_CF_WEIGHT = float(os.getenv("LOCAL_RECOMMEND_CF_WEIGHT", 1.0))
+LOCAL_RECOMMEND_CONTENT_WEIGHT = float(os.getenv("LOCAL_RECOMMEND_CONTENT_WEIGHT", 0.5))
+# 事前計算するコンテンツ類似アイテムの件数
+CONTENT_NEIGHBORS = int(os.getenv("LOCAL_RECOMMEND_CONTENT_NEIGHBORS", 20))
+# これより多くのアイテムが持つ特徴（「コミック」など）は類似度計算に使わない
+CONTENT_MAX_DF = int(os.getenv("LOCAL_RECOMMEND_CONTENT_MAX_DF", 500))
+FAVORITE_WEIGHT = 2.0
+
+_BOOK_CHANGES_KEY = "local_recommender_book_changes"
+
+
+def series_key(title: str) -> str:
+    """タイトルから巻数表記を除いて正規化したもの（同じシリーズの別巻を1アイテムにまとめる）"""
+    title = unicodedata.normalize("NFKC", title or "")
+    volume = extract_volume(title)
+    if volume:
+        title = re.sub(rf"[第\s(（]*{re.escape(volume)}[\s)）]*巻?", "", title, count=1)
+    title = re.sub(r"[（）()\-\sー・　_:：]", "", title).lower()
+    return title.strip()
+
+
+def _features(author: str | None, publisher: str | None, genres) -> set[str]:
+    features = set()
+    for name in re.split(r"[,、/／]", author or ""):
+        if name.strip():
+            features.add("a:" + re.sub(r"\s", "", name))
+    if publisher:
+        features.add("p:" + re.sub(r"\s", "", publisher))
+    for genre in genres or []:
+        if genre:
+            features.add("g:" + str(genre))
+    return features
+
+
+def _snapshot(book: Book) -> dict:
+    return {
+        "id": book.id,
+        "user_id": book.user_id,
+        "title": book.title,
+        "author": book.author,
+        "publisher": book.publisher,
+        "genres": list(book.genres or []),
+        "isbn": book.isbn,
+        "cover_image_url": book.cover_image_url,
+        "status": book.status,
+        "is_favorite": bool(book.is_favorite),
+    }
+
+
+class LocalRecommender:
+    def __init__(self):
+        self.user_items: dict[int, dict[str, float]] = defaultdict(dict)
+        # (ユーザー, アイテム) → 本の id → 重み（同じシリーズの複数巻のうち最大の重みを user_items に使う）
+        self.user_item_books: dict[tuple[int, str], dict[int, float]] = defaultdict(dict)
+        self.book_items: dict[int, tuple[int, str]] = {}
+        self.item_users: dict[str, set[int]] = defaultdict(set)
+        self.cooccurrence: dict[str, Counter] = defaultdict(Counter)
+        self.item_meta: dict[str, dict] = {}
+        self.item_features: dict[str, set[str]] = {}
+        self.feature_items: dict[str, set[str]] = defaultdict(set)
+        self.content_neighbors: dict[str, list[tuple[str, float]]] = {}
+        self.built_at: float | None = None
+
+    # --- 構築・差分更新 ---
+
+    def add_book(self, book: dict, update_neighbors: bool = True) -> None:
+        # 更新時は前の状態（所有状態・お気に入り・シリーズ）を取り除いてから入れ直す
+        self.remove_book(book["id"])
+        item = series_key(book["title"])
+        if not item:
+            return
+
+        self.item_meta[item] = {k: book[k] for k in ("title", "author", "publisher", "genres", "isbn", "cover_image_url")}
+        features = _features(book["author"], book["publisher"], book["genres"])
+        is_new_item = item not in self.item_features
+        self.item_features[item] = self.item_features.get(item, set()) | features
+        for feature in features:
+            self.feature_items[feature].add(item)
+
+        # 「持っていない」本は共起には数えず、推薦候補からの除外にだけ使う
+        user_id = book["user_id"]
+        weight = 0.0 if book["status"] == BookStatusEnum.NOT_OWNED else (FAVORITE_WEIGHT if book["is_favorite"] else 1.0)
+        self.user_item_books[(user_id, item)][book["id"]] = weight
+        self.book_items[book["id"]] = (user_id, item)
+        self._sync_user_item(user_id, item)
+
+        if update_neighbors and is_new_item:
+            self._update_content_neighbors(item)
+
+    def remove_book(self, book_id: int) -> None:
+        entry = self.book_items.pop(book_id, None)
+        if entry is None:
+            return
+        books = self.user_item_books[entry]
+        books.pop(book_id, None)
+        if not books:
+            del self.user_item_books[entry]
+        self._sync_user_item(*entry)
+
+    def _sync_user_item(self, user_id: int, item: str) -> None:
+        """ユーザーのアイテムの重みを本の状態に合わせ、共起数・所有者を増減する"""
+        items = self.user_items[user_id]
+        books = self.user_item_books.get((user_id, item))
+        was_counted = items.get(item, 0.0) > 0
+        if books:
+            items[item] = max(books.values())
+        else:
+            items.pop(item, None)
+        counted = items.get(item, 0.0) > 0
+        if was_counted == counted:
+            return
+
+        delta = 1 if counted else -1
+        for other, other_weight in items.items():
+            if other == item or other_weight <= 0:
+                continue
+            for a, b in ((item, other), (other, item)):
+                self.cooccurrence[a][b] += delta
+                if self.cooccurrence[a][b] <= 0:
+                    del self.cooccurrence[a][b]
+        if counted:
+            self.item_users[item].add(user_id)
+        else:
+            self.item_users[item].discard(user_id)
+
+    def _content_scores(self, item: str) -> Counter:
+        """共通する特徴の IDF の和を、自分自身の特徴の IDF の和で割った値（0〜1）"""
+        scores = Counter()
+        total_items = len(self.item_features) or 1
+        self_score = 0.0
+        for feature in self.item_features.get(item, ()):
+            items = self.feature_items[feature]
+            if len(items) > CONTENT_MAX_DF:
+                continue
+            idf = math.log(total_items / len(items))
+            self_score += idf
+            for other in items:
+                if other != item:
+                    scores[other] += idf
+        if self_score > 0:
+            for other in scores:
+                scores[other] /= self_score
+        return scores
+
+    def _update_content_neighbors(self, item: str) -> None:
+        neighbors = self._content_scores(item).most_common(CONTENT_NEIGHBORS)
+        self.content_neighbors[item] = neighbors
+        # 新しいアイテムを既存アイテムの近傍リストにも割り込ませる
+        for other, score in neighbors:
+            current = self.content_neighbors.setdefault(other, [])
+            if len(current) < CONTENT_NEIGHBORS or score > current[-1][1]:
+                current.append((item, score))
+                current.sort(key=lambda x: x[1], reverse=True)
+                del current[CONTENT_NEIGHBORS:]
+
+    def build(self, books: list[dict]) -> "LocalRecommender":
+        for book in books:
+            self.add_book(book, update_neighbors=False)
+        for item in self.item_features:
+            self.content_neighbors[item] = self._content_scores(item).most_common(CONTENT_NEIGHBORS)
+        self.built_at = time.time()
+        return self
+
+    # --- 推薦 ---
+
+    def recommend(self, user_id: int, k: int = 10) -> list[dict]:
+        owned = self.user_items.get(user_id, {})
+        scores: Counter = Counter()
+        reasons: dict[str, tuple[float, str]] = {}
+
+        def add(candidate: str, score: float, reason: str):
+            if candidate in owned or score <= 0:
+                return
+            scores[candidate] += score
+            if score > reasons.get(candidate, (0, ""))[0]:
+                reasons[candidate] = (score, reason)
+
+        for item, weight in owned.items():
+            if weight <= 0:
+                continue
+            title = self.item_meta[item]["title"]
+            n_item = len(self.item_users[item]) or 1
+            for other, count in self.cooccurrence.get(item, {}).items():
+                similarity = count / math.sqrt(n_item * (len(self.item_users[other]) or 1))
+                add(other, LOCAL_RECOMMEND_CF_WEIGHT * weight * similarity, f"『{title}』を登録した人がよく登録しています")
+            for other, score in self.content_neighbors.get(item, ()):
+                add(other, LOCAL_RECOMMEND_CONTENT_WEIGHT * weight * score, f"『{title}』と著者・ジャンルが近い本です")
+
+        return [
+            {**self.item_meta[item], "score": round(score, 4), "reason": reasons[item][1]}
+            for item, score in scores.most_common(k)
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self.user_items),
+            "items": len(self.item_meta),
+            "cooccurrence_pairs": sum(len(c) for c in self.cooccurrence.values()),
+            "built_at": self.built_at,
+        }
+
+
+_engine: LocalRecommender | None = None
+_engine_lock = threading.Lock()
+# 作り直しは同時に1つだけ（起動時のスレッドと夜間ジョブが重なっても二重に作らない）
+_rebuild_lock = threading.Lock()
+_rebuilding = False
+# 作り直している間にコミットされた変更（完成したエンジンに入れ直す）
+_pending_changes: list[tuple[str, dict]] = []
+_stats = Counter()
+
+
+def _apply_changes(engine: LocalRecommender, changes: list[tuple[str, dict]]) -> None:
+    for kind, book in changes:
+        if kind == "delete":
+            engine.remove_book(book["id"])
+        else:
+            engine.add_book(book)
+
+
+def rebuild_local_recommender() -> dict:
+    """全ユーザーの books から作り直す（起動時のスレッド・夜間ジョブ。リクエスト中には呼ばない）"""
+    global _engine, _rebuilding
+    if not _rebuild_lock.acquire(blocking=False):
+        print("⏭️ ローカル推薦エンジンは作り直し中のためスキップ")
+        return get_local_recommender_stats()
+    try:
+        with _engine_lock:
+            _pending_changes.clear()
+            _rebuilding = True
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            books = [_snapshot(b) for b in db.query(Book).yield_per(1000)]
+        finally:
+            db.close()
+
+        engine = LocalRecommender().build(books)
+        with _engine_lock:
+            # 同じ本の変更は入れ直しになるので、読み込み済みの変更を二重に数えることはない
+            _apply_changes(engine, _pending_changes)
+            _pending_changes.clear()
+            _engine = engine
+        _stats["rebuilds"] += 1
+        _stats["last_rebuild_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        print(f"✅ ローカル推薦エンジンを作り直しました: {engine.stats()}")
+    except SQLAlchemyError as e:
+        print(f"❌ ローカル推薦エンジンの作り直し失敗: {e}")
+    finally:
+        with _engine_lock:
+            _rebuilding = False
+            _pending_changes.clear()
+        _rebuild_lock.release()
+    return get_local_recommender_stats()
+
+
+def recommend_local(user_id: int, k: int = 10) -> list[dict] | None:
+    """エンジンの準備ができていなければ None（起動時の作り直しが終わるまで）"""
+    if _engine is None:
+        _stats["not_ready"] += 1
+        return None
+    started = time.perf_counter()
+    with _engine_lock:
+        result = _engine.recommend(user_id, k)
+    _stats["requests"] += 1
+    _stats["last_recommend_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+
+# 本の追加・更新（所有状態への昇格・お気に入り）・削除は、コミットされた時点でエンジンに差分反映する
+@event.listens_for(Session, "after_flush")
+def _collect_book_changes(session: Session, flush_context) -> None:
+    changes = [("upsert", _snapshot(obj)) for obj in chain(session.new, session.dirty) if isinstance(obj, Book)]
+    changes += [("delete", {"id": obj.id}) for obj in session.deleted if isinstance(obj, Book)]
+    if changes:
+        session.info.setdefault(_BOOK_CHANGES_KEY, []).extend(changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_book_changes(session: Session) -> None:
+    changes = session.info.pop(_BOOK_CHANGES_KEY, None)
+    if not changes:
+        return
+    with _engine_lock:
+        if _rebuilding:
+            _pending_changes.extend(changes)
+        if _engine is None:
+            return
+        _apply_changes(_engine, changes)
+    _stats["incremental_updates"] += len(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_book_changes(session: Session) -> None:
+    session.info.pop(_BOOK_CHANGES_KEY, None)
+
+
+def get_local_recommender_stats() -> dict:
+    return {**_stats, **(_engine.stats() if _engine else {"built_at": None})}
+
+
+register_metrics("local_recommender", get_local_recommender_stats)
@@ -3,6 +3,10 @@ from datetime import datetime
 from app.core.database import SessionLocal
 from app.crud.book import get_books_releasing_tomorrow
 from app.models.notification import Notification
+from app.services.food_category import CATEGORY_HISTORY_REFRESH_SEC, refresh_food_history
+from app.services.food_classifier import retrain_classifier
+from app.services.local_recommender import rebuild_local_recommender
+from app.services.rakuten_genres import refresh_genre_tree
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from pytz import timezone
 
@@ -45,4 +49,32 @@ def start_scheduler():
         hour=0,
         minute=0
     )
+    # 楽天ジャンルツリーの更新（週1回）
+    scheduler.add_job(
+        refresh_genre_tree,
+        trigger="cron",
+        day_of_week="sun",
+        hour=3,
+        minute=0
+    )
+    # ローカル推薦エンジンの行列を作り直す（毎晩。日中の追加分は差分反映済み）
+    scheduler.add_job(
+        rebuild_local_recommender,
+        trigger="cron",
+        hour=4,
+        minute=0
+    )
+    # 食材分類器を当日までの登録履歴で再学習する（毎晩）
+    scheduler.add_job(
+        retrain_classifier,
+        trigger="cron",
+        hour=4,
+        minute=30
+    )
+    # 食材カテゴリ判定に使う登録履歴の索引を定期的に集計し直す
+    scheduler.add_job(
+        refresh_food_history,
+        trigger="interval",
+        seconds=CATEGORY_HISTORY_REFRESH_SEC
+    )
     scheduler.start()
@@ -0,0 +1,56 @@
+# app/services/openai_client.py
+#
+# OpenAI クライアントの共通設定（タイムアウト・再試行回数・サーキットブレーカー）
+# 各モジュールで個別に OpenAI() を作らず、ここの chat_completion / stream_chat_completion を使う。
+
+import os
+from typing import AsyncIterator
+
+from app.services.circuit_breaker import get_breaker
+from dotenv import load_dotenv
+from openai import (APIConnectionError, AsyncOpenAI, InternalServerError,
+                    OpenAI, OpenAIError, RateLimitError)
+
+load_dotenv()
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", 30))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", 1))
+
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=OPENAI_TIMEOUT, max_retries=OPENAI_MAX_RETRIES)
+async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=OPENAI_TIMEOUT, max_retries=OPENAI_MAX_RETRIES)
+
+# 障害とみなすエラー（タイムアウトは APIConnectionError のサブクラス）。入力不正などはブレーカーに数えない
+PROVIDER_FAILURES = (APIConnectionError, InternalServerError, RateLimitError)
+
+openai_breaker = get_breaker("openai")
+
+
+def chat_completion(**kwargs):
+    openai_breaker.check()
+    try:
+        response = client.chat.completions.create(**kwargs)
+    except PROVIDER_FAILURES:
+        openai_breaker.record_failure()
+        raise
+    except OpenAIError:
+        # 入力不正などは OpenAI 自体は応答しているので成功扱い
+        openai_breaker.record_success()
+        raise
+    openai_breaker.record_success()
+    return response
+
+
+async def stream_chat_completion(messages: list[dict], model: str, **kwargs) -> AsyncIterator[str]:
+    """chat.completions を stream=True で呼び、テキストの差分を順に返す"""
+    openai_breaker.check()
+    try:
+        stream = await async_client.chat.completions.create(model=model, messages=messages, stream=True, **kwargs)
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except PROVIDER_FAILURES:
+        openai_breaker.record_failure()
+        raise
+    except OpenAIError:
+        openai_breaker.record_success()
+        raise
+    openai_breaker.record_success()
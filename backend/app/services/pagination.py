@@ -0,0 +1,99 @@
+# app/services/pagination.py
+#
+# 一覧 API のカーソル（キーセット）ページング。
+# 並び順のキー（id など）の最後の値を base64 にしたものを不透明なカーソルとして X-Next-Cursor ヘッダーで返し、
+# 次のページは ?cursor= で「そのキーより後」を取る。OFFSET と違い、何ページ目でも同じコストで引ける。
+# レスポンス本文は従来どおりのリストのまま（最後のページでは X-Next-Cursor が付かない）。
+# id 以外で並び替える一覧は (並び替えの列, id) の組をカーソルにし、行値の比較で「その組より後」を取る。
+
+import base64
+import binascii
+import json
+import os
+from typing import Any, Callable
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+
+load_dotenv()
+LIST_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", 100))
+LIST_PAGE_SIZE_MAX = int(os.getenv("LIST_PAGE_SIZE_MAX", 500))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None, size: int = 1) -> list | None:
+    """カーソルを並び順のキーの値のリストに戻す（不正なカーソルは 400）"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="cursor が不正です")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="cursor が不正です")
+    return values
+
+
+def page_limit(limit: int | None) -> int:
+    return min(limit or LIST_PAGE_SIZE, LIST_PAGE_SIZE_MAX)
+
+
+def finish_page(response: Response, rows: list, limit: int, key: Callable[[Any], list]) -> list:
+    """limit + 1 件取得した結果を limit 件に切り詰め、続きがあれば次のカーソルをヘッダーに付ける"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key(rows[-1]))
+    return rows
+
+
+def keyset_after(columns: list, values: list, descending: bool = False):
+    """(列, ..., id) が前のページの最後の行より後にある行の条件（降順なら小さい側）"""
+    if descending:
+        return tuple_(*columns) < tuple_(*values)
+    return tuple_(*columns) > tuple_(*values)
+
+
+def keyset_order(columns: list, descending: bool = False) -> list:
+    return [column.desc() if descending else column.asc() for column in columns]
+
+
+def decode_id_cursor(cursor: str | None) -> int | None:
+    """id 順の一覧用：カーソルから最後の id を取り出す"""
+    values = decode_cursor(cursor)
+    if values is None:
+        return None
+    if not isinstance(values[0], int) or isinstance(values[0], bool):
+        raise HTTPException(status_code=400, detail="cursor が不正です")
+    return values[0]
+
+
+def decode_keyset_cursor(cursor: str | None, parse_key: Callable[[Any], Any] | None = None) -> list | None:
+    """id 順なら [id]、(並び替えの列, id) 順なら [値, id] に戻す
+    parse_key は並び替えの値の検証・変換（不正な値なら TypeError / ValueError を投げる）"""
+    if parse_key is None:
+        last_id = decode_id_cursor(cursor)
+        return None if last_id is None else [last_id]
+    values = decode_cursor(cursor, size=2)
+    if values is None:
+        return None
+    key, last_id = values
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise HTTPException(status_code=400, detail="cursor が不正です")
+    try:
+        return [parse_key(key), last_id]
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="cursor が不正です")
+
+
+def str_key(value: Any) -> str:
+    if not isinstance(value, str):
+        raise TypeError("cursor の値が文字列ではありません")
+    return value
@@ -0,0 +1,162 @@
+# app/services/rakuten_genres.py
+#
+# 楽天市場のジャンル階層をローカル（rakuten_genres テーブル ＋ メモリ上の dict）に保持する。
+# ジャンルはほとんど変わらないので、genreId → ジャンル名 は通常ネットワークに出ずに引ける。
+# 未知の genreId だけはジャンル検索APIを1回呼び、親・子ジャンルもまとめて保存する。
+
+import os
+from collections import deque
+from datetime import datetime, timezone
+
+import httpx
+from app.core.database import SessionLocal
+from app.core.metrics import register_metrics
+from app.models.rakuten_genre import RakutenGenre
+from app.services.http_client import provider_get
+from app.services.rate_limit import rakuten_bucket
+from app.services.singleflight import SingleFlight
+from dotenv import load_dotenv
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+load_dotenv()
+RAKUTEN_APP_ID = os.getenv("RAKUTEN_APP_ID")
+GENRE_SEARCH_URL = "https://app.rakuten.co.jp/services/api/IchibaGenre/Search/20140222"
+# 定期リフレッシュでたどる階層の深さ（それより深いジャンルは参照時に遅延取得）
+RAKUTEN_GENRE_REFRESH_DEPTH = int(os.getenv("RAKUTEN_GENRE_REFRESH_DEPTH", 2))
+
+# genre_id → {"name", "parent_id", "level"}
+_genres: dict[int, dict] = {}
+_genre_flight = SingleFlight("rakuten_genres")
+_stats = {"lookups": 0, "local_hits": 0, "api_calls": 0, "last_refreshed_at": None}
+
+
+class RakutenGenreError(Exception):
+    pass
+
+
+def load_genre_tree() -> int:
+    """DB に保存済みのジャンルをメモリに読み込む（起動時に1回）"""
+    db = SessionLocal()
+    try:
+        rows = db.query(RakutenGenre).all()
+    except SQLAlchemyError as e:
+        print(f"⚠️ 楽天ジャンル読み込み失敗: {e}")
+        return 0
+    finally:
+        db.close()
+
+    for row in rows:
+        _genres[row.genre_id] = {"name": row.name, "parent_id": row.parent_id, "level": row.level}
+    print(f"📂 楽天ジャンルを {len(rows)} 件読み込みました")
+    return len(rows)
+
+
+def _save_genres(genres: dict[int, dict]) -> None:
+    if not genres:
+        return
+    now = datetime.now(timezone.utc)
+    rows = [{"genre_id": gid, **g, "refreshed_at": now} for gid, g in genres.items()]
+    stmt = insert(RakutenGenre).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RakutenGenre.genre_id],
+        set_={
+            "name": stmt.excluded.name,
+            "parent_id": stmt.excluded.parent_id,
+            "level": stmt.excluded.level,
+            "refreshed_at": stmt.excluded.refreshed_at,
+        },
+    )
+    db = SessionLocal()
+    try:
+        db.execute(stmt)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"⚠️ 楽天ジャンル保存失敗: {e}")
+    finally:
+        db.close()
+    _genres.update(genres)
+
+
+async def _fetch_genre(genre_id: int) -> dict[int, dict]:
+    """ジャンル検索APIを呼び、現在・親・子ジャンルを {genre_id: {...}} で返す"""
+    if not RAKUTEN_APP_ID:
+        raise RakutenGenreError("RAKUTEN_APP_ID が設定されていません")
+
+    params = {"applicationId": RAKUTEN_APP_ID, "genreId": genre_id, "format": "json"}
+    _stats["api_calls"] += 1
+    await rakuten_bucket.acquire()
+    try:
+        res = await provider_get("rakuten_ichiba", GENRE_SEARCH_URL, params)
+    except httpx.HTTPError as e:
+        raise RakutenGenreError(repr(e)) from e
+    if res.status_code != 200:
+        raise RakutenGenreError(f"status {res.status_code}")
+
+    try:
+        data = res.json()
+    except ValueError as e:
+        raise RakutenGenreError(f"ジャンルJSONの解析に失敗: {e}") from e
+
+    genres: dict[int, dict] = {}
+    parent_id = 0
+    for entry in data.get("parents", []):
+        parent = entry.get("parent", entry)
+        genres[parent["genreId"]] = {"name": parent["genreName"], "parent_id": parent_id, "level": parent.get("genreLevel")}
+        parent_id = parent["genreId"]
+
+    current = data.get("current")
+    if isinstance(current, dict) and current.get("genreId"):
+        genres[current["genreId"]] = {"name": current["genreName"], "parent_id": parent_id, "level": current.get("genreLevel")}
+
+    for entry in data.get("children", []):
+        child = entry.get("child", entry)
+        genres[child["genreId"]] = {"name": child["genreName"], "parent_id": genre_id, "level": child.get("genreLevel")}
+
+    return genres
+
+
+async def _fetch_and_save(genre_id: int) -> None:
+    _save_genres(await _fetch_genre(genre_id))
+
+
+async def get_genre_name(genre_id: int) -> str | None:
+    genre_id = int(genre_id)
+    _stats["lookups"] += 1
+    genre = _genres.get(genre_id)
+    if genre:
+        _stats["local_hits"] += 1
+        return genre["name"]
+
+    await _genre_flight.do(genre_id, _fetch_and_save, genre_id)
+    genre = _genres.get(genre_id)
+    return genre["name"] if genre else None
+
+
+async def refresh_genre_tree(max_depth: int = RAKUTEN_GENRE_REFRESH_DEPTH) -> int:
+    """ルートから max_depth 階層までのジャンルを取り直す（定期ジョブ）"""
+    queue = deque([(0, 0)])
+    refreshed = 0
+    while queue:
+        genre_id, depth = queue.popleft()
+        try:
+            genres = await _fetch_genre(genre_id)
+        except RakutenGenreError as e:
+            print(f"⚠️ 楽天ジャンル更新失敗 (genre_id={genre_id}): {e}")
+            continue
+        _save_genres(genres)
+        refreshed += len(genres)
+        if depth + 1 < max_depth:
+            queue.extend((gid, depth + 1) for gid, g in genres.items() if g["parent_id"] == genre_id)
+
+    _stats["last_refreshed_at"] = datetime.now(timezone.utc).isoformat()
+    print(f"📂 楽天ジャンルを {refreshed} 件更新しました")
+    return refreshed
+
+
+def get_genre_stats() -> dict:
+    return {"genres": len(_genres), **_stats}
+
+
+register_metrics("rakuten_genres", get_genre_stats)
@@ -0,0 +1,63 @@
+# app/services/rate_limit.py
+
+import asyncio
+import os
+import time
+
+from app.core.metrics import register_metrics
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class AsyncTokenBucket:
+    """トークンバケット方式のレートリミッタ（待機は到着順）"""
+
+    def __init__(self, name: str, rate: float, capacity: float = 1.0):
+        self.name = name
+        self.rate = rate  # 1秒あたりに補充されるトークン数
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.acquired = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        register_metrics(f"rate_limit.{name}", self.stats)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                self._refill()
+                while self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+                    self._refill()
+                self._tokens -= 1
+        finally:
+            self.waiting -= 1
+        self.acquired += 1
+        self.total_wait += time.monotonic() - started
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "acquired": self.acquired,
+            "waiting": self.waiting,
+            "avg_wait_sec": round(self.total_wait / self.acquired, 4) if self.acquired else 0.0,
+        }
+
+
+# 楽天APIはアプリIDごとに 1req/秒 程度の制限があるため、楽天系APIはすべてこのバケットを通す
+rakuten_bucket = AsyncTokenBucket(
+    "rakuten",
+    rate=float(os.getenv("RAKUTEN_RATE_PER_SEC", 1)),
+    capacity=float(os.getenv("RAKUTEN_BURST", 1)),
+)
@@ -0,0 +1,154 @@
+# app/services/recipe_cache.py
+#
+# hybrid_recipe_suggestion の前段に置くキャッシュ
+# 「卵, 牛乳」と「牛乳, 卵」「ﾀﾏｺﾞ」のような表記ゆれ・順序違いを同じキーにまとめ、
+#   1. プロセス内 LRU + TTL
+#   2. recipe_suggestion_cache テーブル
+# の順に引く。どちらにも無いときだけ楽天レシピAPI / ChatGPT に問い合わせる。
+
+import copy
+import os
+from datetime import datetime, timedelta, timezone
+
+from app.core.database import SessionLocal
+from app.core.metrics import register_metrics
+from app.models.recipe_suggestion_cache import RecipeSuggestionCache
+from app.services.cache import TTLCache
+from app.services.food_category import normalize_food_name
+from app.services.hybrid_recipe import hybrid_recipe_suggestion
+from dotenv import load_dotenv
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+load_dotenv()
+RECIPE_CACHE_TTL = int(os.getenv("RECIPE_CACHE_TTL", 60 * 60 * 24))  # 1日
+RECIPE_CACHE_MEMORY_TTL = int(os.getenv("RECIPE_CACHE_MEMORY_TTL", 60 * 60))
+RECIPE_CACHE_MAXSIZE = int(os.getenv("RECIPE_CACHE_MAXSIZE", 2000))
+
+_MISSING = object()
+
+_memory = TTLCache(maxsize=RECIPE_CACHE_MAXSIZE, ttl=RECIPE_CACHE_MEMORY_TTL)
+_stats = {"lookups": 0, "db_hits": 0, "upstream_calls": 0, "not_cached": 0, "stale_served": 0}
+
+
+def canonical_ingredients(ingredients: list[str]) -> tuple[str, list[str]]:
+    """(キャッシュキー, 問い合わせに使う食材名リスト) を返す
+
+    同じ食材が複数あれば1つにまとめ、正規化した名前の順に並べる。
+    問い合わせには元の表記（最初に現れたもの）を使う。
+    """
+    by_key: dict[str, str] = {}
+    for name in ingredients:
+        key = normalize_food_name(name)
+        if key and key not in by_key:
+            by_key[key] = name.strip()
+    keys = sorted(by_key)
+    return "|".join(keys), [by_key[k] for k in keys]
+
+
+def _load_from_db(key: str, allow_stale: bool = False):
+    db = SessionLocal()
+    try:
+        row = db.get(RecipeSuggestionCache, key)
+        if not row or (not allow_stale and row.expires_at <= datetime.now(timezone.utc)):
+            return _MISSING, None
+        return row.data, row.expires_at
+    except SQLAlchemyError as e:
+        print(f"⚠️ レシピキャッシュ読み込み失敗: {e}")
+        return _MISSING, None
+    finally:
+        db.close()
+
+
+def _store_to_db(key: str, data: dict, expires_at: datetime) -> None:
+    values = {
+        "ingredients_key": key,
+        "source": data["source"],
+        "data": data,
+        "fetched_at": datetime.now(timezone.utc),
+        "expires_at": expires_at,
+    }
+    stmt = insert(RecipeSuggestionCache).values(**values).on_conflict_do_update(
+        index_elements=[RecipeSuggestionCache.ingredients_key],
+        set_={k: v for k, v in values.items() if k != "ingredients_key"},
+    )
+    db = SessionLocal()
+    try:
+        db.execute(stmt)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"⚠️ レシピキャッシュ書き込み失敗: {e}")
+    finally:
+        db.close()
+
+
+def _is_cacheable(data: dict) -> bool:
+    # ChatGPT の出力が JSON として読めなかった場合などは次回やり直す
+    return bool(data.get("recipes")) and not any("error" in r for r in data["recipes"])
+
+
+def lookup_recipe_suggestions(key: str) -> dict | None:
+    """キャッシュ済みの提案を返す（無ければ None）"""
+    _stats["lookups"] += 1
+
+    # ✅ 1段目：プロセス内キャッシュ
+    cached = _memory.get(key, _MISSING)
+    if cached is not _MISSING:
+        return copy.deepcopy(cached)
+
+    # ✅ 2段目：DB キャッシュ
+    data, expires_at = _load_from_db(key)
+    if data is not _MISSING:
+        _stats["db_hits"] += 1
+        remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+        _memory.set(key, data, ttl=min(remaining, RECIPE_CACHE_MEMORY_TTL))
+        return copy.deepcopy(data)
+    return None
+
+
+def store_recipe_suggestions(key: str, data: dict) -> bool:
+    _stats["upstream_calls"] += 1
+    if not _is_cacheable(data):
+        _stats["not_cached"] += 1
+        return False
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=RECIPE_CACHE_TTL)
+    _store_to_db(key, data, expires_at)
+    _memory.set(key, copy.deepcopy(data))
+    return True
+
+
+def get_recipe_suggestions_cached(ingredients: list[str]) -> dict:
+    """hybrid_recipe_suggestion と同じ結果を、食材の組み合わせ単位でキャッシュして返す"""
+    key, names = canonical_ingredients(ingredients)
+    data = lookup_recipe_suggestions(key)
+    if data is not None:
+        return data
+
+    # ✅ 3段目：楽天レシピAPI → ChatGPT（どちらも失敗したら期限切れのキャッシュを返す）
+    try:
+        data = hybrid_recipe_suggestion(names)
+    except Exception as e:
+        stale = lookup_stale_recipe_suggestions(key)
+        if stale is None:
+            raise
+        print(f"⚠️ レシピ提案の取得に失敗したため古いキャッシュを返します: {e!r}")
+        return stale
+    if not store_recipe_suggestions(key, data):
+        return lookup_stale_recipe_suggestions(key) or data
+    return data
+
+
+def lookup_stale_recipe_suggestions(key: str) -> dict | None:
+    data, _ = _load_from_db(key, allow_stale=True)
+    if data is _MISSING:
+        return None
+    _stats["stale_served"] += 1
+    return data
+
+
+def get_recipe_cache_stats() -> dict:
+    return {"memory": _memory.stats(), **_stats}
+
+
+register_metrics("recipe_suggestions", get_recipe_cache_stats)
@@ -1,16 +1,10 @@
 import json
-import os
-import random
 
-from dotenv import load_dotenv
-from openai import OpenAI
+from app.services.openai_client import chat_completion
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-def generate_recipe_with_chatgpt(ingredients: list[str]) -> dict:
-    random.shuffle(ingredients)
+RECIPE_MODEL = "gpt-3.5-turbo"
 
+def build_recipe_messages(ingredients: list[str]) -> list[dict]:
     prompt = (
         f"以下のすべての食材をまんべんなく使って、複数の家庭料理に分けて提案してください。\n"
         f"1皿にこだわらず、主菜・副菜・汁物など自由に分けて構いません。\n"
@@ -46,23 +40,25 @@ def generate_recipe_with_chatgpt(ingredients: list[str]) -> dict:
 }}'''
         f"\n\n使用する食材：{', '.join(ingredients)}"
     )
+    return [
+        {"role": "system", "content": "あなたは優秀な家庭料理アシスタントです。"},
+        {"role": "user", "content": prompt},
+    ]
 
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "あなたは優秀な家庭料理アシスタントです。"},
-            {"role": "user", "content": prompt},
-        ],
-    )
-
-    content = response.choices[0].message.content.strip()
-
+def parse_recipe_json(content: str) -> dict:
     try:
         return json.loads(content)
     except json.JSONDecodeError:
         return {"error": "ChatGPTの出力がJSONとして読み取れませんでした", "raw": content}
 
-def generate_recipe_focused_on_main_ingredient(food_name: str) -> dict:
+def generate_recipe_with_chatgpt(ingredients: list[str]) -> dict:
+    response = chat_completion(
+        model=RECIPE_MODEL,
+        messages=build_recipe_messages(ingredients),
+    )
+    return parse_recipe_json(response.choices[0].message.content.strip())
+
+def build_main_ingredient_messages(food_name: str) -> list[dict]:
     prompt = (
         f"次の食材「{food_name}」を主材料として必ず使い、現実的なレシピを1つ提案してください。\n"
         f"他の食材を追加しても構いません。\n"
@@ -83,18 +79,14 @@ def generate_recipe_focused_on_main_ingredient(food_name: str) -> dict:
   ]
 }}'''
     )
+    return [
+        {"role": "system", "content": "あなたは優秀なレシピアシスタントです。"},
+        {"role": "user", "content": prompt},
+    ]
 
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "あなたは優秀なレシピアシスタントです。"},
-            {"role": "user", "content": prompt},
-        ],
+def generate_recipe_focused_on_main_ingredient(food_name: str) -> dict:
+    response = chat_completion(
+        model=RECIPE_MODEL,
+        messages=build_main_ingredient_messages(food_name),
     )
-
-    content = response.choices[0].message.content.strip()
-
-    try:
-        return json.loads(content)
-    except json.JSONDecodeError:
-        return {"error": "ChatGPTの出力がJSONとして読み取れませんでした", "raw": content}
+    return parse_recipe_json(response.choices[0].message.content.strip())
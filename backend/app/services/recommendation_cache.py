@@ -0,0 +1,84 @@
+# app/services/recommendation_cache.py
+#
+# ユーザーごとの推薦結果キャッシュ
+#   - users.library_version が生成時と同じなら、書籍も読まずにそのまま返す
+#   - バージョンが進んでいても、プロンプトに使う書籍リスト（fingerprint）が同じなら再利用する
+#     （お気に入り切り替えなど、推薦内容に影響しない変更で GPT-4 を呼ばないため）
+
+import hashlib
+from datetime import datetime, timezone
+
+from app.core.database import SessionLocal
+from app.core.metrics import register_metrics
+from app.models.recommendation_cache import RecommendationCache
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+_stats = {"version_hits": 0, "fingerprint_hits": 0, "misses": 0, "refreshes": 0, "stale_served": 0}
+
+
+def library_fingerprint(messages: list[dict]) -> str:
+    return hashlib.sha256("\n".join(m["content"] for m in messages).encode("utf-8")).hexdigest()
+
+
+def get_cached_by_version(db: Session, user_id: int, library_version: int) -> RecommendationCache | None:
+    row = db.get(RecommendationCache, user_id)
+    if row and row.library_version == library_version:
+        _stats["version_hits"] += 1
+        return row
+    return None
+
+
+def get_cached_by_fingerprint(db: Session, user_id: int, library_version: int, fingerprint: str) -> RecommendationCache | None:
+    row = db.get(RecommendationCache, user_id)
+    if not row or row.fingerprint != fingerprint:
+        _stats["misses"] += 1
+        return None
+    # 書籍リストは変わっていないので、現在のバージョンで有効として扱う
+    _stats["fingerprint_hits"] += 1
+    row.library_version = library_version
+    db.commit()
+    return row
+
+
+def get_stale_recommendation(db: Session, user_id: int) -> RecommendationCache | None:
+    """生成に失敗したとき用。本棚が変わっていても前回の推薦を返す"""
+    row = db.get(RecommendationCache, user_id)
+    if row:
+        _stats["stale_served"] += 1
+    return row
+
+
+def store_recommendation(user_id: int, library_version: int, fingerprint: str, recommendations: str) -> None:
+    values = {
+        "user_id": user_id,
+        "library_version": library_version,
+        "fingerprint": fingerprint,
+        "recommendations": recommendations,
+        "created_at": datetime.now(timezone.utc),
+    }
+    stmt = insert(RecommendationCache).values(**values).on_conflict_do_update(
+        index_elements=[RecommendationCache.user_id],
+        set_={k: v for k, v in values.items() if k != "user_id"},
+    )
+    db = SessionLocal()
+    try:
+        db.execute(stmt)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"⚠️ 推薦キャッシュ書き込み失敗: {e}")
+    finally:
+        db.close()
+
+
+def record_refresh() -> None:
+    _stats["refreshes"] += 1
+
+
+def get_recommendation_cache_stats() -> dict:
+    return dict(_stats)
+
+
+register_metrics("recommendation_cache", get_recommendation_cache_stats)
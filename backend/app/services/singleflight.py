@@ -0,0 +1,56 @@
+# app/services/singleflight.py
+#
+# 同じキーに対する同時実行中の呼び出しを1回の上流リクエストにまとめる。
+# 後から来た呼び出しは先行リクエストの完了を待ち、同じ結果（または例外）を受け取る。
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.core.metrics import register_metrics
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self._waiters: dict[Hashable, int] = {}
+        self.calls = 0
+        self.upstream_calls = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+        register_metrics(f"singleflight.{name}", self.stats)
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.upstream_calls += 1
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._inflight[key] = task
+            self._waiters[key] = 1
+            task.add_done_callback(lambda t, k=key: self._finish(k, t))
+        else:
+            self.coalesced += 1
+            self._waiters[key] += 1
+            self.max_waiters = max(self.max_waiters, self._waiters[key])
+
+        # 呼び出し元がキャンセルされても共有タスクは止めない
+        result = await asyncio.shield(task)
+        # 呼び出し元ごとに独立したオブジェクトを返す（dict/list の書き換え対策）
+        return copy.deepcopy(result)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        self._waiters.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # 待機者が全員キャンセルされた場合の未回収例外警告を防ぐ
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self.coalesced,
+            "max_waiters": self.max_waiters,
+            "inflight": {str(k): n for k, n in self._waiters.items()},
+        }
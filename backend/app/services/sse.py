@@ -0,0 +1,51 @@
+# app/services/sse.py
+#
+# OpenAI の応答を Server-Sent Events でそのまま PWA に流すための共通処理
+# イベントの種類:
+#   event: delta  data: {"text": "..."}       生成されたトークン（差分）
+#   event: done   data: {...}                 最終結果（通常エンドポイントと同じ形の JSON）
+#   event: error  data: {"detail": "..."}     途中で失敗した場合
+# AsyncOpenAI（openai_client.stream_chat_completion）を使うので、生成中もスレッドプールのワーカーを占有しない。
+# 生成後の finish（キャッシュへの保存など同期の DB 処理を含む）は asyncio.to_thread で実行する。
+
+import asyncio
+import json
+from typing import AsyncIterator
+
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.openai_client import stream_chat_completion
+from fastapi.responses import StreamingResponse
+from openai import OpenAIError
+
+
+def sse_event(data, event: str | None = None) -> str:
+    lines = [f"event: {event}"] if event else []
+    payload = data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)
+    lines += [f"data: {line}" for line in payload.splitlines() or [""]]
+    return "\n".join(lines) + "\n\n"
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # リバースプロキシにバッファさせない
+        },
+    )
+
+
+async def stream_completion_events(messages: list[dict], model: str, finish, **kwargs) -> AsyncIterator[str]:
+    """差分を delta イベントで流し、全文を finish(content) に渡した結果を done イベントで返す"""
+    parts = []
+    try:
+        async for text in stream_chat_completion(messages, model, **kwargs):
+            parts.append(text)
+            yield sse_event({"text": text}, event="delta")
+    except (OpenAIError, CircuitOpenError) as e:
+        print(f"🛑 OpenAI ストリーミング失敗: {e!r}")
+        yield sse_event({"detail": str(e)}, event="error")
+        return
+    result = await asyncio.to_thread(finish, "".join(parts).strip())
+    yield sse_event(result, event="done")
@@ -1,4 +1,5 @@
 import re
+import unicodedata
 from datetime import datetime
 
 def extract_volume(title: str) -> str | None:
@@ -23,3 +24,37 @@ def parse_published_date(pub_date_str: str | None) -> datetime.date:
     except:
         pass
     return datetime(2000, 1, 1).date()
+
+
+def normalize_isbn(isbn: str | None) -> str | None:
+    """ISBN-10/13 をハイフン等を除いた ISBN-13 に正規化する（不正な値は None）"""
+    if not isbn:
+        return None
+    digits = re.sub(r"[^0-9Xx]", "", isbn).upper()
+
+    if len(digits) == 13 and digits.isdigit():
+        return digits
+    if len(digits) != 10 or not digits[:9].isdigit():
+        return None
+
+    # ISBN-10 → ISBN-13（978 を付与してチェックディジットを再計算）
+    core = "978" + digits[:9]
+    total = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(core))
+    check_digit = (10 - total % 10) % 10
+    return core + str(check_digit)
+
+
+def normalize_title(title: str) -> str:
+    if title is None:
+        return ""
+    # 全角→半角変換、記号・空白除去、小文字化
+    title = unicodedata.normalize("NFKC", title)
+    title = re.sub(r"[（）()\-\sー・　_]", "", title)  # よくある揺れの記号除去
+    title = title.lower()
+    return title.strip()
+
+
+def normalize_search_text(*parts: str | None) -> str:
+    """検索用に NFKC 正規化・小文字化し、空白をまとめて連結する（全角英数・半角カナの揺れを吸収）"""
+    text = " ".join(unicodedata.normalize("NFKC", p) for p in parts if p)
+    return re.sub(r"\s+", " ", text).lower().strip()
@@ -1,12 +1,6 @@
 # app/services/validate_category.py
 
-import os
-
-from dotenv import load_dotenv
-from openai import OpenAI
-
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from app.services.openai_client import chat_completion
 
 def validate_food_category(food_name: str, category: str) -> bool:
     prompt = (
@@ -29,7 +23,7 @@ def validate_food_category(food_name: str, category: str) -> bool:
         f"「はい」または「いいえ」で答えてください。"
     )
 
-    response = client.chat.completions.create(
+    response = chat_completion(
         model="gpt-3.5-turbo",
         messages=[
             {"role": "system", "content": "あなたは食品のカテゴリ判定を行うアシスタントです。"},
@@ -0,0 +1,22 @@
+# scripts/benchmark_food_classifier.py
+#
+# 食材カテゴリ分類器の精度と推論時間を測る
+#   python -m scripts.benchmark_food_classifier [しきい値 ...]
+# 例: python -m scripts.benchmark_food_classifier 0.7 0.85 0.95
+# coverage は OpenAI を呼ばずに判定できる割合、confident_accuracy はそのときの正解率
+
+import sys
+
+from app.services.food_classifier import FOOD_CLASSIFIER_THRESHOLD, evaluate_classifier, load_training_samples
+
+if __name__ == "__main__":
+    thresholds = [float(t) for t in sys.argv[1:]] or [FOOD_CLASSIFIER_THRESHOLD]
+    samples = load_training_samples()
+    print(f"学習データ: {len(samples)} 件")
+    for threshold in thresholds:
+        result = evaluate_classifier(samples, threshold=threshold)
+        print(
+            f"threshold={threshold:.2f}  accuracy={result['accuracy']:.2%}  "
+            f"coverage={result['coverage']:.2%}  confident_accuracy={result['confident_accuracy']:.2%}  "
+            f"{result['avg_predict_us']}µs/件"
+        )
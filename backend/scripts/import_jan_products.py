@@ -0,0 +1,43 @@
+# scripts/import_jan_products.py
+#
+# 商品マスタのダンプを jan_products テーブルに一括インポートする
+#   python -m scripts.import_jan_products products.jsonl
+#   python -m scripts.import_jan_products products.csv
+#
+# JSON Lines: 1行に JANCODE API の商品オブジェクト（codeNumber, itemName, ProductDetails など）
+# CSV: codeNumber, itemName, brandName, makerName, itemImageUrl 列 ＋ それ以外の列は ProductDetails に入る
+
+import csv
+import json
+import sys
+
+from app.services.jancode import bulk_import_jan_products
+
+ITEM_COLUMNS = {"codeNumber", "itemName", "brandName", "makerName", "itemImageUrl"}
+
+
+def read_jsonl(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def read_csv(path: str):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            item = {k: v for k, v in row.items() if k in ITEM_COLUMNS}
+            item["ProductDetails"] = {k: v for k, v in row.items() if k not in ITEM_COLUMNS and v}
+            yield item
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("使い方: python -m scripts.import_jan_products <products.jsonl|products.csv>")
+        sys.exit(1)
+
+    path = sys.argv[1]
+    reader = read_csv if path.endswith(".csv") else read_jsonl
+    count = bulk_import_jan_products(reader(path))
+    print(f"{count} 件の商品をインポートしました")
@@ -0,0 +1,14 @@
+# scripts/train_food_classifier.py
+#
+# food_items の履歴から食材カテゴリ分類器を再学習し、FOOD_CLASSIFIER_PATH に保存する
+#   python -m scripts.train_food_classifier
+# 稼働中のサーバーは再起動するか POST /api/admin/food-classifier/retrain で新しいモデルを読み込む
+
+from app.services.food_classifier import FOOD_CLASSIFIER_PATH, evaluate_classifier, load_training_samples, save_classifier, train_classifier
+
+if __name__ == "__main__":
+    samples = load_training_samples()
+    model = train_classifier(samples)
+    save_classifier(model)
+    print(f"✅ {len(samples)} 件から学習しました（語彙 {len(model.vocabulary)}）→ {FOOD_CLASSIFIER_PATH}")
+    print(f"📊 ホールドアウト評価: {evaluate_classifier(samples)}")
@@ -0,0 +1,14 @@
+// src/hooks/useDebouncedValue.ts
+// 入力が止まってから delay ミリ秒後に値を反映する（検索 API を1文字ごとに呼ばないため）
+import { useEffect, useState } from "react";
+
+export const useDebouncedValue = <T>(value: T, delay = 300): T => {
+  const [debounced, setDebounced] = useState(value);
+
+  useEffect(() => {
+    const timer = setTimeout(() => setDebounced(value), delay);
+    return () => clearTimeout(timer);
+  }, [value, delay]);
+
+  return debounced;
+};
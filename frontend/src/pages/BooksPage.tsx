@@ -11,76 +11,57 @@ import {
   GlassError,
   GlassEmptyState,
 } from "../components/ui/GlassUI";
-import type { Book } from "../types/book";
-
-type SortBy = "title" | "author" | "published_date" | "id";
-type SortOrder = "asc" | "desc";
+import type { Book, BookSortBy, SortOrder } from "../types/book";
+import { useDebouncedValue } from "../hooks/useDebouncedValue";
 
 export const BooksPage = () => {
-  const { books, isLoading, error, fetchBooks } = useBookStore();
+  const {
+    books,
+    booksNextCursor,
+    isLoading,
+    isLoadingMoreBooks,
+    error,
+    fetchBooks,
+    fetchMoreBooks,
+    librarySearchResults,
+    librarySearchHasMore,
+    isSearchingLibrary,
+    isLoadingMoreLibrary,
+    librarySearchError,
+    searchLibrary,
+    searchMoreLibrary,
+  } = useBookStore();
   const { isAuthenticated, isInitialized } = useAuthStore();
 
-  // ローカル検索状態
+  // 検索はサーバー側（GET /me/books/search）で行う。入力が止まってから問い合わせる
   const [searchQuery, setSearchQuery] = useState("");
-  // ソート状態
-  const [sortBy, setSortBy] = useState<SortBy>("id");
+  const debouncedQuery = useDebouncedValue(searchQuery.trim(), 300);
+  const isSearchMode = debouncedQuery !== "";
+  // ソート状態（並び替えはサーバー側で行い、変わったら最初のページから取り直す）
+  const [sortBy, setSortBy] = useState<BookSortBy>("id");
   const [sortOrder, setSortOrder] = useState<SortOrder>("desc");
 
   const loadBooks = useCallback(async () => {
     if (isAuthenticated && isInitialized) {
-      await fetchBooks();
+      await fetchBooks({ sortBy, order: sortOrder });
     }
-  }, [isAuthenticated, isInitialized, fetchBooks]);
+  }, [isAuthenticated, isInitialized, fetchBooks, sortBy, sortOrder]);
 
   useEffect(() => {
     loadBooks();
   }, [loadBooks]);
 
-  const filteredBooks = books.filter((book) => {
-    // 安全なアクセス：null/undefinedの場合は空文字に変換
-    const title = (book.title || "").toLowerCase();
-    const author = (book.author || "").toLowerCase();
-    const publisher = (book.publisher || "").toLowerCase();
-    const query = searchQuery.toLowerCase();
-
-    return (
-      title.includes(query) ||
-      author.includes(query) ||
-      publisher.includes(query)
-    );
-  });
-
-  // ソート処理
-  const sortedBooks = [...filteredBooks].sort((a, b) => {
-    let aValue: string | number, bValue: string | number;
-
-    switch (sortBy) {
-      case "title":
-        aValue = (a.title || "").toLowerCase();
-        bValue = (b.title || "").toLowerCase();
-        break;
-      case "author":
-        aValue = (a.author || "").toLowerCase();
-        bValue = (b.author || "").toLowerCase();
-        break;
-      case "published_date":
-        aValue = new Date(a.published_date || 0).getTime();
-        bValue = new Date(b.published_date || 0).getTime();
-        break;
-      case "id":
-      default:
-        // IDを登録順として使用（数値の大小で判定）
-        aValue = a.id;
-        bValue = b.id;
-        break;
+  useEffect(() => {
+    if (isAuthenticated && isInitialized) {
+      searchLibrary(debouncedQuery);
     }
+  }, [isAuthenticated, isInitialized, debouncedQuery, searchLibrary]);
 
-    if (sortOrder === "asc") {
-      return aValue < bValue ? -1 : aValue > bValue ? 1 : 0;
-    } else {
-      return aValue > bValue ? -1 : aValue < bValue ? 1 : 0;
-    }
-  });
+  // 検索結果は関連度順、一覧はサーバーで並び替え済み
+  const displayedBooks = isSearchMode ? librarySearchResults : books;
+  const listLoading = isSearchMode ? isSearchingLibrary : isLoading;
+  const listError = isSearchMode ? librarySearchError : error;
+  const hasMore = isSearchMode ? librarySearchHasMore : !!booksNextCursor;
 
   // ジャンル推定関数
   const getGenre = (book: Book) => {
@@ -158,50 +139,57 @@ export const BooksPage = () => {
           <span className="text-sm text-gray-600">並び替え:</span>
           <select
             value={sortBy}
-            onChange={(e) => setSortBy(e.target.value as SortBy)}
-            className="bg-white/30 backdrop-blur-xl border border-white/20 rounded-lg px-3 py-1 text-sm text-gray-800 focus:outline-none focus:ring-2 focus:ring-blue-400/50"
+            onChange={(e) => setSortBy(e.target.value as BookSortBy)}
+            disabled={isSearchMode}
+            className="disabled:opacity-50 "bg-white/30 backdrop-blur-xl border border-white/20 rounded-lg px-3 py-1 text-sm text-gray-800 focus:outline-none focus:ring-2 focus:ring-blue-400/50"
           >
-            <option value="created_at">登録日</option>
+            <option value="id">登録日</option>
             <option value="title">タイトル</option>
             <option value="author">著者</option>
             <option value="published_date">出版日</option>
           </select>
           <button
             onClick={() => setSortOrder(sortOrder === "asc" ? "desc" : "asc")}
-            className="bg-white/30 backdrop-blur-xl border border-white/20 rounded-lg px-3 py-1 text-sm text-gray-800 hover:bg-white/40 transition-colors"
+            disabled={isSearchMode}
+            className="disabled:opacity-50 "bg-white/30 backdrop-blur-xl border border-white/20 rounded-lg px-3 py-1 text-sm text-gray-800 hover:bg-white/40 transition-colors"
           >
             {sortOrder === "asc" ? "↑" : "↓"}
           </button>
           <span className="text-sm text-gray-600 ml-2">
-            {sortedBooks.length}件表示
+            {displayedBooks.length}件表示
+            {hasMore && "（続きあり）"}
+            {isSearchMode && "・関連度順"}
           </span>
         </div>
       </div>
 
       {/* 書籍一覧 */}
-      {isLoading ? (
-        <GlassLoading message="書籍を読み込み中..." />
-      ) : error ? (
-        <GlassError message={error} onRetry={() => fetchBooks()} />
-      ) : sortedBooks.length === 0 ? (
+      {listLoading ? (
+        <GlassLoading message={isSearchMode ? "検索中..." : "書籍を読み込み中..."} />
+      ) : listError ? (
+        <GlassError
+          message={listError}
+          onRetry={() => (isSearchMode ? searchLibrary(debouncedQuery) : loadBooks())}
+        />
+      ) : displayedBooks.length === 0 ? (
         <GlassEmptyState
-          icon={searchQuery ? "🔍" : "📚"}
-          title={searchQuery ? "検索結果が見つかりません" : "書籍がありません"}
+          icon={isSearchMode ? "🔍" : "📚"}
+          title={isSearchMode ? "検索結果が見つかりません" : "書籍がありません"}
           description={
-            searchQuery
+            isSearchMode
               ? "別のキーワードで検索してみてください"
               : "書籍を追加してみましょう"
           }
-          actionLabel={!searchQuery ? "最初の書籍を追加" : undefined}
+          actionLabel={!isSearchMode ? "最初の書籍を追加" : undefined}
           onAction={
-            !searchQuery
+            !isSearchMode
               ? () => (window.location.href = "/add-book")
               : undefined
           }
         />
       ) : (
         <div className="grid grid-cols-2 sm:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-6">
-          {sortedBooks.map((book) => (
+          {displayedBooks.map((book) => (
             <div
               key={book.id}
               className="bg-white/30 backdrop-blur-xl rounded-xl p-4 border border-white/20 shadow-xl hover:shadow-2xl hover:-translate-y-1 transition-all duration-500 cursor-pointer group"
@@ -265,6 +253,19 @@ export const BooksPage = () => {
           ))}
         </div>
       )}
+
+      {/* 続きのページ（一覧は X-Next-Cursor、検索は offset で続きがある間だけ表示） */}
+      {!listLoading && !listError && hasMore && (
+        <div className="flex justify-center">
+          <GlassButton
+            variant="outline"
+            loading={isSearchMode ? isLoadingMoreLibrary : isLoadingMoreBooks}
+            onClick={() => (isSearchMode ? searchMoreLibrary() : fetchMoreBooks())}
+          >
+            もっと見る
+          </GlassButton>
+        </div>
+      )}
     </div>
   );
 };
@@ -1,8 +1,9 @@
 // src/pages/FoodExpiryPage.tsx
 
-import { useEffect, useState, useRef, useMemo } from "react";
-import { GlassCard } from "../components/ui/GlassUI";
+import { useCallback, useEffect, useState, useRef, useMemo } from "react";
+import { GlassButton, GlassCard } from "../components/ui/GlassUI";
 import { useAuthStore } from "../stores/authStore";
+import { fetchPage } from "../utils/pagination";
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL;
 
@@ -15,48 +16,95 @@ type FoodItem = {
   expiration_date: string;
 };
 
+// 期限アラートを出す残り日数（期限間近の取得範囲もこの最大値に合わせる）
+const ALERT_DAYS = [7, 5, 3, 1, 0];
+const ALERT_WINDOW_DAYS = Math.max(...ALERT_DAYS);
+// 期限切れは新しく切れたものから順にページングする
+const EXPIRED_URL = `${API_BASE_URL}/me/foods?expired=true&sort=expiration_date&order=desc`;
+
 export const FoodExpiryPage = () => {
   const { token } = useAuthStore();
-  const [foodItems, setFoodItems] = useState<FoodItem[]>([]);
+  // 今日〜ALERT_WINDOW_DAYS 日後が期限のもの（期限の近い順、件数は期間で限られるのでまとめて取得）
+  const [upcomingItems, setUpcomingItems] = useState<FoodItem[]>([]);
+  const [expiredItems, setExpiredItems] = useState<FoodItem[]>([]);
+  // 期限切れの続きのページがあるときの X-Next-Cursor（「もっと見る」で読み込む）
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const today = useMemo(() => new Date(), []);
   const hasAlertedRef = useRef(false);
 
+  const authFetch = useCallback(
+    (url: string) =>
+      fetch(url, {
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
+      }),
+    [token]
+  );
+
   useEffect(() => {
-    const fetchFoods = async () => {
+    const fetchUpcoming = async () => {
       try {
-        const res = await fetch(`${API_BASE_URL}/me/foods`, {
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
-        });
-        if (!res.ok) {
-          const errorText = await res.text();
-          console.error("食品取得失敗:", errorText);
-          throw new Error("食品の取得に失敗しました");
-        }
-        const data = await res.json();
-        setFoodItems(data);
+        // ✅ 期限の近いものは登録順の一覧ではなく、期限で絞り込む API から取得
+        const res = await authFetch(
+          `${API_BASE_URL}/foods/expiring_soon?days=${ALERT_WINDOW_DAYS}`
+        );
+        if (!res.ok) throw new Error("期限間近の食品の取得に失敗しました");
+        setUpcomingItems(await res.json());
+      } catch (err) {
+        console.error(err);
+      }
+    };
+
+    const fetchExpired = async () => {
+      try {
+        // ✅ 期限切れは最初のページだけ取得（続きは「もっと見る」）
+        const page = await fetchPage<FoodItem>(EXPIRED_URL, null, authFetch);
+        setExpiredItems(page.items);
+        setNextCursor(page.nextCursor);
       } catch (err) {
         console.error(err);
       }
     };
 
-    fetchFoods();
-  }, [token]);
+    fetchUpcoming();
+    fetchExpired();
+  }, [authFetch]);
+
+  const loadMoreExpired = async () => {
+    if (!nextCursor || isLoadingMore) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await fetchPage<FoodItem>(EXPIRED_URL, nextCursor, authFetch);
+      setExpiredItems((prev) => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error(err);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
+  const daysLeft = (item: FoodItem) =>
+    Math.ceil(
+      (new Date(item.expiration_date).getTime() - today.getTime()) /
+        (1000 * 60 * 60 * 24)
+    );
 
   useEffect(() => {
     if (hasAlertedRef.current) return;
 
+    // 期限まで ALERT_WINDOW_DAYS 日以内のものはすべて取得済みなので、アラートの対象を取りこぼさない
     const showAlert = () => {
-      const alertDays = [7, 5, 3, 1, 0]; // ← 0日を追加
       const alerted: string[] = [];
-      foodItems.forEach((item) => {
+      upcomingItems.forEach((item) => {
         const diff = Math.ceil(
           (new Date(item.expiration_date).getTime() - today.getTime()) /
             (1000 * 60 * 60 * 24)
         );
-    
-        if (alertDays.includes(diff)) {
+
+        if (ALERT_DAYS.includes(diff)) {
           if (diff === 0) {
             alerted.push(`${item.name} は今日が期限です`);
           } else {
@@ -64,7 +112,7 @@ export const FoodExpiryPage = () => {
           }
         }
       });
-    
+
       if (alerted.length > 0) {
         alert(alerted.join("\n"));
         hasAlertedRef.current = true;
@@ -72,7 +120,7 @@ export const FoodExpiryPage = () => {
     };
 
     showAlert();
-  }, [foodItems, today]);
+  }, [upcomingItems, today]);
 
   const handleEat = async (id: number) => {
     try {
@@ -85,26 +133,16 @@ export const FoodExpiryPage = () => {
         console.error("削除失敗:", errorText);
         throw new Error("削除に失敗しました");
       }
-      setFoodItems((prev) => prev.filter((item) => item.id !== id));
+      setUpcomingItems((prev) => prev.filter((item) => item.id !== id));
+      setExpiredItems((prev) => prev.filter((item) => item.id !== id));
     } catch (err) {
       console.error(err);
       alert("食べた処理に失敗しました");
     }
   };
 
-  const expiredItems = foodItems.filter((item) => {
-    const diff = Math.ceil(
-      (new Date(item.expiration_date).getTime() - today.getTime()) /
-        (1000 * 60 * 60 * 24)
-    );
-    return diff < 0;
-  });
-
-  const expiringItems = foodItems.filter((item) => {
-    const diff = Math.ceil(
-      (new Date(item.expiration_date).getTime() - today.getTime()) /
-        (1000 * 60 * 60 * 24)
-    );
+  const expiringItems = upcomingItems.filter((item) => {
+    const diff = daysLeft(item);
     return diff >= 0 && diff <= 3;
   });
 
@@ -115,7 +153,7 @@ export const FoodExpiryPage = () => {
       <GlassCard className="p-6">
         <h2 className="text-2xl font-light text-red-600 mb-4 flex items-center">
           <span className="mr-2">🚨</span>
-          期限切れ ({expiredItems.length}件)
+          期限切れ ({expiredItems.length}{nextCursor ? "件以上" : "件"})
         </h2>
         <div className="grid sm:grid-cols-2 lg:grid-cols-3 gap-4">
           {expiredItems.map((item) => (
@@ -139,6 +177,14 @@ export const FoodExpiryPage = () => {
             </div>
           ))}
         </div>
+        {/* 期限切れの続きのページ（X-Next-Cursor がある間だけ表示） */}
+        {nextCursor && (
+          <div className="flex justify-center mt-4">
+            <GlassButton variant="outline" loading={isLoadingMore} onClick={loadMoreExpired}>
+              もっと見る
+            </GlassButton>
+          </div>
+        )}
       </GlassCard>
 
       <GlassCard className="p-6">
@@ -176,6 +222,7 @@ export const FoodExpiryPage = () => {
           })}
         </div>
       </GlassCard>
+
     </div>
   );
 };
@@ -1,10 +1,12 @@
 // src/pages/FoodPages.tsx
 
-import { useEffect, useState } from "react";
-import { GlassCard, GlassInput } from "../components/ui/GlassUI";
+import { useEffect, useMemo, useRef, useState } from "react";
+import { GlassButton, GlassCard, GlassInput } from "../components/ui/GlassUI";
 import { useAuthStore } from "../stores/authStore";
 import { FOOD_UNITS, type Food } from "../types/food";
 import { fetchWithAuth, getApiUrl } from "../utils/fetchWrapper"; // ✅ 追加
+import { fetchPage } from "../utils/pagination";
+import { useDebouncedValue } from "../hooks/useDebouncedValue";
 
 const foodCategories = [
   { id: "all", name: "すべて", icon: "🍽️" },
@@ -29,6 +31,9 @@ export const FoodPage = () => {
   const [selectedCategory, setSelectedCategory] = useState("all");
   const [searchQuery, setSearchQuery] = useState("");
   const [foodItems, setFoodItems] = useState<Food[]>([]);
+  // 続きのページがあるときの X-Next-Cursor（「もっと見る」で読み込む）
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [daysLeftMap, setDaysLeftMap] = useState<{
     [foodId: number]: number | null;
   }>({});
@@ -46,22 +51,59 @@ export const FoodPage = () => {
   const [usingItem, setUsingItem] = useState<Food | null>(null);
   const [usedQuantity, setUsedQuantity] = useState<number>(1);
 
+  // 検索・カテゴリ・並び順はサーバー側で処理する（条件が変わったら最初のページから取り直す）
+  const debouncedQuery = useDebouncedValue(searchQuery.trim(), 300);
+  const listUrl = useMemo(() => {
+    const params = new URLSearchParams(
+      sortOrder === "days_left"
+        ? { sort: "expiration_date", order: "asc" }
+        : { sort: "id", order: "desc" }
+    );
+    if (selectedCategory !== "all") params.set("category", selectedCategory);
+    if (debouncedQuery) params.set("q", debouncedQuery);
+    return `${getApiUrl("/api/me/foods")}?${params.toString()}`;
+  }, [sortOrder, selectedCategory, debouncedQuery]);
+  const listUrlRef = useRef(listUrl);
+  listUrlRef.current = listUrl;
+
   useEffect(() => {
     const fetchFoods = async () => {
       try {
-        // ✅ fetchWithAuth を使用
-        const res = await fetchWithAuth(getApiUrl("/api/me/foods"), token!);
-        if (!res.ok) throw new Error("食品の取得に失敗しました");
-        const data = await res.json();
-        setFoodItems(data);
+        // ✅ fetchWithAuth を使用（最初のページだけ取得）
+        const page = await fetchPage<Food>(listUrl, null, (pageUrl) =>
+          fetchWithAuth(pageUrl, token!)
+        );
+        // 応答を待つ間に条件が変わっていたら古い結果は捨てる
+        if (listUrlRef.current !== listUrl) return;
+        setFoodItems(page.items);
+        setNextCursor(page.nextCursor);
       } catch (err) {
         console.error("❌ 食品取得エラー:", err);
       }
     };
+    // 前の条件のカーソルは使えないので、最初のページが届くまで「もっと見る」を出さない
+    setNextCursor(null);
     if (token) {
       fetchFoods();
     }
-  }, [token]);
+  }, [token, listUrl]);
+
+  const loadMoreFoods = async () => {
+    if (!nextCursor || isLoadingMore) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await fetchPage<Food>(listUrl, nextCursor, (pageUrl) =>
+        fetchWithAuth(pageUrl, token!)
+      );
+      if (listUrlRef.current !== listUrl) return;
+      setFoodItems((prev) => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("❌ 食品取得エラー:", err);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
 
   useEffect(() => {
     const fetchAllDaysLeft = async () => {
@@ -215,29 +257,6 @@ export const FoodPage = () => {
     }
   };
 
-  const currentCategoryName = foodCategories.find(
-    (c) => c.id === selectedCategory
-  )?.name;
-  const filteredItems = foodItems
-    .filter(
-      (item) =>
-        (selectedCategory === "all" || item.category === currentCategoryName) &&
-        item.name.toLowerCase().includes(searchQuery.toLowerCase())
-    )
-    .sort((a, b) => {
-      if (sortOrder === "created_at") {
-        return (
-          new Date(b.created_at).getTime() - new Date(a.created_at).getTime()
-        );
-      } else if (sortOrder === "days_left") {
-        return (
-          (daysLeftMap[a.id] ?? Infinity) - (daysLeftMap[b.id] ?? Infinity)
-        );
-      } else {
-        return 0;
-      }
-    });
-
   return (
     <div className="max-w-6xl mx-auto space-y-8">
       <div className="flex flex-col sm:flex-row gap-4 items-start sm:items-center justify-between">
@@ -275,7 +294,7 @@ export const FoodPage = () => {
       </div>
 
       <div className="grid sm:grid-cols-2 lg:grid-cols-3 gap-6">
-        {filteredItems.map((item) => (
+        {foodItems.map((item) => (
           <GlassCard key={item.id} className="p-6">
             <div className="flex items-start justify-between mb-4">
               <div>
@@ -337,6 +356,15 @@ export const FoodPage = () => {
         ))}
       </div>
 
+      {/* 続きのページ（X-Next-Cursor がある間だけ表示） */}
+      {nextCursor && (
+        <div className="flex justify-center">
+          <GlassButton variant="outline" loading={isLoadingMore} onClick={loadMoreFoods}>
+            もっと見る
+          </GlassButton>
+        </div>
+      )}
+
       {editingItem && (
         <div className="fixed inset-0 bg-black/30 backdrop-blur-sm flex items-center justify-center z-50">
           <div className="bg-white rounded-xl p-6 w-full max-w-md space-y-4 shadow-lg">
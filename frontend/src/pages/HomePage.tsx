@@ -4,10 +4,22 @@ import { Link, useNavigate } from "react-router-dom";
 import { useBookStore } from "../stores/bookStore";
 import { useAuthStore } from "../stores/authStore";
 import { GlassCard, GlassButton } from "../components/ui/GlassUI";
-import type { Food } from "../types/food";
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL;
 
+interface BookStatsResponse {
+  owned: number;
+  wishlist: number;
+  favorites: number;
+}
+
+interface FoodStatsResponse {
+  total_items: number;
+  expired: number;
+  expiring_soon: number;
+  fresh_items: number;
+}
+
 export const HomePage = () => {
   const { token } = useAuthStore();
   const navigate = useNavigate();
@@ -16,7 +28,8 @@ export const HomePage = () => {
 
   const loadBooks = useCallback(async () => {
     if (isAuthenticated && isInitialized) {
-      await fetchBooks();
+      // 「最近追加した書籍」用に新しい順の最初のページだけ取得
+      await fetchBooks({ sortBy: "id", order: "desc" });
     }
   }, [isAuthenticated, isInitialized, fetchBooks]);
 
@@ -24,15 +37,6 @@ export const HomePage = () => {
     loadBooks();
   }, [loadBooks]);
 
-  const getStatus = (dateStr: string): "expired" | "expiring" | "fresh" => {
-    const today = new Date();
-    const expiry = new Date(dateStr);
-    const diff = (expiry.getTime() - today.getTime()) / (1000 * 60 * 60 * 24);
-    if (diff < 0) return "expired";
-    if (diff <= 3) return "expiring";
-    return "fresh";
-  };
-
   const [foodStats, setFoodStats] = useState({
     totalItems: 0,
     expiringSoon: 0,
@@ -43,30 +47,40 @@ export const HomePage = () => {
   const loadFoodStats = useCallback(async () => {
     if (!token) return;
     try {
-      const res = await fetch(`${API_BASE_URL}/me/foods/`, {
+      // 一覧を全ページ取得せず、件数だけをサーバー側で集計してもらう
+      const res = await fetch(`${API_BASE_URL}/me/foods/stats`, {
         headers: {
           Authorization: `Bearer ${token}`,
         },
       });
+      if (!res.ok) throw new Error("食品の件数取得に失敗しました");
+      const data: FoodStatsResponse = await res.json();
 
-      if (!res.ok) throw new Error("食品データの取得に失敗");
+      setFoodStats({
+        totalItems: data.total_items,
+        expired: data.expired,
+        expiringSoon: data.expiring_soon,
+        freshItems: data.fresh_items,
+      });
+    } catch (err) {
+      console.error(err);
+    }
+  }, [token]);
 
-      const data = await res.json();
-      const stats = {
-        totalItems: data.length,
-        expired: 0,
-        expiringSoon: 0,
-        freshItems: 0,
-      };
+  const [ownedBooks, setOwnedBooks] = useState(0);
 
-      data.forEach((item: Food) => {
-        const itemStatus = getStatus(item.expiration_date);
-        if (itemStatus === "expired") stats.expired++;
-        else if (itemStatus === "expiring") stats.expiringSoon++;
-        else stats.freshItems++;
+  const loadBookStats = useCallback(async () => {
+    if (!token) return;
+    try {
+      // 書籍も一覧のページ長ではなく、サーバー側で数えた件数を表示する
+      const res = await fetch(`${API_BASE_URL}/me/books/stats`, {
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
       });
-
-      setFoodStats(stats);
+      if (!res.ok) throw new Error("書籍の件数取得に失敗しました");
+      const data: BookStatsResponse = await res.json();
+      setOwnedBooks(data.owned);
     } catch (err) {
       console.error(err);
     }
@@ -75,14 +89,16 @@ export const HomePage = () => {
   useEffect(() => {
     loadBooks();
     loadFoodStats();
-  }, [loadBooks, loadFoodStats]);
+    loadBookStats();
+  }, [loadBooks, loadFoodStats, loadBookStats]);
 
 
 
+  // 読了の記録はまだ無いので、所持している本はすべて積読として数える
   const bookStats = {
-    totalBooks: books.length,
+    totalBooks: ownedBooks,
     readBooks: 0,
-    unreadBooks: books.length,
+    unreadBooks: ownedBooks,
   };
 
   return (
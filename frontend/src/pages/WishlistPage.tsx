@@ -11,90 +11,71 @@ import {
 } from "../components/ui/GlassUI";
 import { useAuthStore } from "../stores/authStore";
 import { useBookStore } from "../stores/bookStore";
-import { BookStatusEnum, type Book } from "../types/book";
-
-// ソート型を定義（created_atを削除してidを使用）
-type SortBy = "title" | "author" | "published_date" | "id";
-type SortOrder = "asc" | "desc";
+import {
+  BookStatusEnum,
+  type Book,
+  type BookSortBy,
+  type SortOrder,
+} from "../types/book";
+import { useDebouncedValue } from "../hooks/useDebouncedValue";
 
 export const WishlistPage = () => {
   const {
     wishlistBooks,
+    wishlistNextCursor,
     isLoadingWishlist,
+    isLoadingMoreWishlist,
     wishlistFetchError,
     fetchWishlist,
+    fetchMoreWishlist,
     updateBookById,
+    librarySearchResults,
+    librarySearchHasMore,
+    isSearchingLibrary,
+    isLoadingMoreLibrary,
+    librarySearchError,
+    searchLibrary,
+    searchMoreLibrary,
   } = useBookStore();
   const { isAuthenticated, isInitialized } = useAuthStore();
 
-  // ローカル検索状態
+  // 検索はサーバー側（GET /me/books/search?status=wishlist）で行う。入力が止まってから問い合わせる
   const [searchQuery, setSearchQuery] = useState("");
-  // ソート状態（created_atをidに変更）
-  const [sortBy, setSortBy] = useState<SortBy>("id");
+  const debouncedQuery = useDebouncedValue(searchQuery.trim(), 300);
+  const isSearchMode = debouncedQuery !== "";
+  // ソート状態（並び替えはサーバー側で行い、変わったら最初のページから取り直す）
+  const [sortBy, setSortBy] = useState<BookSortBy>("id");
   const [sortOrder, setSortOrder] = useState<SortOrder>("desc");
 
   const loadWishlist = useCallback(async () => {
     if (isAuthenticated && isInitialized) {
-      await fetchWishlist();
+      await fetchWishlist({ sortBy, order: sortOrder });
     }
-  }, [isAuthenticated, isInitialized, fetchWishlist]);
+  }, [isAuthenticated, isInitialized, fetchWishlist, sortBy, sortOrder]);
 
   useEffect(() => {
     loadWishlist();
   }, [loadWishlist]);
 
-  const filteredBooks = wishlistBooks.filter((book) => {
-    // 安全なアクセス：null/undefinedの場合は空文字に変換
-    const title = (book.title || "").toLowerCase();
-    const author = (book.author || "").toLowerCase();
-    const publisher = (book.publisher || "").toLowerCase();
-    const query = searchQuery.toLowerCase();
-
-    return (
-      title.includes(query) ||
-      author.includes(query) ||
-      publisher.includes(query)
-    );
-  });
-
-  // ソート処理
-  const sortedBooks = [...filteredBooks].sort((a, b) => {
-    let aValue: string | number, bValue: string | number;
-
-    switch (sortBy) {
-      case "title":
-        aValue = (a.title || "").toLowerCase();
-        bValue = (b.title || "").toLowerCase();
-        break;
-      case "author":
-        aValue = (a.author || "").toLowerCase();
-        bValue = (b.author || "").toLowerCase();
-        break;
-      case "published_date":
-        aValue = new Date(a.published_date || 0).getTime();
-        bValue = new Date(b.published_date || 0).getTime();
-        break;
-      case "id":
-      default:
-        // IDを追加順として使用（数値の大小で判定）
-        aValue = a.id;
-        bValue = b.id;
-        break;
+  useEffect(() => {
+    if (isAuthenticated && isInitialized) {
+      searchLibrary(debouncedQuery, "wishlist");
     }
+  }, [isAuthenticated, isInitialized, debouncedQuery, searchLibrary]);
 
-    if (sortOrder === "asc") {
-      return aValue < bValue ? -1 : aValue > bValue ? 1 : 0;
-    } else {
-      return aValue > bValue ? -1 : aValue < bValue ? 1 : 0;
-    }
-  });
+  // 検索結果は関連度順、一覧はサーバーで並び替え済み
+  const displayedBooks = isSearchMode ? librarySearchResults : wishlistBooks;
+  const listLoading = isSearchMode ? isSearchingLibrary : isLoadingWishlist;
+  const listError = isSearchMode ? librarySearchError : wishlistFetchError;
+  const hasMore = isSearchMode ? librarySearchHasMore : !!wishlistNextCursor;
 
   // ✅ ウィッシュリスト専用: 所有済みに変更する機能
   const handleMarkAsOwned = async (bookId: number) => {
     try {
       await updateBookById(bookId, { status: BookStatusEnum.OWNED });
-      // 成功したらウィッシュリストを再取得して状態を更新
+      // 成功したらウィッシュリスト（検索中なら検索結果も）を再取得して状態を更新
       await loadWishlist();
+      if (isSearchMode) await searchLibrary(debouncedQuery, "wishlist");
     } catch (error) {
       console.error("所有済み変更エラー:", error);
     }
@@ -182,57 +163,63 @@ export const WishlistPage = () => {
           <span className="text-sm text-gray-600">並び替え:</span>
           <select
             value={sortBy}
-            onChange={(e) => setSortBy(e.target.value as SortBy)}
-            className="bg-white/30 backdrop-blur-xl border border-white/20 rounded-lg px-3 py-1 text-sm text-gray-800 focus:outline-none focus:ring-2 focus:ring-pink-400/50"
+            onChange={(e) => setSortBy(e.target.value as BookSortBy)}
+            disabled={isSearchMode}
+            className="disabled:opacity-50 bg-white/30 backdrop-blur-xl border border-white/20 rounded-lg px-3 py-1 text-sm text-gray-800 focus:outline-none focus:ring-2 focus:ring-pink-400/50"
           >
-            <option value="created_at">追加日</option>
+            <option value="id">追加日</option>
             <option value="title">タイトル</option>
             <option value="author">著者</option>
             <option value="published_date">出版日</option>
           </select>
           <button
             onClick={() => setSortOrder(sortOrder === "asc" ? "desc" : "asc")}
-            className="bg-white/30 backdrop-blur-xl border border-white/20 rounded-lg px-3 py-1 text-sm text-gray-800 hover:bg-white/40 transition-colors"
+            disabled={isSearchMode}
+            className="disabled:opacity-50 bg-white/30 backdrop-blur-xl border border-white/20 rounded-lg px-3 py-1 text-sm text-gray-800 hover:bg-white/40 transition-colors"
           >
             {sortOrder === "asc" ? "↑" : "↓"}
           </button>
           <span className="text-sm text-gray-600 ml-2">
-            {sortedBooks.length}件の欲しい本
+            {displayedBooks.length}件の欲しい本
+            {hasMore && "（続きあり）"}
+            {isSearchMode && "・関連度順"}
           </span>
         </div>
       </div>
 
       {/* ウィッシュリスト一覧 */}
-      {isLoadingWishlist ? (
-        <GlassLoading message="ウィッシュリストを読み込み中..." />
-      ) : wishlistFetchError ? (
+      {listLoading ? (
+        <GlassLoading message={isSearchMode ? "検索中..." : "ウィッシュリストを読み込み中..."} />
+      ) : listError ? (
         <GlassError
-          message={wishlistFetchError}
-          onRetry={() => fetchWishlist()}
+          message={listError}
+          onRetry={() =>
+            isSearchMode ? searchLibrary(debouncedQuery, "wishlist") : loadWishlist()
+          }
         />
-      ) : sortedBooks.length === 0 ? (
+      ) : displayedBooks.length === 0 ? (
         <GlassEmptyState
-          icon={searchQuery ? "🔍" : "💖"}
+          icon={isSearchMode ? "🔍" : "💖"}
           title={
-            searchQuery
+            isSearchMode
               ? "検索結果が見つかりません"
               : "ウィッシュリストが空です"
           }
           description={
-            searchQuery
+            isSearchMode
               ? "別のキーワードで検索してみてください"
               : "欲しい本をウィッシュリストに追加してみましょう"
           }
-          actionLabel={!searchQuery ? "最初の本を追加" : undefined}
+          actionLabel={!isSearchMode ? "最初の本を追加" : undefined}
           onAction={
-            !searchQuery
+            !isSearchMode
               ? () => (window.location.href = "/add-book")
               : undefined
           }
         />
       ) : (
         <div className="space-y-4">
-          {sortedBooks.map((book) => (
+          {displayedBooks.map((book) => (
             <div
               key={book.id}
               className="bg-white/30 backdrop-blur-xl rounded-xl p-4 border border-white/20 shadow-xl hover:shadow-2xl hover:-translate-y-1 transition-all duration-500 group relative"
@@ -313,8 +300,21 @@ export const WishlistPage = () => {
         </div>
       )}
 
+      {/* 続きのページ（一覧は X-Next-Cursor、検索は offset で続きがある間だけ表示） */}
+      {!listLoading && !listError && hasMore && (
+        <div className="flex justify-center">
+          <GlassButton
+            variant="outline"
+            loading={isSearchMode ? isLoadingMoreLibrary : isLoadingMoreWishlist}
+            onClick={() => (isSearchMode ? searchMoreLibrary() : fetchMoreWishlist())}
+          >
+            もっと見る
+          </GlassButton>
+        </div>
+      )}
+
       {/* ✅ ウィッシュリスト専用のヘルプセクション */}
-      {sortedBooks.length > 0 && (
+      {displayedBooks.length > 0 && (
         <GlassCard className="p-6">
           <div className="flex items-start gap-4">
             <div className="text-2xl">💡</div>
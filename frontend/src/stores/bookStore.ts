@@ -6,15 +6,30 @@ import axios from "axios";
 import type {
   Book,
   BookCreate,
+  BookListSort,
   BookUpdate,
   GoogleBookInfo,
 } from "../types/book";
 import { formatBookError, formatErrorMessage, logError } from "../utils/errorFormatter";
+import { axiosGetOffsetPage, axiosGetPage } from "../utils/pagination";
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL;
+const LIBRARY_SEARCH_PAGE_SIZE = 20;
+// 既定は新しく登録した順
+const DEFAULT_BOOK_SORT: BookListSort = { sortBy: "id", order: "desc" };
+
+type LibrarySearchStatus = "owned" | "wishlist";
+
+const sortedListUrl = (path: string, sort: BookListSort): string =>
+  `${API_BASE_URL}${path}?sort=${sort.sortBy}&order=${sort.order}`;
 
 interface BookStore {
   books: Book[];
+  // 続きのページがあるときの X-Next-Cursor（無ければ null）
+  booksNextCursor: string | null;
+  // カーソルは並び順ごとに異なるので、続きは同じ並び順で取得する
+  booksSort: BookListSort;
+  isLoadingMoreBooks: boolean;
   isLoading: boolean;
   error: string | null;
   searchQuery: string;
@@ -37,9 +52,21 @@ interface BookStore {
 
   // ✅ 新規追加: ウィッシュリスト取得関連の状態
   wishlistBooks: Book[];
+  wishlistNextCursor: string | null;
+  wishlistSort: BookListSort;
   isLoadingWishlist: boolean;
+  isLoadingMoreWishlist: boolean;
   wishlistFetchError: string | null;
 
+  // ✅ 本棚内検索（GET /me/books/search、offset でページング）
+  librarySearchQuery: string;
+  librarySearchStatus: LibrarySearchStatus;
+  librarySearchResults: Book[];
+  librarySearchHasMore: boolean;
+  isSearchingLibrary: boolean;
+  isLoadingMoreLibrary: boolean;
+  librarySearchError: string | null;
+
   // ✅ 既存: 認証関連エラーの状態
   lastAuthError: string | null;
   hasAuthError: boolean;
@@ -82,14 +109,18 @@ interface BookStore {
   setWishlistBooks: (books: Book[]) => void;
   setLoadingWishlist: (loading: boolean) => void;
   setWishlistFetchError: (error: string | null) => void;
-  fetchWishlist: () => Promise<void>;
+  fetchWishlist: (sort?: BookListSort) => Promise<void>;
+  fetchMoreWishlist: () => Promise<void>;
   clearWishlist: () => void;
 
   // ✅ 既存: 認証エラー管理
   setAuthError: (error: string | null) => void;
   clearAuthError: () => void;
 
-  fetchBooks: () => Promise<void>;
+  fetchBooks: (sort?: BookListSort) => Promise<void>;
+  fetchMoreBooks: () => Promise<void>;
+  searchLibrary: (query: string, status?: LibrarySearchStatus) => Promise<void>;
+  searchMoreLibrary: () => Promise<void>;
   fetchBookById: (id: number) => Promise<Book | null>;
   createBook: (bookData: BookCreate) => Promise<void>;
   updateBookById: (id: number, updateData: BookUpdate) => Promise<void>;
@@ -102,6 +133,9 @@ interface BookStore {
 export const useBookStore = create<BookStore>()(
   devtools((set, get) => ({
     books: [],
+    booksNextCursor: null,
+    booksSort: DEFAULT_BOOK_SORT,
+    isLoadingMoreBooks: false,
     isLoading: false,
     error: null,
     searchQuery: "",
@@ -126,9 +160,21 @@ export const useBookStore = create<BookStore>()(
 
     // ✅ 新規追加: ウィッシュリスト取得関連の初期状態
     wishlistBooks: [],
+    wishlistNextCursor: null,
+    wishlistSort: DEFAULT_BOOK_SORT,
     isLoadingWishlist: false,
+    isLoadingMoreWishlist: false,
     wishlistFetchError: null,
 
+    // ✅ 本棚内検索の初期状態
+    librarySearchQuery: "",
+    librarySearchStatus: "owned",
+    librarySearchResults: [],
+    librarySearchHasMore: false,
+    isSearchingLibrary: false,
+    isLoadingMoreLibrary: false,
+    librarySearchError: null,
+
     setBooks: (books) => set({ books }),
     addBook: (book) => set((state) => ({ books: [...state.books, book] })),
 
@@ -189,6 +235,7 @@ export const useBookStore = create<BookStore>()(
     clearWishlist: () =>
       set({
         wishlistBooks: [],
+        wishlistNextCursor: null,
         wishlistFetchError: null,
       }),
 
@@ -198,21 +245,25 @@ export const useBookStore = create<BookStore>()(
     clearAuthError: () => set({ lastAuthError: null, hasAuthError: false }),
 
     // ✅ 新機能: ウィッシュリスト取得
-    fetchWishlist: async () => {
+    fetchWishlist: async (sort?: BookListSort) => {
+      const wishlistSort = sort ?? get().wishlistSort;
       set({
         isLoadingWishlist: true,
         wishlistFetchError: null,
+        wishlistSort,
+        // カーソルは並び順ごとに異なるので、前の並びの続きは使わない
+        wishlistNextCursor: null,
       });
 
       try {
-        const response = await axios.get(`${API_BASE_URL}/me/wishlist`);
-
-        // ✅ バックエンドから返されるBookOut[]をBook[]として扱う
+        // ✅ バックエンドから返されるBookOut[]をBook[]として扱う（最初のページだけ。続きは fetchMoreWishlist）
         // amazon_urlフィールドが追加されている可能性があるが、Book型は柔軟に対応
-        const wishlistBooks = response.data;
+        const page = await axiosGetPage<Book>(sortedListUrl("/me/wishlist", wishlistSort));
+        if (get().wishlistSort !== wishlistSort) return;
 
         set({
-          wishlistBooks,
+          wishlistBooks: page.items,
+          wishlistNextCursor: page.nextCursor,
           isLoadingWishlist: false,
         });
 
@@ -238,6 +289,32 @@ export const useBookStore = create<BookStore>()(
       }
     },
 
+    // ✅ ウィッシュリストの続きのページを読み込む
+    fetchMoreWishlist: async () => {
+      const { wishlistNextCursor, wishlistSort, isLoadingMoreWishlist } = get();
+      if (!wishlistNextCursor || isLoadingMoreWishlist) return;
+      set({ isLoadingMoreWishlist: true, wishlistFetchError: null });
+
+      try {
+        const page = await axiosGetPage<Book>(sortedListUrl("/me/wishlist", wishlistSort), wishlistNextCursor);
+        // 読み込み中に並び順が変わっていたら、別の並びのページなので捨てる
+        if (get().wishlistSort !== wishlistSort) {
+          set({ isLoadingMoreWishlist: false });
+          return;
+        }
+        set((state) => ({
+          wishlistBooks: [...state.wishlistBooks, ...page.items],
+          wishlistNextCursor: page.nextCursor,
+          isLoadingMoreWishlist: false,
+        }));
+      } catch (error: unknown) {
+        console.error("❌ ウィッシュリスト取得エラー:", error);
+        const errorResult = formatBookError(error);
+        logError(error, "fetchMoreWishlist");
+        set({ wishlistFetchError: errorResult.message, isLoadingMoreWishlist: false });
+      }
+    },
+
     // ✅ 既存機能: ウィッシュリストに追加
     addToWishlist: async (book: GoogleBookInfo) => {
       set({ isRegisteringToWishlist: true, wishlistError: null });
@@ -298,12 +375,17 @@ export const useBookStore = create<BookStore>()(
     },
 
     // ✅ 既存の関数（変更なし）
-    fetchBooks: async () => {
-      set({ isLoading: true, error: null });
+    fetchBooks: async (sort?: BookListSort) => {
+      const booksSort = sort ?? get().booksSort;
+      // カーソルは並び順ごとに異なるので、前の並びの続きは使わない
+      set({ isLoading: true, error: null, booksSort, booksNextCursor: null });
 
       try {
-        const response = await axios.get(`${API_BASE_URL}/me/books`);
-        set({ books: response.data, isLoading: false });
+        // 最初のページだけ取得（続きは fetchMoreBooks）
+        const page = await axiosGetPage<Book>(sortedListUrl("/me/books", booksSort));
+        // 応答を待つ間に並び順が変わっていたら古い結果は捨てる
+        if (get().booksSort !== booksSort) return;
+        set({ books: page.items, booksNextCursor: page.nextCursor, isLoading: false });
         get().clearAuthError();
       } catch (error: unknown) {
         console.error("書籍取得エラー:", error);
@@ -320,6 +402,104 @@ export const useBookStore = create<BookStore>()(
       }
     },
 
+    // ✅ 書籍一覧の続きのページを読み込む
+    fetchMoreBooks: async () => {
+      const { booksNextCursor, booksSort, isLoadingMoreBooks } = get();
+      if (!booksNextCursor || isLoadingMoreBooks) return;
+      set({ isLoadingMoreBooks: true, error: null });
+
+      try {
+        const page = await axiosGetPage<Book>(sortedListUrl("/me/books", booksSort), booksNextCursor);
+        if (get().booksSort !== booksSort) {
+          set({ isLoadingMoreBooks: false });
+          return;
+        }
+        set((state) => ({
+          books: [...state.books, ...page.items],
+          booksNextCursor: page.nextCursor,
+          isLoadingMoreBooks: false,
+        }));
+      } catch (error: unknown) {
+        console.error("書籍取得エラー:", error);
+        const errorResult = formatBookError(error);
+        logError(error, "fetchMoreBooks");
+        set({ error: errorResult.message, isLoadingMoreBooks: false });
+      }
+    },
+
+    // ✅ 所持している本をサーバー側で検索（最初のページ）
+    searchLibrary: async (query: string, status: LibrarySearchStatus = "owned") => {
+      const q = query.trim();
+      set({ librarySearchQuery: q, librarySearchStatus: status, librarySearchError: null });
+      if (!q) {
+        set({ librarySearchResults: [], librarySearchHasMore: false, isSearchingLibrary: false });
+        return;
+      }
+      set({ isSearchingLibrary: true });
+
+      try {
+        const page = await axiosGetOffsetPage<Book>(
+          `${API_BASE_URL}/me/books/search`,
+          { q, status },
+          0,
+          LIBRARY_SEARCH_PAGE_SIZE
+        );
+        // 応答を待つ間に入力が変わっていたら古い結果は捨てる
+        if (get().librarySearchQuery !== q || get().librarySearchStatus !== status) return;
+        set({
+          librarySearchResults: page.items,
+          librarySearchHasMore: page.hasMore,
+          isSearchingLibrary: false,
+        });
+      } catch (error: unknown) {
+        if (get().librarySearchQuery !== q || get().librarySearchStatus !== status) return;
+        console.error("書籍検索エラー:", error);
+        const errorResult = formatBookError(error);
+        logError(error, "searchLibrary");
+        set({
+          librarySearchError: errorResult.message,
+          librarySearchResults: [],
+          isSearchingLibrary: false,
+        });
+      }
+    },
+
+    // ✅ 検索結果の続きを読み込む
+    searchMoreLibrary: async () => {
+      const {
+        librarySearchQuery: q,
+        librarySearchStatus: status,
+        librarySearchResults,
+        librarySearchHasMore,
+        isLoadingMoreLibrary,
+      } = get();
+      if (!q || !librarySearchHasMore || isLoadingMoreLibrary) return;
+      set({ isLoadingMoreLibrary: true, librarySearchError: null });
+
+      try {
+        const page = await axiosGetOffsetPage<Book>(
+          `${API_BASE_URL}/me/books/search`,
+          { q, status },
+          librarySearchResults.length,
+          LIBRARY_SEARCH_PAGE_SIZE
+        );
+        if (get().librarySearchQuery !== q || get().librarySearchStatus !== status) {
+          set({ isLoadingMoreLibrary: false });
+          return;
+        }
+        set((state) => ({
+          librarySearchResults: [...state.librarySearchResults, ...page.items],
+          librarySearchHasMore: page.hasMore,
+          isLoadingMoreLibrary: false,
+        }));
+      } catch (error: unknown) {
+        console.error("書籍検索エラー:", error);
+        const errorResult = formatBookError(error);
+        logError(error, "searchMoreLibrary");
+        set({ librarySearchError: errorResult.message, isLoadingMoreLibrary: false });
+      }
+    },
+
     fetchBookById: async (id: number) => {
       set({ isLoading: true, error: null });
       try {
@@ -12,6 +12,7 @@ import {
   logError,
   type FoodErrorResult,
 } from "../utils/errorFormatter";
+import { axiosGetPage } from "../utils/pagination";
 
 // ✅ 新規追加: 商品名検索結果の型
 interface ProductLookupResult {
@@ -25,6 +26,9 @@ const API_BASE_URL = import.meta.env.VITE_API_BASE_URL;
 
 interface FoodStore {
   foods: Food[];
+  // 続きのページがあるときの X-Next-Cursor（無ければ null）
+  foodsNextCursor: string | null;
+  isLoadingMore: boolean;
   isLoading: boolean;
   error: string | null;
   selectedFood: Food | null;
@@ -60,6 +64,7 @@ interface FoodStore {
 
   // API アクション
   fetchFoods: () => Promise<void>;
+  fetchMoreFoods: () => Promise<void>;
   fetchFoodById: (id: number) => Promise<Food | null>;
   createFood: (foodData: FoodCreate & { force?: boolean }) => Promise<void>; // ✅ 型を明確化
   updateFoodById: (id: number, updateData: FoodUpdate) => Promise<void>;
@@ -83,6 +88,8 @@ interface FoodStore {
 export const useFoodStore = create<FoodStore>()(
   devtools((set, get) => ({
     foods: [],
+    foodsNextCursor: null,
+    isLoadingMore: false,
     isLoading: false,
     error: null,
     selectedFood: null,
@@ -135,8 +142,9 @@ export const useFoodStore = create<FoodStore>()(
       set({ isLoading: true, error: null });
 
       try {
-        const response = await axios.get(`${API_BASE_URL}/me/foods`);
-        set({ foods: response.data, isLoading: false });
+        // 最初のページだけ取得（続きは fetchMoreFoods）
+        const page = await axiosGetPage<Food>(`${API_BASE_URL}/me/foods`);
+        set({ foods: page.items, foodsNextCursor: page.nextCursor, isLoading: false });
 
         // 成功時は認証エラー状態をクリア
         get().clearAuthError();
@@ -160,6 +168,27 @@ export const useFoodStore = create<FoodStore>()(
       }
     },
 
+    // ✅ 食品一覧の続きのページを読み込む
+    fetchMoreFoods: async () => {
+      const { foodsNextCursor, isLoadingMore } = get();
+      if (!foodsNextCursor || isLoadingMore) return;
+      set({ isLoadingMore: true, error: null });
+
+      try {
+        const page = await axiosGetPage<Food>(`${API_BASE_URL}/me/foods`, foodsNextCursor);
+        set((state) => ({
+          foods: [...state.foods, ...page.items],
+          foodsNextCursor: page.nextCursor,
+          isLoadingMore: false,
+        }));
+      } catch (error: unknown) {
+        console.error("食品取得エラー:", error);
+        const errorResult = formatFoodError(error);
+        logError(error, "foodStore.fetchMoreFoods");
+        set({ error: errorResult.message, isLoadingMore: false });
+      }
+    },
+
     // ✅ 修正2: 型安全な食品詳細取得
     fetchFoodById: async (id: number) => {
       set({ isLoading: true, error: null });
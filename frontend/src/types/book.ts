@@ -98,6 +98,15 @@ export interface BookFilter {
   genres?: string[];
 }
 
+// ✅ 一覧の並び順（GET /me/books・/me/wishlist の sort / order。並び替えはサーバー側で行う）
+export type BookSortBy = "id" | "title" | "author" | "published_date";
+export type SortOrder = "asc" | "desc";
+
+export interface BookListSort {
+  sortBy: BookSortBy;
+  order: SortOrder;
+}
+
 // ✅ 新規追加: 書籍一覧表示用の型
 export interface BookListProps {
   books: Book[];
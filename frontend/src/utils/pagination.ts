@@ -0,0 +1,69 @@
+// src/utils/pagination.ts
+// 一覧 API（/me/books・/me/wishlist・/me/foods など）はカーソル方式でページ分割され、
+// 続きがあるときは X-Next-Cursor ヘッダーを返す。画面は最初のページだけ取得し、
+// 「もっと見る」で次のカーソルを渡して続きを読み込む（全件をまとめて取りに行かない）。
+// 検索 API（/me/books/search）は関連度順なので limit / offset でページングする。
+
+import axios from "axios";
+
+const NEXT_CURSOR_HEADER = "x-next-cursor";
+
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+const withCursor = (url: string, cursor: string | null): string =>
+  cursor
+    ? `${url}${url.includes("?") ? "&" : "?"}cursor=${encodeURIComponent(cursor)}`
+    : url;
+
+// axios 用（bookStore / foodStore）：1ページ分を取得
+export const axiosGetPage = async <T>(
+  url: string,
+  cursor: string | null = null
+): Promise<Page<T>> => {
+  const response = await axios.get<T[]>(withCursor(url, cursor));
+  return {
+    items: response.data,
+    nextCursor: (response.headers[NEXT_CURSOR_HEADER] as string | undefined) ?? null,
+  };
+};
+
+export interface OffsetPage<T> {
+  items: T[];
+  hasMore: boolean;
+}
+
+// axios 用（offset 方式）：1件多く取得して、続きがあるかを判定する
+export const axiosGetOffsetPage = async <T>(
+  url: string,
+  params: Record<string, string>,
+  offset: number,
+  pageSize: number
+): Promise<OffsetPage<T>> => {
+  const response = await axios.get<T[]>(url, {
+    params: { ...params, limit: pageSize + 1, offset },
+  });
+  return {
+    items: response.data.slice(0, pageSize),
+    hasMore: response.data.length > pageSize,
+  };
+};
+
+// fetch 用：fetcher にページの URL を渡して Response を返してもらう
+export const fetchPage = async <T>(
+  url: string,
+  cursor: string | null,
+  fetcher: (pageUrl: string) => Promise<Response>
+): Promise<Page<T>> => {
+  const res = await fetcher(withCursor(url, cursor));
+  if (!res.ok) {
+    const errorText = await res.text();
+    throw new Error(`一覧の取得に失敗しました (${res.status}): ${errorText}`);
+  }
+  return {
+    items: (await res.json()) as T[],
+    nextCursor: res.headers.get(NEXT_CURSOR_HEADER),
+  };
+};